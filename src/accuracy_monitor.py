@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 예측 정확도 추적 / 피처 드리프트 모니터링
+=======================================================
+라운드별 예측을 보관해 두었다가 실제 경기 결과가 들어오면 비교하여
+포지션/피처 구간별 오차를 누적하고, 학습 분포 대비 피처 드리프트로 재학습 필요 여부 판단
+
+예측 보관 (prediction_model.main에서 호출):
+- outputs/prediction_archive/season=<s>/round=<d>/predictions.csv ((s, d) = 예측 대상 시즌/라운드)
+- 라운드는 항상 (season, game_day)로 구분 (새 시즌의 d라운드가 이전 시즌 d라운드와 섞이지 않음)
+
+정확도 (outputs/accuracy_state.json):
+- 아직 평가하지 않은 보관 라운드 중 실제 경기 기록이 있는 라운드만 평가 (과거 라운드 재계산 없음)
+- 해당 라운드에 출전한 선수만 평가 (예측은 출전 가정)
+- 누적기: 건수, 오차 합, 절대 오차 합, 제곱 오차 합, 예측 합, 실제 합 -> 합치기 가능
+  - RMSE / MAE / 편향(실제 - 예측) / 보정 비율(실제 합 / 예측 합)
+- 키: overall, round=<s>-<d>, group=<GK/DF/MF/FW>, predicted=<구간>, form=<구간>, matches=<구간>
+
+드리프트 (outputs/drift_reference.json, 학습 시 저장):
+- 학습 피처의 분위수 구간(PSI_BINS개)과 구간별 비율
+- 학습 데이터 중 마지막 REFERENCE_ROUNDS개 (season, game_day) 라운드 행만 사용
+  (시즌 초반 행은 폼 지수가 1.0에 몰려 있어 시즌 후반 추론 분포와 항상 다르게 나옴)
+- 현재 추론 피처와 PSI (Population Stability Index) 비교, PSI_THRESHOLD 초과 피처를 드리프트로 표시
+- 누적 피처(출전 수, 누적 골/도움)는 시즌 진행에 따라 당연히 커지므로 제외
+
+재학습 판단 (needs_retraining): 드리프트 피처가 있거나 최근 라운드 RMSE가 학습 검증 RMSE x RMSE_TOLERANCE 초과
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from feature_store import ROUND_COLUMNS, _round_order, match_rounds
+from instrumentation import stage
+from pricing import position_group
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+ARCHIVE_DIR = OUTPUT_DIR / 'prediction_archive'
+STATE_PATH = OUTPUT_DIR / 'accuracy_state.json'
+DRIFT_REFERENCE_PATH = OUTPUT_DIR / 'drift_reference.json'
+
+# 비누적 피처만 드리프트 비교 (feature_store.FEATURE_COLUMNS 일부)
+DRIFT_FEATURES = [
+    'recent_5_avg', 'season_avg', 'form_index', 'position_percentile',
+    'sca_avg', 'minutes_avg', 'season_per_90'
+]
+PSI_BINS = 10
+REFERENCE_ROUNDS = 5
+PSI_THRESHOLD = 0.2
+PSI_EPSILON = 1e-4
+RMSE_TOLERANCE = 1.25
+
+# 구간별 정확도 (오른쪽 경계 미포함)
+BUCKETS = {
+    'predicted': ('predicted_score', [0, 5, 10, 15, 20, 30]),
+    'form': ('form_index', [0, 0.8, 1.2]),
+    'matches': ('matches_played', [0, 5, 15]),
+}
+
+
+class ErrorAccumulator:
+    """합치기 가능한 오차 누적기"""
+
+    FIELDS = ['count', 'sum_error', 'sum_abs_error', 'sum_sq_error', 'sum_predicted', 'sum_actual']
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field, 0.0))
+
+    def add(self, predicted, actual):
+        predicted = np.asarray(predicted, dtype=np.float64)
+        actual = np.asarray(actual, dtype=np.float64)
+        error = actual - predicted
+        self.count += len(error)
+        self.sum_error += float(error.sum())
+        self.sum_abs_error += float(np.abs(error).sum())
+        self.sum_sq_error += float((error ** 2).sum())
+        self.sum_predicted += float(predicted.sum())
+        self.sum_actual += float(actual.sum())
+        return self
+
+    def merge(self, other: 'ErrorAccumulator'):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        return self
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def metrics(self) -> dict:
+        n = self.count
+        return {
+            'count': int(n),
+            'rmse': np.sqrt(self.sum_sq_error / n) if n else np.nan,
+            'mae': self.sum_abs_error / n if n else np.nan,
+            'bias': self.sum_error / n if n else np.nan,
+            'calibration': self.sum_actual / self.sum_predicted if self.sum_predicted else np.nan,
+        }
+
+
+def _bucket_labels(values: pd.Series, edges) -> pd.Series:
+    """구간 라벨 ('10-15', 마지막 구간은 '30+')"""
+    labels = [f'{low:g}-{high:g}' for low, high in zip(edges[:-1], edges[1:])] + [f'{edges[-1]:g}+']
+    codes = np.searchsorted(edges, values.fillna(edges[0]).to_numpy(), side='right') - 1
+    return pd.Series(np.array(labels)[np.clip(codes, 0, len(labels) - 1)], index=values.index)
+
+
+def _round_path(archive_dir, season, game_day) -> Path:
+    return Path(archive_dir) / f'season={season}' / f'round={int(game_day)}'
+
+
+def _round_key(season, game_day) -> str:
+    """누적기 키 값 ('2024-5')"""
+    return f'{season}-{int(game_day)}'
+
+
+def archive_predictions(predictions: pd.DataFrame, season, target_round: int, archive_dir=ARCHIVE_DIR,
+                        overwrite=False):
+    """예측 대상 (시즌, 라운드)별 예측 보관 (이미 있으면 overwrite=True일 때만 교체)"""
+    path = _round_path(archive_dir, season, target_round) / 'predictions.csv'
+    if path.exists() and not overwrite:
+        print(f"  - {season} 라운드 {target_round} 예측 보관본 유지: {path}")
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    predictions.to_csv(path, index=False, encoding='utf-8-sig')
+    print(f"  - {season} 라운드 {target_round} 예측 보관: {path}")
+    return path
+
+
+def actual_scores(match_scores: pd.DataFrame, match_info: pd.DataFrame) -> pd.DataFrame:
+    """(player_id, season, game_day)별 실제 판타지 점수 (같은 라운드 2경기는 합)"""
+    df = match_scores[['game_id', 'player_id', 'fantasy_score']].merge(
+        match_rounds(match_info), on='game_id', how='inner'
+    )
+    return df.groupby(['player_id'] + ROUND_COLUMNS, as_index=False)['fantasy_score'].sum()
+
+
+def evaluation_rows(predictions: pd.DataFrame, actual: pd.DataFrame) -> pd.DataFrame:
+    """예측 x 실제 조인 (출전 선수만) + 평가 키 컬럼"""
+    rows = predictions.merge(actual.rename(columns={'fantasy_score': 'actual_score'}), on='player_id', how='inner')
+    rows['group'] = position_group(rows['main_position']).to_numpy()
+    for name, (column, edges) in BUCKETS.items():
+        if column in rows.columns:
+            rows[name] = _bucket_labels(rows[column], edges)
+    return rows
+
+
+class AccuracyMonitor:
+    """라운드별 예측 정확도 누적 (평가한 라운드는 다시 읽지 않음)"""
+
+    def __init__(self, state_path=STATE_PATH, archive_dir=ARCHIVE_DIR):
+        self.state_path = Path(state_path)
+        self.archive_dir = Path(archive_dir)
+        self.evaluated = []
+        self.accumulators = {}
+        if self.state_path.exists():
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            # (season, game_day) 쌍만 사용 (시즌 구분 전 상태의 라운드 번호는 무시)
+            self.evaluated = [tuple(round_) for round_ in state['evaluated_rounds'] if isinstance(round_, list)]
+            self.accumulators = {key: ErrorAccumulator(**values) for key, values in state['accumulators'].items()}
+
+    def archived_rounds(self) -> list:
+        """보관된 (season, game_day) 목록"""
+        if not self.archive_dir.exists():
+            return []
+        rounds = []
+        for path in self.archive_dir.glob('season=*/round=*'):
+            if path.is_dir():
+                season = path.parent.name.split('=', 1)[1]
+                season = int(season) if season.lstrip('-').isdigit() else season
+                rounds.append((season, int(path.name.split('=', 1)[1])))
+        return sorted(rounds)
+
+    def _add(self, key, predicted, actual):
+        self.accumulators.setdefault(key, ErrorAccumulator()).add(predicted, actual)
+
+    @stage(rows=lambda result, self, match_scores, match_info: len(match_scores))
+    def update(self, match_scores: pd.DataFrame, match_info: pd.DataFrame) -> list:
+        """
+        실제 결과가 들어온 미평가 라운드 평가
+
+        Returns:
+            새로 평가한 라운드 목록
+        """
+        rounds = match_rounds(match_info).dropna(subset=ROUND_COLUMNS)
+        played = {(season, int(game_day)) for season, game_day in rounds[ROUND_COLUMNS].itertuples(index=False)}
+        pending = [r for r in self.archived_rounds() if r not in self.evaluated and r in played]
+        if not pending:
+            print("  - 새로 평가할 라운드 없음")
+            return []
+
+        # 새 라운드 경기 행만 사용
+        round_ids = pd.MultiIndex.from_frame(rounds[ROUND_COLUMNS].astype({'game_day': int}))
+        new_games = match_info[match_info['game_id'].isin(rounds.loc[round_ids.isin(pending), 'game_id'])]
+        actual = actual_scores(match_scores[match_scores['game_id'].isin(new_games['game_id'])], new_games)
+
+        for season, game_day in pending:
+            key = f'round={_round_key(season, game_day)}'
+            predictions = pd.read_csv(_round_path(self.archive_dir, season, game_day) / 'predictions.csv')
+            in_round = actual[(actual['season'] == season) & (actual['game_day'] == game_day)]
+            rows = evaluation_rows(predictions, in_round.drop(columns=ROUND_COLUMNS))
+            predicted, observed = rows['predicted_score'], rows['actual_score']
+
+            self._add('overall', predicted, observed)
+            self._add(key, predicted, observed)
+            for dimension in ['group'] + [name for name in BUCKETS if name in rows.columns]:
+                for value, part in rows.groupby(dimension):
+                    self._add(f'{dimension}={value}', part['predicted_score'], part['actual_score'])
+
+            metrics = self.accumulators[key].metrics()
+            print(f"  - {season} 라운드 {game_day}: {metrics['count']}명, RMSE {metrics['rmse']:.2f}, "
+                  f"MAE {metrics['mae']:.2f}, 보정 {metrics['calibration']:.2f}")
+            self.evaluated.append((season, game_day))
+
+        self.save()
+        return pending
+
+    def save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            'evaluated_rounds': [list(round_) for round_ in sorted(self.evaluated)],
+            'accumulators': {key: acc.to_dict() for key, acc in self.accumulators.items()},
+            'updated_at': datetime.now().isoformat(),
+        }
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+
+    def report(self, prefix=None) -> pd.DataFrame:
+        """키별 지표 (prefix 지정 시 해당 차원만, 예: 'group')"""
+        rows = []
+        for key, acc in sorted(self.accumulators.items()):
+            dimension, _, value = key.partition('=')
+            if prefix is not None and dimension != prefix:
+                continue
+            rows.append({'dimension': dimension, 'value': value or dimension, **acc.metrics()})
+        return pd.DataFrame(rows, columns=['dimension', 'value', 'count', 'rmse', 'mae', 'bias', 'calibration'])
+
+    def recent_rmse(self, rounds=3):
+        """최근 평가 라운드들의 RMSE (누적기 합치기)"""
+        recent = sorted(self.evaluated)[-rounds:]
+        if not recent:
+            return None
+        merged = ErrorAccumulator()
+        for season, game_day in recent:
+            merged.merge(self.accumulators[f'round={_round_key(season, game_day)}'])
+        return merged.metrics()['rmse']
+
+
+def build_drift_reference(train_features: pd.DataFrame, validation_rmse=None) -> dict:
+    """학습 피처 분포 기준 (마지막 REFERENCE_ROUNDS 라운드 행의 분위수 구간 경계 + 구간별 비율)"""
+    if set(ROUND_COLUMNS) <= set(train_features.columns) and len(train_features):
+        order = _round_order(train_features)[0]
+        train_features = train_features[order >= np.unique(order)[-REFERENCE_ROUNDS:][0]]
+
+    features = {}
+    for column in DRIFT_FEATURES:
+        values = train_features[column].dropna().to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            continue
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, PSI_BINS + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        features[column] = {'edges': edges.tolist(), 'proportions': (counts / counts.sum()).tolist()}
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'rows': int(len(train_features)),
+        'validation_rmse': validation_rmse,
+        'features': features,
+    }
+
+
+def save_drift_reference(reference: dict, path=DRIFT_REFERENCE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(reference, f, indent=2)
+    print(f"드리프트 기준 저장: {path}")
+
+
+def load_drift_reference(path=DRIFT_REFERENCE_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def check_drift(reference: dict, features: pd.DataFrame) -> pd.DataFrame:
+    """
+    학습 분포 대비 PSI
+
+    Returns:
+        feature, psi, drifted (PSI_THRESHOLD 초과)
+    """
+    rows = []
+    for column, spec in reference['features'].items():
+        if column not in features.columns:
+            continue
+        values = features[column].dropna().to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            continue
+        edges = np.asarray(spec['edges'])
+        expected = np.asarray(spec['proportions']) + PSI_EPSILON
+        actual = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1) / len(values)
+        actual = actual + PSI_EPSILON
+        psi = float(((actual - expected) * np.log(actual / expected)).sum())
+        rows.append({'feature': column, 'psi': psi, 'drifted': psi > PSI_THRESHOLD})
+    return pd.DataFrame(rows, columns=['feature', 'psi', 'drifted'])
+
+
+def needs_retraining(reference, features: pd.DataFrame, monitor: AccuracyMonitor = None):
+    """
+    재학습 필요 여부
+
+    Returns:
+        (필요 여부, 사유 문자열)
+    """
+    if reference is None:
+        return True, '드리프트 기준 없음'
+
+    drift = check_drift(reference, features)
+    drifted = drift.loc[drift['drifted'], 'feature'].tolist()
+    if drifted:
+        return True, f"피처 드리프트: {', '.join(drifted)}"
+
+    baseline = reference.get('validation_rmse')
+    recent = monitor.recent_rmse() if monitor is not None else None
+    if baseline and recent is not None and recent > baseline * RMSE_TOLERANCE:
+        return True, f"최근 RMSE {recent:.2f} > 검증 RMSE {baseline:.2f} x {RMSE_TOLERANCE}"
+
+    return False, '드리프트 없음, 정확도 유지'
+
+
+def main():
+    print("=" * 60)
+    print("K-Fantasy AI - 예측 정확도 / 드리프트 모니터링")
+    print("=" * 60)
+
+    from dataset import load_table
+    from feature_store import compute_features, latest
+
+    match_scores = pd.read_csv(OUTPUT_DIR / 'fantasy_scores_by_match.csv')
+    match_info = load_table('match_info')
+
+    print("\n예측 정확도 갱신 중...")
+    monitor = AccuracyMonitor()
+    monitor.update(match_scores, match_info)
+
+    report = monitor.report()
+    if len(report):
+        print("\n누적 정확도:")
+        print(report[report['dimension'] != 'round'].round(2).to_string(index=False))
+
+    print("\n피처 드리프트 확인 중...")
+    reference = load_drift_reference()
+    if reference is None:
+        print("  - 드리프트 기준 없음 (prediction_model 학습 시 생성)")
+        return
+    current = latest(compute_features(match_scores, match_info))
+    print(check_drift(reference, current).round(3).to_string(index=False))
+
+    retrain, reason = needs_retraining(reference, current, monitor)
+    print(f"\n재학습 {'필요' if retrain else '불필요'}: {reason}")
+
+
+if __name__ == '__main__':
+    main()
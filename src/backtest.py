@@ -0,0 +1,438 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 시즌 백테스트
+============================
+"모델 추천 선수를 따랐다면 시즌 평균 기준 선택보다 나았을까?"를 검증
+
+절차 ((season, game_day) 순서로 라운드 재생, 여러 시즌은 이어서 재생):
+1. 라운드 r의 컨텍스트 = r 이전 라운드 경기만으로 계산한 시즌 통계/폼/예측/다크호스
+   (FantasyCalculator / FantasyPredictor / DarkHorseDetector를 그대로 사용, 미래 정보 누수 없음)
+   - 모델은 retrain_every 라운드마다 해당 시점까지의 데이터로 한 번 학습, 사이 라운드는 같은 모델 재사용
+     (통계/피처/예측은 라운드마다 r 이전 경기로 다시 계산)
+2. 전략별로 r 라운드 경기가 있는 팀의 선수 중 포메이션(4-3-3)에 맞춰 라인업 선택
+   (소속팀은 r 이전 마지막 경기 기준, 이후 이적은 반영하지 않음)
+3. 라인업을 r 라운드 실제 판타지 점수(fantasy_scores_by_match)로 채점
+
+병렬화:
+- 라운드 컨텍스트는 학습 기준 라운드(train_round)별 묶음 단위로 워커 프로세스에서 병렬 생성 후 디스크 캐시(pickle)
+- 전략 평가도 워커 프로세스에 분배 (캐시된 컨텍스트만 읽음)
+- 캐시 키에 입력 데이터 지문과 설정을 포함하여 데이터가 바뀌면 자동 무효화
+
+실행:
+    python backtest.py                         # outputs/의 실제 결과로 백테스트
+    python backtest.py --scale small           # 합성 데이터로 백테스트
+    python backtest.py --workers 4 --retrain-every 5
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dark_horse_detector import DarkHorseDetector
+from fantasy_calculator import FantasyCalculator
+from feature_store import _round_order, compute_features, match_rounds
+from prediction_model import HAS_LIGHTGBM, FantasyPredictor
+from transfer_planner import position_group
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+CACHE_DIR = OUTPUT_DIR / 'backtest_cache'
+
+FORMATION = {'GK': 1, 'DF': 4, 'MF': 3, 'FW': 3}
+MIN_HISTORY_ROUNDS = 3          # 이전 라운드가 이만큼 쌓인 뒤부터 평가
+RETRAIN_EVERY = 1
+BASELINE_STRATEGY = 'season_avg'
+CACHE_VERSION = 2               # 컨텍스트 구성이 바뀌면 증가 (이전 캐시 무효화)
+
+
+# ============================================================================
+# 전략 (컨텍스트 -> 선수별 선택 점수, 높을수록 우선)
+# ============================================================================
+
+def _stat(context, column):
+    stats = context['player_stats']
+    return pd.Series(stats[column].to_numpy(), index=stats['player_id'])
+
+
+def strategy_model(context):
+    """예측 점수 상위"""
+    predictions = context['predictions']
+    return pd.Series(predictions['predicted_score'].to_numpy(), index=predictions['player_id'])
+
+
+def strategy_season_avg(context):
+    """시즌 평균 상위 (기준 전략)"""
+    return _stat(context, 'avg_fantasy_score')
+
+
+def strategy_form(context):
+    """최근 5경기 평균 상위 (폼 없으면 시즌 평균)"""
+    stats = context['player_stats']
+    form = stats['recent_5_avg'].fillna(stats['avg_fantasy_score'])
+    return pd.Series(form.to_numpy(), index=stats['player_id'])
+
+
+def strategy_per_90(context):
+    """90분당 점수 상위 (출장 시간 없으면 시즌 평균)"""
+    column = 'fantasy_score_per_90' if 'fantasy_score_per_90' in context['player_stats'] else 'avg_fantasy_score'
+    return _stat(context, column)
+
+
+def strategy_dark_horse(context):
+    """다크호스 우선, 나머지는 예측 점수 순"""
+    priority = strategy_model(context)
+    dark_ids = context['dark_horses']['player_id'] if len(context['dark_horses']) else []
+    boost = priority.index.isin(dark_ids) * (priority.max() + 1)
+    return priority + boost
+
+
+def strategy_random(context):
+    """무작위 선택 (라운드 고정 시드)"""
+    stats = context['player_stats']
+    rng = np.random.default_rng(context['round'])
+    return pd.Series(rng.random(len(stats)), index=stats['player_id'])
+
+
+STRATEGIES = {
+    'model': strategy_model,
+    'season_avg': strategy_season_avg,
+    'form': strategy_form,
+    'per_90': strategy_per_90,
+    'dark_horse': strategy_dark_horse,
+    'random': strategy_random,
+}
+
+
+def select_lineup(scores: pd.Series, players: pd.DataFrame, formation=FORMATION) -> np.ndarray:
+    """
+    포메이션에 맞춰 그룹별 상위 선수 선택
+
+    Args:
+        scores: player_id -> 선택 점수
+        players: 출전 가능 선수 (player_id, main_position)
+    """
+    candidates = players[['player_id']].copy()
+    candidates['group'] = position_group(players['main_position']).to_numpy()
+    candidates['score'] = candidates['player_id'].map(scores).fillna(-np.inf).to_numpy()
+    candidates = candidates.sort_values('score', ascending=False, kind='stable')
+
+    slot = candidates.groupby('group').cumcount()
+    limit = candidates['group'].map(formation).fillna(0)
+    return candidates.loc[slot < limit, 'player_id'].to_numpy()
+
+
+# ============================================================================
+# 라운드 컨텍스트 (as-of 특성)
+# ============================================================================
+
+def fingerprint(match_scores: pd.DataFrame, match_info: pd.DataFrame, **settings) -> str:
+    """입력 데이터 + 설정 지문 (캐시 키)"""
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(match_scores[['game_id', 'player_id', 'fantasy_score']],
+                                             index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(match_rounds(match_info), index=False).to_numpy().tobytes())
+    digest.update(repr(sorted(settings.items())).encode())
+    return digest.hexdigest()[:16]
+
+
+def round_positions(match_info: pd.DataFrame) -> pd.Series:
+    """game_id -> (season, game_day) 순서의 라운드 번호 (0부터, 시즌이 바뀌어도 계속 증가)"""
+    rounds = match_rounds(match_info)
+    positions, _ = pd.factorize(_round_order(rounds)[0], sort=True)
+    return pd.Series(positions, index=rounds['game_id'].to_numpy())
+
+
+def train_model(match_scores, match_info, train_round):
+    """
+    train_round 이전 라운드 경기로 예측 모델 학습 (round_positions 기준 라운드 번호)
+
+    Returns:
+        학습된 모델 (학습 샘플 부족 시 None -> 예측은 가중 평균 폴백)
+    """
+    days = match_scores['game_id'].map(round_positions(match_info))
+    history = match_scores[days < train_round]
+
+    predictor = FantasyPredictor()
+    predictor.match_info = match_info
+    predictor.features = compute_features(history, match_info)
+    predictor.match_scores = history
+    predictor.prepare_training_data()
+    predictor.train_model()
+    return predictor.model
+
+
+def build_context(match_scores, match_info, round_no, model):
+    """
+    라운드 round_no 직전까지의 데이터로 통계/예측/다크호스 계산
+
+    Args:
+        round_no: round_positions 기준 라운드 번호
+        model: train_model 결과 (같은 train_round의 라운드끼리 공유)
+    """
+    days = match_scores['game_id'].map(round_positions(match_info))
+    history = match_scores[days < round_no]
+
+    calculator = FantasyCalculator()
+    calculator.match_info = match_info
+    player_stats = calculator.aggregate_player_stats(history)
+    recent_form = calculator.calculate_recent_form(history, n_matches=5)
+    player_stats = calculator.merge_recent_form(player_stats, recent_form)
+
+    predictor = FantasyPredictor()
+    predictor.player_stats = player_stats
+    predictor.match_info = match_info
+    predictor.features = compute_features(history, match_info)
+    predictor.match_scores = history
+    predictor.model = model
+    predictions = predictor.predict_next_round()
+
+    detector = DarkHorseDetector()
+    detector.player_stats = player_stats
+    detector.predictions = predictions
+    detector.match_scores = history
+    dark_horses = detector.detect_dark_horses()
+
+    return {
+        'round': round_no,
+        'player_stats': player_stats,
+        'predictions': predictions,
+        'dark_horses': dark_horses[['player_id']] if len(dark_horses) else pd.DataFrame(columns=['player_id']),
+    }
+
+
+def _context_path(cache_key, round_no) -> Path:
+    return CACHE_DIR / cache_key / f'round_{round_no:03d}.pkl'
+
+
+def _build_and_cache(args):
+    """
+    워커: 같은 train_round 라운드 묶음의 컨텍스트 생성 후 캐시 저장 (이미 있는 라운드는 생략)
+    모델은 묶음당 한 번만 학습
+
+    Returns:
+        (새로 만든 라운드 수, 캐시 재사용 라운드 수)
+    """
+    match_scores, match_info, rounds, train_round, cache_key = args
+    pending = [r for r in rounds if not _context_path(cache_key, r).exists()]
+    if not pending:
+        return 0, len(rounds)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = train_model(match_scores, match_info, train_round)
+        contexts = [build_context(match_scores, match_info, round_no, model) for round_no in pending]
+
+    for round_no, context in zip(pending, contexts):
+        path = _context_path(cache_key, round_no)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(context, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    return len(pending), len(rounds) - len(pending)
+
+
+# ============================================================================
+# 전략 평가
+# ============================================================================
+
+def _evaluate_strategy(args):
+    """워커: 한 전략을 전체 라운드에 대해 채점"""
+    name, rounds, round_keys, cache_key, actual, available = args
+    strategy = STRATEGIES[name]
+    rows = []
+    for round_no in rounds:
+        with open(_context_path(cache_key, round_no), 'rb') as f:
+            context = pickle.load(f)
+
+        players = available[round_no]
+        lineup = select_lineup(strategy(context), players)
+        round_scores = actual[round_no]
+        scores = round_scores.reindex(lineup).fillna(0.0)
+
+        season, game_day = round_keys[round_no]
+        rows.append({
+            'strategy': name,
+            'season': season,
+            'game_day': game_day,
+            'lineup_size': len(lineup),
+            'players_scored': int((scores != 0).sum()),
+            'score': round(float(scores.sum()), 2),
+            'best_possible': round(float(select_best(round_scores, players)), 2),
+        })
+    return rows
+
+
+def select_best(round_scores: pd.Series, players: pd.DataFrame) -> float:
+    """사후 최적 라인업 점수 (상한 비교용)"""
+    lineup = select_lineup(round_scores, players)
+    return round_scores.reindex(lineup).fillna(0.0).sum()
+
+
+class Backtester:
+    """라운드 재생 백테스트"""
+
+    def __init__(self, match_scores: pd.DataFrame, match_info: pd.DataFrame,
+                 retrain_every=RETRAIN_EVERY, min_history=MIN_HISTORY_ROUNDS, workers=None):
+        self.match_scores = match_scores
+        self.match_info = match_info
+        self.retrain_every = retrain_every
+        self.min_history = min_history
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.cache_key = fingerprint(match_scores, match_info, retrain_every=retrain_every,
+                                     lightgbm=HAS_LIGHTGBM, version=CACHE_VERSION)
+
+        # 라운드 번호 = (season, game_day) 순서 (round_positions)
+        positions = round_positions(match_info)
+        played = match_info['game_id'].isin(match_scores['game_id']).to_numpy()
+        self.positions = positions
+        self.rounds = [int(p) for p in np.unique(positions.to_numpy()[played])[min_history:]]
+        keys = match_rounds(match_info).set_index(positions.to_numpy())
+        self.round_keys = {int(p): (row.season, int(row.game_day))
+                           for p, row in keys[~keys.index.duplicated()].iterrows()}
+        self.results = None
+
+    def _train_round(self, round_no):
+        """재학습 주기에 맞춘 학습 기준 라운드"""
+        start = self.rounds[0]
+        return round_no - (round_no - start) % self.retrain_every
+
+    def _round_inputs(self):
+        """
+        라운드별 실제 점수(player_id -> 합계)와 출전 가능 선수(해당 라운드 경기가 있는 팀)
+
+        소속팀/포지션은 라운드 이전 마지막 경기 기준 (이후 이적이 과거 라운드 선수 풀에 섞이지 않도록)
+        """
+        scores = self.match_scores.assign(round_no=self.match_scores['game_id'].map(self.positions))
+        scores = scores.sort_values('round_no', kind='stable')
+        game_rounds = self.match_info['game_id'].map(self.positions)
+
+        actual, available = {}, {}
+        for round_no in self.rounds:
+            in_round = scores[scores['round_no'] == round_no]
+            actual[round_no] = in_round.groupby('player_id')['fantasy_score'].sum()
+
+            last = scores[scores['round_no'] < round_no].drop_duplicates('player_id', keep='last')
+            games = self.match_info[game_rounds == round_no]
+            if {'home_team_name', 'away_team_name'} <= set(games.columns):
+                teams = set(games['home_team_name']) | set(games['away_team_name'])
+                pool = last[last['team_name_ko'].isin(teams)]
+            else:
+                pool = last
+            available[round_no] = pool[['player_id', 'main_position']].reset_index(drop=True)
+        return actual, available
+
+    def prepare(self):
+        """라운드 컨텍스트 병렬 생성 (캐시)"""
+        print(f"\n라운드 컨텍스트 생성 중... ({len(self.rounds)}라운드, 워커 {self.workers}개)")
+
+        groups = {}
+        for r in self.rounds:
+            groups.setdefault(self._train_round(r), []).append(r)
+        tasks = [
+            (self.match_scores, self.match_info, rounds, train_round, self.cache_key)
+            for train_round, rounds in groups.items()
+        ]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            counts = list(pool.map(_build_and_cache, tasks))
+
+        built = sum(created for created, _ in counts)
+        print(f"  - 신규 {built}개, 캐시 재사용 {sum(reused for _, reused in counts)}개, "
+              f"모델 학습 {sum(created > 0 for created, _ in counts)}회 ({time.perf_counter() - start:.1f}s)")
+
+    def run(self, strategies=None) -> pd.DataFrame:
+        """전략 병렬 평가"""
+        strategies = strategies or list(STRATEGIES)
+        self.prepare()
+
+        print(f"\n전략 평가 중... ({len(strategies)}개)")
+        actual, available = self._round_inputs()
+        tasks = [(name, self.rounds, self.round_keys, self.cache_key, actual, available) for name in strategies]
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            rows = [row for result in pool.map(_evaluate_strategy, tasks) for row in result]
+        print(f"  - 평가 완료 ({time.perf_counter() - start:.1f}s)")
+
+        self.results = pd.DataFrame(rows)
+        return self.results
+
+    def summary(self, baseline=BASELINE_STRATEGY) -> pd.DataFrame:
+        """전략별 합계/평균/기준 전략 대비 승률"""
+        pivot = self.results.pivot(index=['season', 'game_day'], columns='strategy', values='score')
+        summary = pd.DataFrame({
+            'total': pivot.sum(),
+            'mean': pivot.mean().round(2),
+            'std': pivot.std().round(2),
+        })
+        if baseline in pivot.columns:
+            summary[f'win_rate_vs_{baseline}'] = (pivot.gt(pivot[baseline], axis=0).mean() * 100).round(1)
+        best = self.results.drop_duplicates(['season', 'game_day'])['best_possible'].sum()
+        summary['pct_of_best'] = (summary['total'] / best * 100).round(1) if best > 0 else 0.0
+        return summary.sort_values('total', ascending=False)
+
+
+def synthetic_inputs(scale, seed=42):
+    """합성 데이터로 경기별 판타지 점수 생성"""
+    import synthetic_data
+
+    raw_data, match_info = synthetic_data.generate(scale, seed=seed)
+    calculator = FantasyCalculator()
+    calculator.raw_data = raw_data
+    calculator.match_info = match_info
+    with contextlib.redirect_stdout(io.StringIO()):
+        goals = calculator.detect_goals()
+        assists = calculator.detect_assists(goals)
+        key_passes = calculator.detect_key_passes()
+        minutes_df = calculator.calculate_minutes()
+        team_stats = calculator.calculate_team_match_stats()
+        events_df = calculator.calculate_player_event_counts()
+        fantasy_df = calculator.calculate_fantasy_scores(events_df, assists, key_passes, [minutes_df], team_stats)
+    return fantasy_df, match_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 시즌 백테스트')
+    parser.add_argument('--scale', help='합성 데이터 규모 (미지정 시 outputs/ 결과 사용)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--retrain-every', type=int, default=RETRAIN_EVERY)
+    parser.add_argument('--strategies', help='쉼표 구분 전략 목록 (기본: 전체)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("K-Fantasy AI - 시즌 백테스트")
+    print("=" * 60)
+
+    if args.scale:
+        match_scores, match_info = synthetic_inputs(args.scale)
+    else:
+        from dataset import load_table
+        match_scores = pd.read_csv(OUTPUT_DIR / 'fantasy_scores_by_match.csv')
+        match_info = load_table('match_info')
+    print(f"  - 경기별 점수: {len(match_scores):,}건, 경기: {len(match_info)}경기")
+
+    backtester = Backtester(match_scores, match_info, retrain_every=args.retrain_every, workers=args.workers)
+    strategies = args.strategies.split(',') if args.strategies else None
+    results = backtester.run(strategies)
+
+    results.to_csv(OUTPUT_DIR / 'backtest_results.csv', index=False, encoding='utf-8-sig')
+
+    print("\n전략별 결과:")
+    print("-" * 60)
+    print(backtester.summary().to_string())
+    print(f"\n결과 저장: {OUTPUT_DIR / 'backtest_results.csv'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 파이프라인 성능 벤치마크
+=======================================
+합성 데이터(synthetic_data)로 각 단계의 실행 시간을 측정하고
+저장된 기준값(benchmarks/baselines.json)과 비교하여 성능 저하를 감지
+
+측정 단계:
+1. FantasyCalculator: 골/어시스트/키패스 감지, xG/xT, 점유 체인, 출장 시간, 팀 득실점, 이벤트 집계, 히트맵, 점수 계산, 시즌 통계, 최근 폼
+2. FantasyPredictor: 학습 데이터 준비, 모델 학습, 다음 라운드 예측
+3. DarkHorseDetector: 다크호스/급상승/저평가 탐지
+4. export_json: 선수/다크호스/포지션 랭킹/팀/요약/유사 선수 JSON 생성
+
+정확성 검증 (시간 측정 외):
+- 실시간 점수 재생(event_replay.check_replay): 작은 경기 부분집합 재생 합계 = 배치 결과
+
+실행:
+    python benchmark.py --scale small              # 기준값과 비교 (저하 또는 기준값 없는 단계가 있으면 종료 코드 1)
+    python benchmark.py --scale small --save       # 기준값 갱신 (단계를 추가/변경하면 함께 갱신)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import event_replay
+import export_json
+import synthetic_data
+from dark_horse_detector import DarkHorseDetector
+from fantasy_calculator import FantasyCalculator
+from heatmaps import PlayerHeatmaps
+from prediction_model import FantasyPredictor
+from pricing import availability, default_prices, recent_games
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+BASELINE_PATH = BASE_DIR / 'benchmarks' / 'baselines.json'
+
+# 성능 저하 판정: 기준 대비 THRESHOLD배 초과 + 최소 MIN_DELTA초 이상 느려진 경우
+THRESHOLD = 1.3
+MIN_DELTA = 0.05
+
+
+class Benchmark:
+    """단계별 실행 시간 측정기"""
+
+    def __init__(self, repeat=3, verbose=False):
+        self.repeat = repeat
+        self.verbose = verbose
+        self.results = {}
+        self.skipped = {}
+
+    def measure(self, name, func, *args, **kwargs):
+        """func를 repeat회 실행하여 최소 시간 기록, 마지막 결과 반환"""
+        timings = []
+        result = None
+        for _ in range(self.repeat):
+            out = io.StringIO()
+            redirect = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(out)
+            with redirect:
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                timings.append(time.perf_counter() - start)
+
+        self.results[name] = {
+            'min_sec': round(min(timings), 4),
+            'median_sec': round(float(np.median(timings)), 4),
+        }
+        print(f"  {name:<50} {min(timings):>9.4f}s")
+        return result
+
+    def skip(self, name, reason):
+        """측정값이 실제 작업을 반영하지 않는 단계는 결과에서 제외 (기준값으로 저장/비교하지 않음)"""
+        self.results.pop(name, None)
+        self.skipped[name] = reason
+        print(f"  {name:<50} 제외: {reason}")
+
+
+def run_pipeline(bench, raw_data, match_info):
+    """합성 데이터로 전체 파이프라인 단계 측정"""
+    # 1. 판타지 점수 계산
+    calculator = FantasyCalculator()
+    calculator.raw_data = raw_data
+    calculator.match_info = match_info
+
+    goals = bench.measure('calculator.detect_goals', calculator.detect_goals)
+    assists = bench.measure('calculator.detect_assists', calculator.detect_assists, goals)
+    key_passes = bench.measure('calculator.detect_key_passes', calculator.detect_key_passes)
+    xg_df = bench.measure('calculator.calculate_xg', calculator.calculate_xg)
+    xt_df = bench.measure('calculator.calculate_xt', calculator.calculate_xt)
+    chain_df = bench.measure('calculator.calculate_possession_chains', calculator.calculate_possession_chains)
+    minutes_df = bench.measure('calculator.calculate_minutes', calculator.calculate_minutes)
+    team_stats = bench.measure('calculator.calculate_team_match_stats', calculator.calculate_team_match_stats)
+    bench.measure('heatmaps.build', PlayerHeatmaps().build, raw_data)
+    events_df = bench.measure('calculator.calculate_player_event_counts',
+                              calculator.calculate_player_event_counts)
+    fantasy_df = bench.measure('calculator.calculate_fantasy_scores',
+                               calculator.calculate_fantasy_scores, events_df, assists, key_passes,
+                               [minutes_df, xg_df, xt_df, chain_df], team_stats)
+    player_stats = bench.measure('calculator.aggregate_player_stats',
+                                 calculator.aggregate_player_stats, fantasy_df)
+    recent_form = bench.measure('calculator.calculate_recent_form',
+                                calculator.calculate_recent_form, fantasy_df, 5)
+    player_stats = bench.measure('calculator.merge_recent_form',
+                                 calculator.merge_recent_form, player_stats, recent_form)
+
+    # 2. 예측 모델
+    predictor = FantasyPredictor()
+    predictor.player_stats = player_stats
+    predictor.match_scores = fantasy_df
+    predictor.match_info = match_info
+
+    bench.measure('predictor.prepare_training_data', predictor.prepare_training_data)
+    bench.measure('predictor.train_model', predictor.train_model)
+    if predictor.model is None:
+        bench.skip('predictor.train_model', '학습 샘플 부족으로 가중 평균 폴백 (더 큰 --scale 사용)')
+    predictions = bench.measure('predictor.predict_next_round', predictor.predict_next_round)
+
+    # 3. 다크호스 탐지
+    detector = DarkHorseDetector()
+    detector.player_stats = player_stats
+    detector.predictions = predictions
+    detector.match_scores = fantasy_df
+
+    dark_horses = bench.measure('detector.detect_dark_horses', detector.detect_dark_horses)
+    rising_stars = bench.measure('detector.detect_rising_stars', detector.detect_rising_stars)
+    underrated = bench.measure('detector.detect_underrated', detector.detect_underrated)
+
+    # 4. JSON 내보내기
+    data = {
+        'player_stats': player_stats,
+        'predictions': predictions,
+        'dark_horses': dark_horses,
+        'rising_stars': rising_stars,
+        'underrated': underrated,
+        'prices': default_prices(predictions),
+        'recent_games': bench.measure('pricing.recent_games', recent_games, fantasy_df, match_info),
+        'availability': bench.measure('pricing.availability', availability, fantasy_df, match_info),
+    }
+    players = bench.measure('export.create_players_json', export_json.create_players_json, data)
+    dh_json = bench.measure('export.create_dark_horses_json', export_json.create_dark_horses_json, data)
+    bench.measure('export.create_position_rankings_json', export_json.create_position_rankings_json, players)
+    bench.measure('export.create_team_stats_json', export_json.create_team_stats_json, data)
+    bench.measure('export.create_summary_json', export_json.create_summary_json, data, players, dh_json)
+    bench.measure('export.create_similar_players_json', export_json.create_similar_players_json, data)
+
+
+def compare(results, baseline, threshold=THRESHOLD, min_delta=MIN_DELTA):
+    """
+    기준값 대비 성능 저하 단계 목록
+
+    Returns:
+        (regressions, missing)
+        - regressions: [(단계, 기준 시간, 현재 시간, 비율)]
+        - missing: 기준값이 없는 단계 (새로 추가된 단계 등, 비교할 수 없으므로 실패로 취급)
+    """
+    regressions = []
+    missing = [name for name in results if name not in baseline]
+    for name, result in results.items():
+        if name in missing:
+            continue
+        base = baseline[name]['min_sec']
+        current = result['min_sec']
+        if current > base * threshold and current - base > min_delta:
+            regressions.append((name, base, current, current / base if base > 0 else float('inf')))
+    return regressions, missing
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 파이프라인 벤치마크')
+    parser.add_argument('--scale', choices=list(synthetic_data.SCALES), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save', action='store_true', help='현재 결과를 기준값으로 저장')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--verbose', action='store_true', help='단계 출력 표시')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("K-Fantasy AI - 파이프라인 벤치마크")
+    print("=" * 60)
+
+    raw_data, match_info = synthetic_data.generate(args.scale, seed=args.seed)
+    print(f"  - 규모: {args.scale} (이벤트 {len(raw_data):,}건, {len(match_info)}경기)\n")
+
+    bench = Benchmark(repeat=args.repeat, verbose=args.verbose)
+    run_pipeline(bench, raw_data, match_info)
+
+    replay_mismatches = event_replay.check_replay(raw_data)
+    print(f"\n실시간 재생 검증 (경기 수: 불일치): {replay_mismatches}")
+    if any(replay_mismatches.values()):
+        print("실시간 점수 합계가 배치 결과와 다릅니다.")
+        sys.exit(1)
+
+    baselines = {}
+    if BASELINE_PATH.exists():
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)
+
+    if args.save:
+        baselines[args.scale] = {
+            'events': len(raw_data),
+            'environment': environment(),
+            'stages': bench.results,
+        }
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2)
+        print(f"\n기준값 저장: {BASELINE_PATH}")
+        return
+
+    if args.scale not in baselines:
+        print(f"\n'{args.scale}' 기준값 없음 (--save로 생성)")
+        return
+
+    regressions, missing = compare(bench.results, baselines[args.scale]['stages'], args.threshold)
+
+    print("\n" + "=" * 60)
+    if missing:
+        print(f"기준값 없는 단계: {len(missing)}개 (--save로 기준값 갱신 필요)")
+        for name in missing:
+            print(f"  - {name}")
+    if regressions:
+        print(f"성능 저하 감지: {len(regressions)}개 단계 (기준 x{args.threshold} 초과)")
+        for name, base, current, ratio in regressions:
+            print(f"  - {name}: {base:.4f}s -> {current:.4f}s (x{ratio:.2f})")
+    if missing or regressions:
+        print("=" * 60)
+        sys.exit(1)
+
+    print("성능 저하 없음")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
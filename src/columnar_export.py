@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 컬럼형 바이너리 내보내기
+========================================
+players.json (선수마다 같은 키 반복)을 필드별 타입 배열로 묶은 바이너리 파일로 저장
+
+파일 구조 (web/public/data/players.bin, 리틀 엔디언):
+    [uint32 헤더 길이][헤더 JSON (UTF-8)][패딩][컬럼 버퍼 ...]
+
+헤더:
+- count: 선수 수
+- columns: [{name, type, offset, length, decimals?, dictionary?, null?}, ...]
+  - type: float32 / int32 / uint16 (offset은 파일 시작 기준, ALIGNMENT 배수)
+  - decimals: 원래 JSON 반올림 자릿수 (float32 -> 소수 복원용)
+  - dictionary: 문자열 컬럼 (name/team/position)은 코드 배열 + 사전
+  - null: 정수 컬럼 결측 값 (float32 결측은 NaN)
+- 중첩 필드는 점으로 표기 (contributions.recentForm)
+- 가변 길이 배열 (recentGames)은 포함하지 않음
+
+브라우저는 fetch().arrayBuffer() 후 new Float32Array(buffer, offset, length)로
+복사 없이 읽음 (web/src/lib/columnar.ts)
+"""
+
+import gzip
+import json
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DATA_DIR = BASE_DIR / 'web' / 'public' / 'data'
+COLUMNAR_PATH = PUBLIC_DATA_DIR / 'players.bin'
+
+FORMAT_VERSION = 1
+# 컬럼 시작 정렬 (Float64Array 뷰까지 허용)
+ALIGNMENT = 8
+INT_NULL = -1
+
+# (필드, 타입, 반올림 자릿수) - players.json 필드 순서
+PLAYER_COLUMNS = [
+    ('id', 'int32', None),
+    ('name', 'dictionary', None),
+    ('team', 'dictionary', None),
+    ('position', 'dictionary', None),
+    ('predictedScore', 'float32', 1),
+    ('recentAvg', 'float32', 1),
+    ('seasonAvg', 'float32', 1),
+    ('formIndex', 'float32', 2),
+    ('matchesPlayed', 'int32', None),
+    ('minutesPlayed', 'float32', 1),
+    ('scorePer90', 'float32', 1),
+    ('totalGoals', 'int32', None),
+    ('totalAssists', 'int32', None),
+    ('contributions.recentForm', 'float32', 1),
+    ('contributions.seasonAvg', 'float32', 1),
+    ('contributions.position', 'float32', 1),
+    ('contributions.goals', 'float32', 1),
+    ('contributions.assists', 'float32', 1),
+    ('price', 'float32', 1),
+    ('valueRating', 'float32', 2),
+    ('priceChange', 'float32', 1),
+    ('ownership', 'float32', 1),
+    ('availability.status', 'dictionary', None),
+    ('availability.reason', 'dictionary', None),
+    ('availability.lastUpdated', 'dictionary', None),
+    ('rank', 'int32', None),
+    ('positionRank', 'int32', None),
+]
+
+DTYPES = {'float32': '<f4', 'int32': '<i4', 'uint16': '<u2'}
+
+
+def _field(player: dict, name: str):
+    value = player
+    for key in name.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _column_values(players: list, name: str, kind: str):
+    """컬럼 배열과 헤더 항목 (사전 컬럼은 등장 순서 사전 + 코드)"""
+    values = [_field(p, name) for p in players]
+
+    if kind == 'dictionary':
+        dictionary = list(dict.fromkeys(v for v in values if v is not None))
+        codes = {value: i for i, value in enumerate(dictionary)}
+        dtype = 'uint16' if len(dictionary) < 0xFFFF else 'int32'
+        null = 0xFFFF if dtype == 'uint16' else INT_NULL
+        array = np.array([codes.get(v, null) for v in values], dtype=DTYPES[dtype])
+        return array, {'type': dtype, 'dictionary': dictionary, 'null': null}
+
+    if kind == 'float32':
+        array = np.array([np.nan if v is None else v for v in values], dtype=DTYPES[kind])
+        return array, {'type': kind}
+
+    array = np.array([INT_NULL if v is None else v for v in values], dtype=DTYPES[kind])
+    return array, {'type': kind, 'null': INT_NULL}
+
+
+def encode_players(players: list, columns=PLAYER_COLUMNS) -> bytes:
+    """선수 목록 -> 컬럼형 바이너리"""
+    arrays = []
+    specs = []
+    for name, kind, decimals in columns:
+        # 전 선수에 없는 선택 필드는 생략 (예: 출장 시간 미계산)
+        if all(_field(p, name) is None for p in players):
+            continue
+        array, spec = _column_values(players, name, kind)
+        spec = {'name': name, **spec, 'length': len(array)}
+        if decimals is not None:
+            spec['decimals'] = decimals
+        arrays.append(array)
+        specs.append(spec)
+
+    def header_bytes(offsets):
+        header = {
+            'version': FORMAT_VERSION,
+            'count': len(players),
+            'columns': [{**spec, 'offset': offset} for spec, offset in zip(specs, offsets)],
+        }
+        return json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def align(position):
+        return -(-position // ALIGNMENT) * ALIGNMENT
+
+    # 오프셋 자릿수가 바뀌면 헤더 길이도 바뀌므로 고정될 때까지 반복
+    offsets = [0] * len(arrays)
+    while True:
+        header = header_bytes(offsets)
+        position = align(4 + len(header))
+        new_offsets = []
+        for array in arrays:
+            new_offsets.append(position)
+            position = align(position + array.nbytes)
+        if new_offsets == offsets:
+            break
+        offsets = new_offsets
+
+    blob = bytearray(position)
+    blob[:4] = struct.pack('<I', len(header))
+    blob[4:4 + len(header)] = header
+    for array, offset in zip(arrays, offsets):
+        blob[offset:offset + array.nbytes] = array.tobytes()
+    return bytes(blob)
+
+
+def decode_columns(blob: bytes):
+    """
+    컬럼형 바이너리 -> (헤더, 컬럼 이름 -> NumPy 배열)
+
+    배열은 blob을 복사하지 않는 읽기 전용 뷰 (브라우저 TypedArray 뷰와 같은 방식)
+    """
+    (header_length,) = struct.unpack_from('<I', blob, 0)
+    header = json.loads(bytes(blob[4:4 + header_length]).decode('utf-8'))
+    columns = {
+        spec['name']: np.frombuffer(blob, dtype=DTYPES[spec['type']], count=spec['length'], offset=spec['offset'])
+        for spec in header['columns']
+    }
+    return header, columns
+
+
+def decode_players(blob: bytes) -> list:
+    """컬럼형 바이너리 -> players.json과 같은 선수 목록 (왕복 검증용)"""
+    header, columns = decode_columns(blob)
+    specs = {spec['name']: spec for spec in header['columns']}
+    players = [{} for _ in range(header['count'])]
+
+    for name, array in columns.items():
+        spec = specs[name]
+        if 'dictionary' in spec:
+            dictionary = spec['dictionary']
+            values = [None if code == spec['null'] else dictionary[code] for code in array.tolist()]
+        elif spec['type'] == 'float32':
+            values = [None if np.isnan(v) else round(v, spec.get('decimals', 6)) for v in array.tolist()]
+        else:
+            values = [None if v == spec['null'] else v for v in array.tolist()]
+
+        *parents, key = name.split('.')
+        for player, value in zip(players, values):
+            if value is None:
+                continue
+            target = player
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[key] = value
+
+    return players
+
+
+def _normalize(value):
+    """비교용: 정수값 float(2.0)과 int(2)를 같게 취급, 바이너리에 없는 배열 필드 제외"""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None and not isinstance(v, list)}
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def compare_formats(players: list, repeat=20) -> dict:
+    """JSON 대비 크기 / 파싱 시간 비교"""
+    json_bytes = json.dumps(players, ensure_ascii=False, indent=2).encode('utf-8')
+    blob = encode_players(players)
+
+    def best_time(func):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
+
+    result = {
+        'json_bytes': len(json_bytes),
+        'json_gzip_bytes': len(gzip.compress(json_bytes)),
+        'binary_bytes': len(blob),
+        'binary_gzip_bytes': len(gzip.compress(blob)),
+        'json_parse_ms': best_time(lambda: json.loads(json_bytes)),
+        'binary_parse_ms': best_time(lambda: decode_columns(blob)),
+        'roundtrip_ok': [_normalize(p) for p in decode_players(blob)] == [_normalize(p) for p in players],
+    }
+
+    print(f"  - JSON:   {result['json_bytes'] / 1024:.1f}KB (gzip {result['json_gzip_bytes'] / 1024:.1f}KB), "
+          f"파싱 {result['json_parse_ms']:.2f}ms")
+    print(f"  - 바이너리: {result['binary_bytes'] / 1024:.1f}KB (gzip {result['binary_gzip_bytes'] / 1024:.1f}KB), "
+          f"파싱 {result['binary_parse_ms']:.2f}ms")
+    print(f"  - 왕복 일치: {'예' if result['roundtrip_ok'] else '아니오'}")
+    return result
+
+
+def save_columnar(players: list, path=COLUMNAR_PATH) -> int:
+    """컬럼형 바이너리 저장 (내용이 같으면 다시 쓰지 않음)"""
+    path = Path(path)
+    blob = encode_players(players)
+    if path.exists() and path.read_bytes() == blob:
+        print(f"  변경 없음: {path}")
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(blob)
+        print(f"  저장: {path} ({len(blob) / 1024:.1f}KB)")
+    return len(blob)
+
+
+def main():
+    print("=" * 60)
+    print("K-Fantasy AI - 컬럼형 바이너리 내보내기")
+    print("=" * 60)
+
+    with open(PUBLIC_DATA_DIR / 'players.json', encoding='utf-8') as f:
+        players = json.load(f)
+
+    print(f"\n선수 {len(players)}명 형식 비교 중...")
+    compare_formats(players)
+
+    print()
+    save_columnar(players)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,10 +15,16 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from ranking_index import RankingIndex
+
 # 경로 설정
 BASE_DIR = Path(__file__).parent.parent
 OUTPUT_DIR = BASE_DIR / 'outputs'
 
+# 저평가 선수 출장 시간 범위 (분): 최소 2경기분 이상, 10경기분 미만
+UNDERRATED_MIN_MINUTES = 180
+UNDERRATED_MAX_MINUTES = 900
+
 
 class DarkHorseDetector:
     """다크호스 선수 탐지기"""
@@ -133,13 +139,24 @@ class DarkHorseDetector:
 
         df = self.player_stats.copy()
 
-        # 출장 기회 적지만 평균 점수 높은 선수
-        underrated_mask = (
-            (df['matches_played'] < 10) &
-            (df['avg_fantasy_score'] > df['avg_fantasy_score'].quantile(0.7))
-        )
-
-        underrated = df[underrated_mask].sort_values('avg_fantasy_score', ascending=False)
+        if 'total_minutes' in df.columns:
+            # 출장 시간 적지만 90분당 점수 높은 선수 (짧은 교체 출전 과대 평가 방지)
+            eligible = df['total_minutes'] >= UNDERRATED_MIN_MINUTES
+            underrated_mask = (
+                eligible &
+                (df['total_minutes'] < UNDERRATED_MAX_MINUTES) &
+                (df['fantasy_score_per_90'] > df.loc[eligible, 'fantasy_score_per_90'].quantile(0.7))
+            )
+            sort_column = 'fantasy_score_per_90'
+        else:
+            # 출장 기회 적지만 평균 점수 높은 선수
+            underrated_mask = (
+                (df['matches_played'] < 10) &
+                (df['avg_fantasy_score'] > df['avg_fantasy_score'].quantile(0.7))
+            )
+            sort_column = 'avg_fantasy_score'
+
+        underrated = df[underrated_mask].sort_values(sort_column, ascending=False)
 
         self.underrated = underrated
         print(f"  - 저평가 선수: {len(underrated)}명")
@@ -175,15 +192,10 @@ class DarkHorseDetector:
         return " / ".join(reasons) if reasons else "잠재력 발견"
 
     def get_position_dark_horses(self):
-        """포지션별 다크호스"""
-        position_dh = {}
-
-        for position in self.dark_horses['main_position'].unique():
-            pos_df = self.dark_horses[self.dark_horses['main_position'] == position]
-            if len(pos_df) > 0:
-                position_dh[position] = pos_df.head(3).to_dict('records')
-
-        return position_dh
+        """포지션별 다크호스 (폼 상승률 TOP 3)"""
+        index = RankingIndex(self.dark_horses)
+        return {position: top.to_dict('records')
+                for position, top in index.top_k_by('position', 'form_surge', 3).items()}
 
     def save_results(self):
         """결과 저장"""
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 다중 시즌/대회 데이터셋 로더
+===========================================
+데이터 루트 아래 Hive 스타일 파티션에서 raw_data / match_info 테이블 로드
+
+데이터 루트:
+- 환경 변수 KFANTASY_DATA_ROOT (미지정 시 저장소 상위의 _shared/data)
+
+레이아웃:
+    <root>/season=2024/competition=kleague1/round=1/raw_data.csv (또는 .parquet)
+    <root>/season=2024/competition=kleague1/round=1/match_info.csv
+    ...
+- 파티션 키는 PARTITION_KEYS 순서의 일부만 사용해도 됨 (예: season=2024/raw_data.csv)
+- 파티션 폴더가 없으면 루트의 raw_data.csv / match_info.csv 단일 파일로 로드 (기존 레이아웃)
+
+필터 푸시다운:
+- season / competition / rounds 조건은 폴더 이름으로 먼저 걸러서 해당 파일만 읽음
+- 읽은 행에는 파티션 값이 컬럼으로 추가됨 (season, competition, round)
+"""
+
+import importlib.util
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+DATA_ROOT = Path(os.environ.get('KFANTASY_DATA_ROOT', BASE_DIR.parent / '_shared' / 'data'))
+
+PARTITION_KEYS = ['season', 'competition', 'round']
+FILE_FORMATS = ['.parquet', '.csv']
+
+
+def _parse_value(value):
+    """파티션 값 (정수면 int)"""
+    return int(value) if value.lstrip('-').isdigit() else value
+
+
+def parse_filter(text):
+    """CLI 필터 문자열 -> 조건 ('2024', '2023,2024', '1-10' 범위)"""
+    if text is None:
+        return None
+    if ',' in text:
+        return [_parse_value(value.strip()) for value in text.split(',')]
+    low, sep, high = text.partition('-')
+    if sep and low.isdigit() and high.isdigit():
+        return int(low), int(high)
+    return _parse_value(text)
+
+
+def discover_partitions(root=None) -> pd.DataFrame:
+    """
+    데이터 루트의 파티션 폴더 목록
+
+    Returns:
+        PARTITION_KEYS 컬럼 (없는 키는 None) + path, 파티션이 없으면 빈 DataFrame
+    """
+    root = Path(root or DATA_ROOT)
+    partitions = []
+
+    def walk(directory, values, depth):
+        children = sorted(p for p in directory.iterdir() if p.is_dir() and '=' in p.name) \
+            if directory.exists() else []
+        keyed = [p for p in children if p.name.split('=', 1)[0] in PARTITION_KEYS[depth:]]
+        if not keyed:
+            if values:
+                partitions.append({**values, 'path': directory})
+            return
+        for child in keyed:
+            key, value = child.name.split('=', 1)
+            walk(child, {**values, key: _parse_value(value)}, PARTITION_KEYS.index(key) + 1)
+
+    walk(root, {}, 0)
+    return pd.DataFrame(partitions, columns=PARTITION_KEYS + ['path'])
+
+
+def _matches(values: pd.Series, condition) -> pd.Series:
+    """파티션 값 조건 (스칼라, 리스트/range, (min, max) 튜플)"""
+    if condition is None:
+        return pd.Series(True, index=values.index)
+    if isinstance(condition, tuple) and len(condition) == 2:
+        low, high = condition
+        return values.map(lambda value: value is not None and not pd.isna(value) and low <= value <= high)
+    if isinstance(condition, (list, set, range, np.ndarray, pd.Index)):
+        return values.isin(list(condition))
+    return values == condition
+
+
+def select_partitions(root=None, season=None, competition=None, rounds=None) -> pd.DataFrame:
+    """조건에 맞는 파티션만 선택 (지정한 키가 없는 파티션은 제외)"""
+    partitions = discover_partitions(root)
+    mask = pd.Series(True, index=partitions.index)
+    for key, condition in zip(PARTITION_KEYS, [season, competition, rounds]):
+        mask &= _matches(partitions[key], condition)
+    return partitions[mask].reset_index(drop=True)
+
+
+def _table_file(directory: Path, table: str):
+    for suffix in FILE_FORMATS:
+        path = directory / f'{table}{suffix}'
+        if path.exists():
+            return path
+    return None
+
+
+def _read(path: Path) -> pd.DataFrame:
+    if path.suffix == '.parquet':
+        if not HAS_PYARROW:
+            raise ImportError(f"pyarrow 미설치: {path} 읽기 불가")
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def load_table(table: str, root=None, season=None, competition=None, rounds=None) -> pd.DataFrame:
+    """
+    테이블 로드 (조건에 맞는 파티션 파일만 읽음)
+
+    Args:
+        table: 'raw_data' 또는 'match_info'
+        season, competition, rounds: 스칼라, 리스트/range, 또는 (min, max) 튜플
+    """
+    root = Path(root or DATA_ROOT)
+    partitions = discover_partitions(root)
+
+    # 기존 단일 파일 레이아웃 (필터 없이 전체 로드)
+    if len(partitions) == 0:
+        path = _table_file(root, table)
+        if path is None:
+            raise FileNotFoundError(f"{table} 파일 없음: {root}")
+        if any(condition is not None for condition in [season, competition, rounds]):
+            print(f"  - 파티션 없음, {path.name} 전체 로드 (필터 무시)")
+        return _read(path)
+
+    selected = select_partitions(root, season, competition, rounds)
+    frames = []
+    for partition in selected.itertuples(index=False):
+        path = _table_file(partition.path, table)
+        if path is None:
+            continue
+        frame = _read(path)
+        for key in PARTITION_KEYS:
+            value = getattr(partition, key)
+            if value is not None and not pd.isna(value):
+                frame[key] = value
+        frames.append(frame)
+
+    print(f"  - {table}: 파티션 {len(frames)}/{len(partitions)}개 로드")
+    if not frames:
+        raise FileNotFoundError(f"조건에 맞는 {table} 파티션 없음: {root}")
+
+    data = pd.concat(frames, ignore_index=True)
+    # 파티션 값 컬럼은 범주형으로 (이벤트 테이블 메모리 절약)
+    for key in PARTITION_KEYS:
+        if key in data.columns and not pd.api.types.is_numeric_dtype(data[key]):
+            data[key] = data[key].astype('category')
+    return data
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 데이터셋 파티션 조회')
+    parser.add_argument('--root', default=None, help=f'데이터 루트 (기본: {DATA_ROOT})')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("K-Fantasy AI - 데이터셋 파티션")
+    print("=" * 60)
+
+    partitions = discover_partitions(args.root)
+    print(f"\n데이터 루트: {args.root or DATA_ROOT}")
+    if len(partitions) == 0:
+        print("  - 파티션 없음 (단일 파일 레이아웃)")
+        return
+
+    print(f"  - 파티션: {len(partitions)}개")
+    summary = partitions.groupby(['season', 'competition'], dropna=False).size()
+    print(summary.to_string())
+
+
+if __name__ == '__main__':
+    main()
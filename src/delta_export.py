@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 선수 데이터 델타 내보내기
+========================================
+라운드마다 players.json 전체를 다시 받지 않도록 이전 내보내기 대비 변경분만 델타 파일로 생성
+
+상태 (outputs/export_state.json, 웹에 배포하지 않음):
+- version: 마지막 내보내기 버전
+- hashes: 선수 id -> 내용 해시 (순위 필드 제외)
+- ranks: 선수 id -> [rank, positionRank]
+
+델타 (web/public/data/deltas/<version>.json):
+- changed: 내용이 바뀌었거나 새로 추가된 선수 (순위 필드 제외한 전체 객체)
+- ranks: 순위만 바뀐 선수 포함, 순위가 바뀐 모든 선수의 [rank, positionRank]
+  (한 선수의 점수 변화로 다른 선수 순위가 밀려도 전체 객체를 다시 보내지 않음)
+- removed: 빠진 선수 id
+
+클라이언트는 deltas/manifest.json의 버전을 보고 캐시된 기준 스냅샷에
+baseVersion+1 ~ version 델타를 순서대로 적용 (web/src/lib/deltaSync.ts)
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+EXPORT_STATE_PATH = OUTPUT_DIR / 'export_state.json'
+DELTA_DIR = BASE_DIR / 'web' / 'public' / 'data' / 'deltas'
+
+# 다른 선수 변경에 따라 바뀌는 파생 필드 (ranks로 따로 전송)
+RANK_FIELDS = ['rank', 'positionRank']
+# 보관할 최근 델타 수 (이보다 오래된 캐시는 전체 스냅샷 다시 로드)
+MAX_DELTAS = 20
+
+
+def _compact(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def player_content(player: dict) -> dict:
+    """순위 필드를 제외한 선수 객체"""
+    return {k: v for k, v in player.items() if k not in RANK_FIELDS}
+
+
+def content_hash(player: dict) -> str:
+    """선수 내용 해시 (키 정렬 후 직렬화, 순위 필드 제외)"""
+    return hashlib.sha1(_compact(player_content(player))).hexdigest()[:16]
+
+
+def load_state(path=EXPORT_STATE_PATH) -> dict:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'version': 0, 'hashes': {}, 'ranks': {}}
+
+
+def build_delta(players: list, state: dict):
+    """
+    이전 상태 대비 델타 계산
+
+    Returns:
+        (delta 또는 None, 새 상태) - 첫 내보내기이거나 변경이 없으면 delta는 None
+    """
+    hashes = {str(p['id']): content_hash(p) for p in players}
+    ranks = {str(p['id']): [p.get('rank'), p.get('positionRank')] for p in players}
+
+    previous_hashes = state.get('hashes', {})
+    previous_ranks = state.get('ranks', {})
+    version = state.get('version', 0)
+
+    changed = [player_content(p) for p in players if previous_hashes.get(str(p['id'])) != hashes[str(p['id'])]]
+    rank_changes = {pid: rank for pid, rank in ranks.items() if previous_ranks.get(pid) != rank}
+    removed = sorted(int(pid) for pid in previous_hashes if pid not in hashes)
+
+    if version > 0 and not (changed or rank_changes or removed):
+        return None, state
+
+    new_state = {'version': version + 1, 'hashes': hashes, 'ranks': ranks}
+    if version == 0:
+        # 기준 스냅샷만 존재 (적용할 이전 버전 없음)
+        return None, new_state
+
+    delta = {
+        'version': version + 1,
+        'baseVersion': version,
+        'generatedAt': datetime.now().isoformat(),
+        'changed': changed,
+        'ranks': rank_changes,
+        'removed': removed,
+    }
+    return delta, new_state
+
+
+def save_delta(delta, state: dict, delta_dir=DELTA_DIR, state_path=EXPORT_STATE_PATH) -> dict:
+    """
+    델타 파일/매니페스트/상태 저장 (MAX_DELTAS보다 오래된 델타 삭제)
+
+    Returns:
+        매니페스트
+    """
+    delta_dir = Path(delta_dir)
+    delta_dir.mkdir(parents=True, exist_ok=True)
+
+    if delta is not None:
+        with open(delta_dir / f"{delta['version']}.json", 'wb') as f:
+            f.write(_compact(delta))
+
+    available = sorted(int(path.stem) for path in delta_dir.glob('*.json') if path.stem.isdigit())
+    for version in available[:-MAX_DELTAS]:
+        (delta_dir / f'{version}.json').unlink()
+    available = available[-MAX_DELTAS:]
+    # 현재 버전까지 끊김 없이 이어지는 델타만 사용 가능
+    chain = []
+    for version in reversed(available):
+        if version != state['version'] - len(chain):
+            break
+        chain.insert(0, version)
+
+    manifest = {'version': state['version'], 'deltas': chain, 'snapshot': 'players.json'}
+    with open(delta_dir / 'manifest.json', 'wb') as f:
+        f.write(_compact(manifest))
+
+    Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, separators=(',', ':'))
+
+    return manifest
+
+
+def export_delta(players: list) -> dict:
+    """선수 목록 델타 내보내기 (export_json.main에서 players.json 저장 시 호출)"""
+    print("선수 델타 생성 중...")
+    delta, state = build_delta(players, load_state())
+    manifest = save_delta(delta, state)
+
+    if delta is None:
+        print(f"  - 변경 없음 또는 기준 스냅샷 (버전 {state['version']})")
+        return manifest
+
+    # 비교 기준: 웹앱이 내려받는 players.json (export_json.save_json 형식)
+    full_size = len(json.dumps(players, ensure_ascii=False, indent=2).encode('utf-8'))
+    delta_size = len(_compact(delta))
+    print(f"  - 버전 {delta['baseVersion']} -> {delta['version']}: "
+          f"변경 {len(delta['changed'])}명, 순위 {len(delta['ranks'])}명, 제거 {len(delta['removed'])}명")
+    print(f"  - 크기: {delta_size / 1024:.1f}KB (전체 {full_size / 1024:.1f}KB 대비 {delta_size / full_size:.1%})")
+    return manifest
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 이벤트 재생 및 처리량 벤치마크
+=============================================
+과거 경기 이벤트(데이터셋 raw_data 테이블 또는 --path 파일)를 경기 시간 순으로
+재생하여 실시간 점수 파이프라인(LiveScorer)의 성능과 정확성을 측정
+
+측정 항목:
+1. 처리량 (events/sec)
+2. 이벤트별 처리 시간 히스토그램 (µs), 배속 재생 시 예정 시각 대비 지연 (ms)
+3. 메모리 사용량 (최대 RSS, 선택적으로 tracemalloc 최대 힙)
+4. 정확성: FantasyCalculator 배치 결과와 스트리밍 합계 비교 (불일치 시 종료 코드 1)
+   - check_replay: 앞에서부터 1경기, 2경기 ... 작은 부분집합마다 비교
+     (어시스트/골이 없는 경기 등 경계 조건 확인, benchmark.py에서도 실행)
+
+실행:
+    python event_replay.py --speeds 1 10 max --games 2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataset import DATA_ROOT, load_table
+from instrumentation import peak_rss_mb
+from live_scorer import LiveScorer, compare_with_batch, run_batch
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+
+# 처리 시간 히스토그램 구간 (µs)
+LATENCY_BINS_US = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, np.inf]
+
+# check_replay 부분집합 크기 (앞에서부터 n경기)
+CHECK_GAMES = [1, 2, 4]
+
+
+def load_events(path=None, games=None) -> pd.DataFrame:
+    """
+    원본 이벤트 로드
+
+    Args:
+        path: 파일 경로 (None이면 데이터 루트의 raw_data 테이블, 파티션 레이아웃 포함 - dataset.load_table)
+        games: 앞에서부터 사용할 경기 수 (None이면 전체)
+    """
+    if path is None:
+        print(f"이벤트 로드 중: {DATA_ROOT}")
+        raw_data = load_table('raw_data')
+    else:
+        path = Path(path)
+        print(f"이벤트 로드 중: {path}")
+        if path.suffix == '.parquet':
+            raw_data = pd.read_parquet(path)
+        else:
+            raw_data = pd.read_csv(path)
+
+    if games is not None:
+        raw_data = first_games(raw_data, games)
+
+    print(f"  - 이벤트: {len(raw_data):,}건, 경기: {raw_data['game_id'].nunique()}경기")
+    return raw_data
+
+
+def first_games(raw_data: pd.DataFrame, games: int) -> pd.DataFrame:
+    """game_id 순으로 앞에서부터 games경기만 선택"""
+    game_ids = sorted(raw_data['game_id'].unique())[:games]
+    return raw_data[raw_data['game_id'].isin(game_ids)]
+
+
+def replay_order(raw_data: pd.DataFrame, concurrent=True) -> pd.DataFrame:
+    """
+    재생 순서 정렬
+    - concurrent=True: 모든 경기가 동시에 킥오프한 것처럼 time_seconds 기준 병합
+    - concurrent=False: 경기별로 순차 재생
+    """
+    keys = ['time_seconds', 'game_id'] if concurrent else ['game_id', 'time_seconds']
+    return raw_data.sort_values(keys, kind='stable').reset_index(drop=True)
+
+
+def replay(events, speed=None, trace_memory=False):
+    """
+    이벤트를 LiveScorer로 재생
+
+    Args:
+        events: 재생 순서로 정렬된 이벤트 dict 목록
+        speed: 배속 (None이면 최대 속도)
+        trace_memory: tracemalloc으로 파이썬 힙 최대치 측정 (처리 시간에 오버헤드 발생)
+
+    Returns:
+        (LiveScorer, 측정 결과 dict)
+    """
+    scorer = LiveScorer()
+    n = len(events)
+    service = np.empty(n, dtype=np.float64)
+    lag = np.zeros(n, dtype=np.float64)
+    delta_count = 0
+
+    if trace_memory:
+        tracemalloc.start()
+
+    perf_counter = time.perf_counter
+    process_event = scorer.process_event
+    base_time = events[0]['time_seconds'] if n else 0.0
+    start = perf_counter()
+
+    for i, event in enumerate(events):
+        if speed is not None:
+            scheduled = (event['time_seconds'] - base_time) / speed
+            ahead = scheduled - (perf_counter() - start)
+            if ahead > 0.001:
+                time.sleep(ahead)
+
+        t0 = perf_counter()
+        delta_count += len(process_event(event))
+        t1 = perf_counter()
+        service[i] = t1 - t0
+        if speed is not None:
+            lag[i] = (t1 - start) - scheduled
+
+    # 경기 종료 처리 (출장 시간 확정, 클린시트)
+    delta_count += len(scorer.finish())
+    elapsed = perf_counter() - start
+
+    heap_peak_mb = None
+    if trace_memory:
+        heap_peak_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        tracemalloc.stop()
+
+    service_us = service * 1e6
+    counts, _ = np.histogram(service_us, bins=LATENCY_BINS_US)
+    histogram = {
+        _bin_label(LATENCY_BINS_US[i], LATENCY_BINS_US[i + 1]): int(c)
+        for i, c in enumerate(counts) if c > 0
+    }
+
+    metrics = {
+        'speed': 'max' if speed is None else f'{speed:g}x',
+        'events': n,
+        'deltas': delta_count,
+        'elapsed_sec': round(elapsed, 3),
+        'events_per_sec': round(n / elapsed, 1) if elapsed > 0 else None,
+        'service_us_p50': round(float(np.percentile(service_us, 50)), 2) if n else None,
+        'service_us_p99': round(float(np.percentile(service_us, 99)), 2) if n else None,
+        'service_us_max': round(float(service_us.max()), 2) if n else None,
+        'service_histogram_us': histogram,
+        'peak_rss_mb': peak_rss_mb(),
+        'heap_peak_mb': heap_peak_mb,
+    }
+    if speed is not None:
+        lag_ms = lag * 1000
+        metrics['lag_ms_p50'] = round(float(np.percentile(lag_ms, 50)), 3) if n else None
+        metrics['lag_ms_p99'] = round(float(np.percentile(lag_ms, 99)), 3) if n else None
+
+    return scorer, metrics
+
+
+def check_replay(raw_data: pd.DataFrame, games=CHECK_GAMES) -> dict:
+    """
+    작은 경기 부분집합마다 재생 합계와 배치 결과 비교
+
+    Returns:
+        dict: 경기 수 -> 불일치 건수
+    """
+    results = {}
+    for n in games:
+        subset = first_games(raw_data, n)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scorer, _ = replay(replay_order(subset).to_dict('records'))
+            batch = run_batch(subset)
+        results[n] = len(compare_with_batch(scorer.totals(), batch))
+    return results
+
+
+def _bin_label(low, high):
+    if np.isinf(high):
+        return f'>={low:g}'
+    return f'{low:g}-{high:g}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 이벤트 재생 벤치마크')
+    parser.add_argument('--path', default=None, help='raw_data.csv 또는 raw_data.parquet 경로 (기본: 데이터셋 raw_data)')
+    parser.add_argument('--speeds', nargs='+', default=['max'], help='배속 목록 (예: 1 10 max)')
+    parser.add_argument('--games', type=int, default=None, help='재생할 경기 수')
+    parser.add_argument('--sequential', action='store_true', help='경기별 순차 재생')
+    parser.add_argument('--trace-memory', action='store_true', help='tracemalloc 힙 측정')
+    parser.add_argument('--skip-check', action='store_true', help='배치 결과 비교 생략')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("K-Fantasy AI - 이벤트 재생 벤치마크")
+    print("=" * 60)
+
+    raw_data = load_events(args.path, args.games)
+    events = replay_order(raw_data, concurrent=not args.sequential).to_dict('records')
+
+    report = {'events': len(events), 'games': int(raw_data['game_id'].nunique()), 'runs': []}
+    scorer = None
+
+    for speed_arg in args.speeds:
+        speed = None if speed_arg == 'max' else float(speed_arg)
+        print(f"\n재생 중 ({speed_arg}{'' if speed is None else 'x'})...")
+        scorer, metrics = replay(events, speed, args.trace_memory)
+        report['runs'].append(metrics)
+        print(f"  - 처리량: {metrics['events_per_sec']:,} events/sec")
+        print(f"  - 처리 시간 p50/p99: {metrics['service_us_p50']} / {metrics['service_us_p99']} µs")
+        if 'lag_ms_p99' in metrics:
+            print(f"  - 예정 시각 대비 지연 p99: {metrics['lag_ms_p99']} ms")
+        print(f"  - 최대 RSS: {metrics['peak_rss_mb']} MB")
+
+    # 정확성 검증
+    if not args.skip_check and scorer is not None:
+        print("\n배치 결과와 비교 중...")
+        mismatches = compare_with_batch(scorer.totals(), run_batch(raw_data))
+        report['batch_mismatches'] = len(mismatches)
+        if len(mismatches) == 0:
+            print("  - 배치 결과와 완전히 일치")
+        else:
+            print(f"  - 불일치: {len(mismatches)}건")
+            print(mismatches.head(10).to_string(index=False))
+
+        print("\n작은 경기 부분집합 비교 중...")
+        report['subset_mismatches'] = check_replay(raw_data)
+        for n, count in report['subset_mismatches'].items():
+            print(f"  - {n}경기: {'일치' if count == 0 else f'불일치 {count}건'}")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    report_path = OUTPUT_DIR / 'replay_benchmark.json'
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print("\n" + "=" * 60)
+    print(f"벤치마크 결과 저장: {report_path}")
+    print("=" * 60)
+
+    if report.get('batch_mismatches') or any(report.get('subset_mismatches', {}).values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
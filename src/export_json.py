@@ -12,10 +12,24 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from columnar_export import save_columnar
+from dataset import load_table
+from delta_export import export_delta
+from heatmaps import HEATMAP_PATH, PlayerHeatmaps
+from instrumentation import stage
+from pricing import GROUPS, availability, base_prices, default_prices, load_prices, recent_games
+from ranking_index import RankingIndex
+from similarity import SimilarityIndex
+import sql_backend
+
 # 경로 설정
 BASE_DIR = Path(__file__).parent.parent
 OUTPUT_DIR = BASE_DIR / 'outputs'
 WEB_DATA_DIR = BASE_DIR / 'web' / 'src' / 'data'
+# 웹앱이 fetch로 읽는 경로 (/data/*.json)
+PUBLIC_DATA_DIR = BASE_DIR / 'web' / 'public' / 'data'
+# 선수별 히트맵 샤드 (웹앱에서 선수 선택 시 개별 로드)
+HEATMAP_SHARD_DIR = PUBLIC_DATA_DIR / 'heatmaps'
 
 
 def clean_for_json(obj):
@@ -36,6 +50,7 @@ def clean_for_json(obj):
         return obj
 
 
+@stage(rows=lambda result: len(result['predictions']))
 def load_all_data():
     """모든 CSV 데이터 로드"""
     print("CSV 데이터 로드 중...")
@@ -72,9 +87,28 @@ def load_all_data():
     except FileNotFoundError:
         data['underrated'] = pd.DataFrame()
 
+    # 가격 / 보유율 (pricing.py, 없으면 기준 가격)
+    data['prices'] = load_prices()
+    if data['prices'] is not None:
+        print(f"  - prices: {len(data['prices'])}건")
+    else:
+        data['prices'] = default_prices(data['predictions'])
+        print("  - prices: 없음 (기준 가격 사용)")
+
+    # 경기별 점수 -> 최근 경기 배열 / 출전 상태
+    match_scores = pd.read_csv(OUTPUT_DIR / 'fantasy_scores_by_match.csv')
+    try:
+        match_info = load_table('match_info')
+    except FileNotFoundError:
+        match_info = None
+        print("  - match_info: 없음 (game_id 순서 사용)")
+    data['recent_games'] = recent_games(match_scores, match_info)
+    data['availability'] = availability(match_scores, match_info)
+
     return data
 
 
+@stage()
 def create_players_json(data):
     """선수 데이터 JSON 생성"""
     print("\n선수 JSON 생성 중...")
@@ -82,11 +116,14 @@ def create_players_json(data):
     players = []
 
     # 예측 데이터와 통계 병합
-    df = data['predictions'].copy()
+    df = data['predictions'].merge(data['prices'][['player_id', 'price', 'price_change', 'ownership']], on='player_id', how='left')
+    df['price'] = df['price'].fillna(pd.Series(base_prices(df), index=df.index))
+    df['price_change'] = df['price_change'].fillna(0.0)
 
     for _, row in df.iterrows():
+        player_id = int(row['player_id'])
         player = {
-            'id': int(row['player_id']),
+            'id': player_id,
             'name': row['player_name_ko'],
             'team': row['team_name_ko'],
             'position': row['main_position'],
@@ -95,6 +132,8 @@ def create_players_json(data):
             'seasonAvg': round(row['season_avg'], 1),
             'formIndex': round(row['form_index'], 2),
             'matchesPlayed': int(row['matches_played']),
+            'minutesPlayed': round(row.get('avg_minutes', 90.0), 1),
+            'scorePer90': round(row.get('season_per_90', row['season_avg']), 1),
             'totalGoals': int(row.get('total_goals', 0)),
             'totalAssists': int(row.get('total_assists', 0)),
             # XAI 기여도
@@ -104,21 +143,31 @@ def create_players_json(data):
                 'position': round(row.get('contribution_position', 0), 1),
                 'goals': round(row.get('contribution_goals', 0), 1),
                 'assists': round(row.get('contribution_assists', 0), 1)
-            }
+            },
+            # 가격 / 출전 정보 (웹앱에서 별도 보강 없이 사용)
+            'price': row['price'],
+            'valueRating': round(row['predicted_score'] / row['price'], 2) if row['price'] > 0 else 0,
+            'priceChange': row['price_change'],
+            'ownership': round(row['ownership'], 1) if pd.notna(row['ownership']) else None,
+            'recentGames': data['recent_games'].get(player_id, []),
+            'availability': data['availability'].get(player_id, {'status': 'available'}),
         }
         players.append(clean_for_json(player))
 
-    # 예측 점수 기준 정렬
-    players.sort(key=lambda x: x['predictedScore'], reverse=True)
-
-    # 순위 추가
-    for i, p in enumerate(players, 1):
-        p['rank'] = i
+    # 예측 점수 기준 정렬 + 전체/포지션 그룹 순위 (통합 랭킹 인덱스)
+    index = RankingIndex.from_players(players)
+    position_ranks = index.rank('predictedScore', scope='group')
+    order = index.order('predictedScore')
+    for rank, row in enumerate(order, 1):
+        players[row]['rank'] = rank
+        players[row]['positionRank'] = int(position_ranks[row])
+    players = [players[row] for row in order]
 
     print(f"  - 선수 {len(players)}명 처리 완료")
     return players
 
 
+@stage()
 def create_dark_horses_json(data):
     """다크호스 JSON 생성"""
     print("다크호스 JSON 생성 중...")
@@ -148,54 +197,54 @@ def create_dark_horses_json(data):
     return dark_horses
 
 
+@stage()
 def create_position_rankings_json(players):
-    """포지션별 랭킹 JSON 생성"""
+    """포지션 그룹별 TOP 10 JSON 생성 (positionRank는 create_players_json에서 부여)"""
     print("포지션별 랭킹 JSON 생성 중...")
 
-    # 포지션 그룹핑
-    position_groups = {
-        'GK': ['GK'],
-        'DF': ['CB', 'LB', 'RB', 'LWB', 'RWB'],
-        'MF': ['DMF', 'CMF', 'AMF', 'LMF', 'RMF', 'CM'],
-        'FW': ['CF', 'SS', 'LWF', 'RWF', 'LW', 'RW']
+    index = RankingIndex.from_players(players)
+    rankings = {
+        group: [players[row] for row in index.top_k_rows('predictedScore', 10, group=group)]
+        for group in GROUPS
     }
 
-    rankings = {}
-
-    for group_name, positions in position_groups.items():
-        group_players = [p for p in players if p['position'] in positions]
-        group_players.sort(key=lambda x: x['predictedScore'], reverse=True)
-
-        # 그룹 내 순위
-        for i, p in enumerate(group_players, 1):
-            p['positionRank'] = i
-
-        rankings[group_name] = group_players[:10]  # TOP 10
-
-    print(f"  - 4개 포지션 그룹 처리 완료")
+    print(f"  - {len(rankings)}개 포지션 그룹 처리 완료")
     return rankings
 
 
-def create_team_stats_json(data):
-    """팀별 통계 JSON 생성"""
+@stage()
+def create_team_stats_json(data, backend=None):
+    """팀별 통계 JSON 생성 (backend='duckdb'면 팀별 집계를 SQL로 실행)"""
     print("팀별 통계 JSON 생성 중...")
 
     df = data['player_stats']
     team_stats = []
 
-    for team in df['team_name_ko'].unique():
-        team_df = df[df['team_name_ko'] == team]
-
-        stats = {
-            'name': team,
-            'playerCount': len(team_df),
-            'avgFantasyScore': round(team_df['avg_fantasy_score'].mean(), 1),
-            'totalGoals': int(team_df['total_goals'].sum()),
-            'totalAssists': int(team_df['total_assists'].sum()),
-            'topPlayer': team_df.nlargest(1, 'avg_fantasy_score').iloc[0]['player_name_ko']
-            if len(team_df) > 0 else None
-        }
-        team_stats.append(clean_for_json(stats))
+    if sql_backend.resolve_backend(backend) == 'duckdb':
+        for row in sql_backend.team_stats(df).itertuples(index=False):
+            stats = {
+                'name': row.team_name_ko,
+                'playerCount': int(row.player_count),
+                'avgFantasyScore': round(row.avg_fantasy_score, 1),
+                'totalGoals': int(row.total_goals),
+                'totalAssists': int(row.total_assists),
+                'topPlayer': row.top_player
+            }
+            team_stats.append(clean_for_json(stats))
+    else:
+        for team in df['team_name_ko'].unique():
+            team_df = df[df['team_name_ko'] == team]
+
+            stats = {
+                'name': team,
+                'playerCount': len(team_df),
+                'avgFantasyScore': round(team_df['avg_fantasy_score'].mean(), 1),
+                'totalGoals': int(team_df['total_goals'].sum()),
+                'totalAssists': int(team_df['total_assists'].sum()),
+                'topPlayer': team_df.nlargest(1, 'avg_fantasy_score').iloc[0]['player_name_ko']
+                if len(team_df) > 0 else None
+            }
+            team_stats.append(clean_for_json(stats))
 
     # 평균 점수 기준 정렬
     team_stats.sort(key=lambda x: x['avgFantasyScore'], reverse=True)
@@ -204,6 +253,7 @@ def create_team_stats_json(data):
     return team_stats
 
 
+@stage()
 def create_summary_json(data, players, dark_horses):
     """요약 통계 JSON 생성"""
     print("요약 통계 JSON 생성 중...")
@@ -226,14 +276,58 @@ def create_summary_json(data, players, dark_horses):
     return clean_for_json(summary)
 
 
-def save_json(data, filename):
-    """JSON 파일 저장"""
-    filepath = WEB_DATA_DIR / filename
+@stage(rows=lambda result, data: len(result))
+def create_similar_players_json(data):
+    """선수별 유사 선수 top-10 JSON 생성 (같은 포지션 그룹 내)"""
+    print("유사 선수 JSON 생성 중...")
+
+    index = SimilarityIndex().fit(data['player_stats'])
+    similar = index.to_json()
+
+    print(f"  - 선수 {len(similar)}명 처리 완료 (지표 {len(index.features)}개)")
+    return similar
+
+
+@stage(rows=lambda result, player_ids: len(result))
+def create_heatmaps_json(player_ids):
+    """선수별 축소 히트맵 JSON 생성 (heatmaps.npz 없으면 빈 dict)"""
+    print("히트맵 JSON 생성 중...")
+
+    if not HEATMAP_PATH.exists():
+        print("  - heatmaps.npz 없음 (heatmaps.py 먼저 실행)")
+        return {}
+
+    heatmaps = PlayerHeatmaps.load().to_json()
+    heatmaps = {pid: heatmaps[pid] for pid in player_ids if pid in heatmaps}
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"  - 히트맵 {len(heatmaps)}명 처리 완료")
+    return heatmaps
+
+
+@stage(rows=lambda result, heatmaps: len(heatmaps))
+def save_heatmap_shards(heatmaps):
+    """선수별 히트맵 샤드 저장 (heatmaps/<player_id>.json, 공백 없이)"""
+    HEATMAP_SHARD_DIR.mkdir(parents=True, exist_ok=True)
+
+    for player_id, heatmap in heatmaps.items():
+        with open(HEATMAP_SHARD_DIR / f'{player_id}.json', 'w', encoding='utf-8') as f:
+            json.dump(heatmap, f, separators=(',', ':'))
+
+    print(f"  저장: {HEATMAP_SHARD_DIR} ({len(heatmaps)}개)")
+
+
+@stage(rows=lambda result, data, filename: len(data))
+def save_json(data, filename):
+    """JSON 파일 저장 (web/public/data, web/src/data 두 곳, 내용이 같은 파일은 다시 쓰지 않음)"""
+    content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
 
-    print(f"  저장: {filepath}")
+    for directory in [PUBLIC_DATA_DIR, WEB_DATA_DIR]:
+        filepath = directory / filename
+        if filepath.exists() and filepath.read_bytes() == content:
+            print(f"  변경 없음: {filepath}")
+            continue
+        filepath.write_bytes(content)
+        print(f"  저장: {filepath}")
 
 
 def main():
@@ -243,6 +337,7 @@ def main():
 
     # 웹 데이터 폴더 생성
     WEB_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    PUBLIC_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
     # 1. 데이터 로드
     data = load_all_data()
@@ -253,14 +348,20 @@ def main():
     position_rankings = create_position_rankings_json(players)
     team_stats = create_team_stats_json(data)
     summary = create_summary_json(data, players, dark_horses)
+    heatmaps = create_heatmaps_json([p['id'] for p in players])
+    similar_players = create_similar_players_json(data)
 
     # 3. JSON 저장
     print("\nJSON 파일 저장 중...")
     save_json(players, 'players.json')
+    export_delta(players)
+    save_columnar(players, PUBLIC_DATA_DIR / 'players.bin')
     save_json(dark_horses, 'dark_horses.json')
     save_json(position_rankings, 'position_rankings.json')
     save_json(team_stats, 'teams.json')
     save_json(summary, 'summary.json')
+    save_json(similar_players, 'similar_players.json')
+    save_heatmap_shards(heatmaps)
 
     # 4. 통합 데이터 저장 (웹앱에서 한 번에 로드용)
     all_data = {
@@ -274,7 +375,7 @@ def main():
 
     print("\n" + "=" * 60)
     print("JSON 내보내기 완료!")
-    print(f"  - 위치: {WEB_DATA_DIR}")
+    print(f"  - 위치: {PUBLIC_DATA_DIR}, {WEB_DATA_DIR}")
     print("=" * 60)
 
 
@@ -10,13 +10,18 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 import json
 
-# 경로 설정
-BASE_PATH = Path(r"C:\Users\user\Desktop\공모전 모음\0112 K리그-서울시립대 공개 AI 경진대회_120만")
-DATA_PATH = BASE_PATH / "_shared" / "data"
-OUTPUT_PATH = BASE_PATH / "Track2_K-Fantasy-Coach" / "outputs"
+from instrumentation import stage
+import xg_model
+import xt_model
+from possession_chains import PossessionChainBuilder
+from minutes_played import estimate_minutes, per_90
+from dataset import DATA_ROOT, PARTITION_KEYS, load_table
+import sql_backend
 
-# 출력 폴더 생성
-OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
+# 경로 설정 (데이터 루트는 KFANTASY_DATA_ROOT 환경 변수로 변경 가능)
+BASE_PATH = Path(__file__).parent.parent
+DATA_PATH = DATA_ROOT
+OUTPUT_PATH = BASE_PATH / "outputs"
 
 
 # ============================================================================
@@ -52,6 +57,55 @@ FANTASY_POINTS = {
     'Duel_Lost': -0.2,               # 경합 패배
 }
 
+# 선택 지표 (컬럼명 -> 배점, 0이면 점수에 미반영)
+OPTIONAL_FANTASY_POINTS = {
+    'xg': 0.0,                       # 기대 득점 (xG 합계)
+    'xt': 0.0,                       # 기대 위협 (패스/캐리 xT 변화량 합계)
+    'sca': 0.0,                      # 슈팅 창출 행동
+    'gca': 0.0,                      # 득점 창출 행동
+}
+
+# 팀 득실점 기반 점수 (포지션 그룹별, 팀-경기 집계를 선수-경기 행에 결합하여 반영)
+TEAM_MATCH_POINTS = {
+    'GK': {'clean_sheet': 4.0, 'goals_conceded': -1.0, 'saves': 1.0},
+    'DF': {'clean_sheet': 4.0, 'goals_conceded': -0.5, 'saves': 0.0},
+}
+TEAM_MATCH_POSITIONS = {
+    'GK': ['GK'],
+    'DF': ['CB', 'LB', 'RB', 'LWB', 'RWB'],
+}
+CLEAN_SHEET_MIN_MINUTES = 60         # 클린시트 인정 최소 출장 시간 (분)
+
+# 선수-경기별 추가 지표 (시즌 통계에 total_<지표>, <지표>_per_90으로 집계)
+EXTRA_METRICS = ['xg', 'xt', 'sca', 'gca', 'shot_chains']
+
+# 90분당 환산할 기본 카운터 (시즌 합계 컬럼명)
+PER_90_COLUMNS = ['total_fantasy_score', 'total_goals', 'total_assists', 'total_shots',
+                  'total_key_passes', 'total_tackles', 'total_interceptions']
+
+# 선수별 시즌 합계 (경기별 컬럼 -> 시즌 통계 컬럼), REQUIRED_SUM_COLUMNS 외에는 있을 때만 집계
+SEASON_SUM_COLUMNS = {
+    'goals': 'total_goals',
+    'assists': 'total_assists',
+    'shots': 'total_shots',
+    'shots_on_target': 'total_shots_on_target',
+    'passes_successful': 'total_passes_successful',
+    'passes_total': 'total_passes',
+    'key_passes': 'total_key_passes',
+    'tackles_successful': 'total_tackles',
+    'interceptions': 'total_interceptions',
+    'duels_won': 'total_duels_won',
+    'duels_total': 'total_duels',
+    **{metric: f'total_{metric}' for metric in EXTRA_METRICS},
+    'minutes': 'total_minutes',
+    'started': 'matches_started',
+    'clean_sheet': 'clean_sheets',
+    'goals_conceded': 'total_goals_conceded',
+    'saves': 'total_saves',
+}
+REQUIRED_SUM_COLUMNS = ['goals', 'assists', 'shots', 'shots_on_target', 'passes_successful', 'passes_total',
+                        'key_passes', 'tackles_successful', 'interceptions', 'duels_won', 'duels_total']
+
 # 포지션별 보정 계수
 POSITION_MULTIPLIERS = {
     'GK': {'defensive': 1.5, 'offensive': 0.3},
@@ -72,25 +126,149 @@ POSITION_MULTIPLIERS = {
 }
 
 
+# 규칙별 포지션 -> 배점 조회표
+_TEAM_MATCH_WEIGHTS = {
+    rule: {
+        position: TEAM_MATCH_POINTS[group][rule]
+        for group, positions in TEAM_MATCH_POSITIONS.items()
+        for position in positions
+    }
+    for rule in ['clean_sheet', 'goals_conceded', 'saves']
+}
+
+
+def team_match_score(counts):
+    """클린시트/실점/선방 점수 (GK/DF 외 포지션은 0)"""
+    position = counts['main_position']
+    score = 0.0
+    for rule, weights in _TEAM_MATCH_WEIGHTS.items():
+        if isinstance(position, pd.Series):
+            weight = position.map(weights).fillna(0.0)
+        else:
+            weight = weights.get(position, 0.0)
+        score = score + counts[rule] * weight
+    return score
+
+
+def compute_fantasy_score(counts):
+    """
+    이벤트 카운트로부터 판타지 점수 계산
+    - DataFrame(벡터 연산)과 dict(단일 선수-경기) 모두 지원
+    - 배치/실시간 계산기가 동일한 연산 순서를 공유하여 결과가 정확히 일치
+    - OPTIONAL_FANTASY_POINTS는 배점이 0이 아니고 해당 컬럼이 있을 때만 반영
+    - 팀 득실점 컬럼(clean_sheet, goals_conceded, saves)이 있으면 TEAM_MATCH_POINTS 반영
+    """
+    score = (
+        counts['goals'] * FANTASY_POINTS['Goal'] +
+        counts['shots_on_target'] * FANTASY_POINTS['Shot_on_target'] +
+        counts['shots'] * FANTASY_POINTS['Shot'] +
+        counts['assists'] * FANTASY_POINTS['Assist'] +
+        counts['key_passes'] * FANTASY_POINTS['Pass_Key'] +
+        counts['passes_successful'] * FANTASY_POINTS['Pass_Successful'] +
+        counts['passes_failed'] * FANTASY_POINTS['Pass_Failed'] +
+        counts['carries'] * FANTASY_POINTS['Carry'] +
+        counts['carries_progressive'] * FANTASY_POINTS['Carry_Progressive'] +
+        counts['tackles_successful'] * FANTASY_POINTS['Tackle_Successful'] +
+        (counts['tackles_total'] - counts['tackles_successful']) * FANTASY_POINTS['Tackle_Failed'] +
+        counts['interceptions'] * FANTASY_POINTS['Interception'] +
+        counts['blocks'] * FANTASY_POINTS['Block'] +
+        counts['clearances'] * FANTASY_POINTS['Clearance'] +
+        counts['recoveries'] * FANTASY_POINTS['Recovery'] +
+        counts['duels_won'] * FANTASY_POINTS['Duel_Won'] +
+        (counts['duels_total'] - counts['duels_won']) * FANTASY_POINTS['Duel_Lost']
+    )
+
+    for column, points in OPTIONAL_FANTASY_POINTS.items():
+        if points and column in counts:
+            score = score + counts[column] * points
+
+    if 'goals_conceded' in counts:
+        score = score + team_match_score(counts)
+
+    return score
+
+
+def season_sum_columns(columns) -> list:
+    """시즌 합계로 집계할 경기별 컬럼 (필수 컬럼 + 존재하는 선택 컬럼)"""
+    return [metric for metric in SEASON_SUM_COLUMNS
+            if metric in REQUIRED_SUM_COLUMNS or metric in columns]
+
+
+def derive_player_rates(player_stats: pd.DataFrame) -> pd.DataFrame:
+    """시즌 합계로부터 비율/90분당 지표 계산 후 평균 점수 순 정렬 (pandas/DuckDB 집계 공용)"""
+    # 패스 성공률 계산
+    player_stats['pass_success_rate'] = (
+        player_stats['total_passes_successful'] /
+        player_stats['total_passes'].replace(0, 1) * 100
+    ).round(1)
+
+    # 경합 승률 계산
+    player_stats['duel_win_rate'] = (
+        player_stats['total_duels_won'] /
+        player_stats['total_duels'].replace(0, 1) * 100
+    ).round(1)
+
+    # 슈팅 결정력 계산
+    player_stats['shot_conversion'] = (
+        player_stats['total_goals'] /
+        player_stats['total_shots'].replace(0, 1) * 100
+    ).round(1)
+
+    # 90분당 환산 (출장 시간이 없으면 출전 경기당 90분 가정)
+    if 'total_minutes' in player_stats.columns:
+        minutes = player_stats['total_minutes']
+        player_stats['avg_minutes'] = (minutes / player_stats['matches_played']).round(1)
+    else:
+        minutes = player_stats['matches_played'] * 90
+
+    per_90_columns = PER_90_COLUMNS + [f'total_{metric}' for metric in EXTRA_METRICS]
+    for column in per_90_columns:
+        if column in player_stats.columns:
+            name = column[len('total_'):] + '_per_90'
+            player_stats[name] = per_90(player_stats[column], minutes).round(3)
+    if 'total_xg' in player_stats.columns:
+        player_stats['goals_minus_xg'] = (player_stats['total_goals'] - player_stats['total_xg']).round(2)
+
+    # 정렬
+    player_stats = player_stats.sort_values('avg_fantasy_score', ascending=False)
+
+    return player_stats
+
+
 class FantasyCalculator:
     """K리그 판타지 점수 계산기"""
 
-    def __init__(self):
+    def __init__(self, backend=None):
+        """
+        Args:
+            backend: 집계 단계 실행 방식 ('pandas', 'duckdb', None이면 KFANTASY_BACKEND 환경 변수)
+        """
+        self.backend = sql_backend.resolve_backend(backend)
         self.raw_data = None
         self.match_info = None
         self.player_stats = None
         self.fantasy_scores = None
+        self.xg_model = None
+        self.xt_model = None
+        self.possession_chains = None
+
+    @stage(rows=lambda result, self, *filters: len(self.raw_data))
+    def load_data(self, season=None, competition=None, rounds=None):
+        """
+        데이터 로드 (파티션 레이아웃이면 조건에 맞는 파일만 읽음)
 
-    def load_data(self):
-        """데이터 로드"""
+        Args:
+            season, competition, rounds: dataset.load_table 필터
+        """
         print("데이터 로드 중...")
+        filters = {'season': season, 'competition': competition, 'rounds': rounds}
 
-        # raw_data.csv 로드
-        self.raw_data = pd.read_csv(DATA_PATH / "raw_data.csv")
+        # raw_data 로드
+        self.raw_data = load_table('raw_data', **filters)
         print(f"  - raw_data: {len(self.raw_data):,}건")
 
-        # match_info.csv 로드
-        self.match_info = pd.read_csv(DATA_PATH / "match_info.csv")
+        # match_info 로드
+        self.match_info = load_table('match_info', **filters)
         print(f"  - match_info: {len(self.match_info):,}경기")
 
         # 컬럼명 확인
@@ -111,6 +289,7 @@ class FantasyCalculator:
         print(f"  - 감지된 골: {len(goals)}개")
         return goals
 
+    @stage()
     def detect_assists(self, goals: pd.DataFrame) -> pd.DataFrame:
         """
         어시스트 감지
@@ -155,10 +334,13 @@ class FantasyCalculator:
                     'goal_scorer_id': goal_player
                 })
 
-        assists_df = pd.DataFrame(assists)
+        assists_df = pd.DataFrame(assists, columns=[
+            'game_id', 'player_id', 'player_name_ko', 'team_id', 'time_seconds', 'goal_scorer_id'
+        ])
         print(f"  - 감지된 어시스트: {len(assists_df)}개")
         return assists_df
 
+    @stage()
     def detect_key_passes(self) -> pd.DataFrame:
         """
         키패스 감지: 슈팅으로 이어진 패스
@@ -195,10 +377,11 @@ class FantasyCalculator:
                     'time_seconds': last_pass['time_seconds']
                 })
 
-        key_passes_df = pd.DataFrame(key_passes)
+        key_passes_df = pd.DataFrame(key_passes, columns=['game_id', 'player_id', 'time_seconds'])
         print(f"  - 감지된 키패스: {len(key_passes_df)}개")
         return key_passes_df
 
+    @stage()
     def calculate_player_event_counts(self) -> pd.DataFrame:
         """선수별 이벤트 카운트 집계"""
         print("\n선수별 이벤트 집계 중...")
@@ -217,6 +400,7 @@ class FantasyCalculator:
             event = {
                 'game_id': game_id,
                 'player_id': player_id,
+                'team_id': group['team_id'].iloc[0],
                 'player_name_ko': player_name,
                 'team_name_ko': team_name,
                 'main_position': position,
@@ -262,8 +446,103 @@ class FantasyCalculator:
 
         return events_df
 
-    def calculate_fantasy_scores(self, events_df: pd.DataFrame, assists_df: pd.DataFrame, key_passes_df: pd.DataFrame) -> pd.DataFrame:
-        """판타지 점수 계산"""
+    @stage()
+    def calculate_xg(self) -> pd.DataFrame:
+        """
+        xG 계산: 전체 슈팅으로 모델 학습 후 일괄 산출
+        - 선수-경기별 xG 합계 반환
+        """
+        print("\nxG 계산 중...")
+
+        self.xg_model, shots = xg_model.fit_and_score(self.raw_data, self.xg_model)
+        xg_df = xg_model.player_match_xg(shots)
+
+        print(f"  - 슈팅: {len(shots):,}건, 총 xG: {shots['xg'].sum():.1f}")
+        return xg_df
+
+    @stage()
+    def calculate_xt(self) -> pd.DataFrame:
+        """
+        xT 계산: 격자 가치 학습 후 패스/캐리별 xT 변화량을 일괄 산출
+        - 선수-경기별 xT 합계 반환
+        """
+        print("\nxT 계산 중...")
+
+        self.xt_model, xt_df = xt_model.fit_and_score(self.raw_data, self.xt_model)
+
+        print(f"  - 가치 반복: {self.xt_model.iterations}회, 총 xT: {xt_df['xt'].sum():.1f}")
+        return xt_df
+
+    @stage()
+    def calculate_team_match_stats(self) -> pd.DataFrame:
+        """
+        팀-경기별 득실점 집계
+        - 슈팅 이벤트 1회 groupby로 팀별 득점/유효슈팅 계산
+        - 실점/상대 유효슈팅 = 경기 합계 - 자기 팀 값
+
+        Returns:
+            DataFrame[game_id, team_id, goals_for, goals_against, saves]
+        """
+        print("\n팀-경기 득실점 집계 중...")
+
+        keys = ['game_id', 'team_id']
+        teams = self.raw_data[keys].dropna().drop_duplicates()
+
+        shots = self.raw_data.loc[self.raw_data['type_name'] == 'Shot', keys + ['result_name']]
+        shot_counts = pd.DataFrame({
+            'game_id': shots['game_id'],
+            'team_id': shots['team_id'],
+            'goals_for': (shots['result_name'] == 'Goal').astype(int),
+            'on_target_for': (shots['result_name'] == 'Successful').astype(int),
+        }).groupby(keys).sum()
+
+        team_stats = teams.merge(shot_counts, on=keys, how='left').fillna({'goals_for': 0, 'on_target_for': 0})
+        game_totals = team_stats.groupby('game_id')[['goals_for', 'on_target_for']].transform('sum')
+        team_stats['goals_against'] = (game_totals['goals_for'] - team_stats['goals_for']).astype(int)
+        # 상대 유효슈팅 중 실점하지 않은 슈팅 = 선방
+        team_stats['saves'] = (game_totals['on_target_for'] - team_stats['on_target_for']).astype(int)
+        team_stats['goals_for'] = team_stats['goals_for'].astype(int)
+
+        clean_sheets = (team_stats['goals_against'] == 0).sum()
+        print(f"  - 팀-경기: {len(team_stats):,}건 (클린시트 {clean_sheets}건)")
+        return team_stats.drop(columns='on_target_for')
+
+    @stage()
+    def calculate_minutes(self) -> pd.DataFrame:
+        """선수-경기별 출장 시간 추정 (선발 여부 포함)"""
+        print("\n출장 시간 추정 중...")
+
+        minutes_df = estimate_minutes(self.raw_data)
+
+        print(f"  - 평균 출장 시간: {minutes_df['minutes'].mean():.1f}분 (선발 비율 {minutes_df['started'].mean():.0%})")
+        return minutes_df
+
+    @stage()
+    def calculate_possession_chains(self) -> pd.DataFrame:
+        """
+        점유 체인 분할 후 선수-경기별 슈팅/득점 창출 지표 계산
+        - 체인 통계는 self.possession_chains에 저장
+        """
+        print("\n점유 체인 분석 중...")
+
+        builder = PossessionChainBuilder().build(self.raw_data)
+        self.possession_chains = builder.chains
+        chain_metrics = builder.player_metrics()
+
+        shot_chains = (self.possession_chains['outcome'] != 'none').sum()
+        print(f"  - 체인: {len(self.possession_chains):,}개 (슈팅 체인 {shot_chains:,}개)")
+        return chain_metrics
+
+    def calculate_fantasy_scores(self, events_df: pd.DataFrame, assists_df: pd.DataFrame, key_passes_df: pd.DataFrame,
+                                 metric_dfs: List[pd.DataFrame] = None,
+                                 team_stats: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        판타지 점수 계산
+
+        Args:
+            metric_dfs: 선수-경기별 추가 지표 DataFrame 목록 (출장 시간, xG, xT, 체인 지표 등, 없으면 0)
+            team_stats: 팀-경기별 득실점 (calculate_team_match_stats, 없으면 클린시트/실점 미반영)
+        """
         print("\n판타지 점수 계산 중...")
 
         # 어시스트 카운트 추가
@@ -276,26 +555,18 @@ class FantasyCalculator:
         events_df = events_df.merge(key_pass_counts, on=['game_id', 'player_id'], how='left')
         events_df['key_passes'] = events_df['key_passes'].fillna(0).astype(int)
 
+        # 추가 지표 (선택)
+        for metric_df in metric_dfs or []:
+            events_df = events_df.merge(metric_df, on=['game_id', 'player_id'], how='left')
+            for column in metric_df.columns.drop(['game_id', 'player_id']):
+                events_df[column] = events_df[column].fillna(0).astype(metric_df[column].dtype)
+
+        # 팀 득실점 (팀-경기 단위 1회 병합)
+        if team_stats is not None:
+            events_df = self.join_team_match_stats(events_df, team_stats)
+
         # 판타지 점수 계산
-        events_df['fantasy_score'] = (
-            events_df['goals'] * FANTASY_POINTS['Goal'] +
-            events_df['shots_on_target'] * FANTASY_POINTS['Shot_on_target'] +
-            events_df['shots'] * FANTASY_POINTS['Shot'] +
-            events_df['assists'] * FANTASY_POINTS['Assist'] +
-            events_df['key_passes'] * FANTASY_POINTS['Pass_Key'] +
-            events_df['passes_successful'] * FANTASY_POINTS['Pass_Successful'] +
-            events_df['passes_failed'] * FANTASY_POINTS['Pass_Failed'] +
-            events_df['carries'] * FANTASY_POINTS['Carry'] +
-            events_df['carries_progressive'] * FANTASY_POINTS['Carry_Progressive'] +
-            events_df['tackles_successful'] * FANTASY_POINTS['Tackle_Successful'] +
-            (events_df['tackles_total'] - events_df['tackles_successful']) * FANTASY_POINTS['Tackle_Failed'] +
-            events_df['interceptions'] * FANTASY_POINTS['Interception'] +
-            events_df['blocks'] * FANTASY_POINTS['Block'] +
-            events_df['clearances'] * FANTASY_POINTS['Clearance'] +
-            events_df['recoveries'] * FANTASY_POINTS['Recovery'] +
-            events_df['duels_won'] * FANTASY_POINTS['Duel_Won'] +
-            (events_df['duels_total'] - events_df['duels_won']) * FANTASY_POINTS['Duel_Lost']
-        )
+        events_df['fantasy_score'] = compute_fantasy_score(events_df)
 
         # 포지션 보정 (선택사항 - 일단 제외)
         # events_df['fantasy_score'] = events_df.apply(self._apply_position_multiplier, axis=1)
@@ -305,29 +576,45 @@ class FantasyCalculator:
 
         return events_df
 
+    def join_team_match_stats(self, events_df: pd.DataFrame, team_stats: pd.DataFrame) -> pd.DataFrame:
+        """
+        선수-경기 행에 소속 팀의 실점/선방/클린시트 결합
+        - 클린시트는 CLEAN_SHEET_MIN_MINUTES 이상 출장 시에만 인정 (출장 시간 없으면 무조건 인정)
+        """
+        team_columns = team_stats[['game_id', 'team_id', 'goals_against', 'saves']].rename(
+            columns={'goals_against': 'goals_conceded'}
+        )
+        events_df = events_df.merge(team_columns, on=['game_id', 'team_id'], how='left')
+        events_df[['goals_conceded', 'saves']] = events_df[['goals_conceded', 'saves']].fillna(0).astype(int)
+
+        clean_sheet = events_df['goals_conceded'] == 0
+        if 'minutes' in events_df.columns:
+            clean_sheet &= events_df['minutes'] >= CLEAN_SHEET_MIN_MINUTES
+        events_df['clean_sheet'] = clean_sheet.astype(int)
+        return events_df
+
     def aggregate_player_stats(self, fantasy_df: pd.DataFrame) -> pd.DataFrame:
         """선수별 시즌 통계 집계"""
         print("\n선수별 시즌 통계 집계 중...")
 
+        if self.backend == 'duckdb':
+            player_stats = sql_backend.aggregate_player_stats(fantasy_df, self.match_info)
+            print(f"  - 총 선수 수: {len(player_stats)}명 (DuckDB)")
+            return player_stats
+
+        # 경기 날짜 순 정렬 (이적 선수는 가장 최근 경기의 소속팀 사용)
+        fantasy_df = self._sort_by_match_date(fantasy_df)
+
         # 선수별 집계
         agg_dict = {
             'player_name_ko': 'first',
-            'team_name_ko': 'first',
+            'team_name_ko': ['last', 'nunique'],
             'main_position': 'first',
             'game_id': 'count',  # 출전 경기 수
             'fantasy_score': ['sum', 'mean', 'std', 'max'],
-            'goals': 'sum',
-            'assists': 'sum',
-            'shots': 'sum',
-            'shots_on_target': 'sum',
-            'passes_successful': 'sum',
-            'passes_total': 'sum',
-            'key_passes': 'sum',
-            'tackles_successful': 'sum',
-            'interceptions': 'sum',
-            'duels_won': 'sum',
-            'duels_total': 'sum',
         }
+        for metric in season_sum_columns(fantasy_df.columns):
+            agg_dict[metric] = 'sum'
 
         player_stats = fantasy_df.groupby('player_id').agg(agg_dict)
         player_stats.columns = ['_'.join(col).strip('_') for col in player_stats.columns]
@@ -336,55 +623,87 @@ class FantasyCalculator:
         # 컬럼 이름 정리
         player_stats = player_stats.rename(columns={
             'player_name_ko_first': 'player_name_ko',
-            'team_name_ko_first': 'team_name_ko',
+            'team_name_ko_last': 'team_name_ko',
+            'team_name_ko_nunique': 'teams_played',
             'main_position_first': 'main_position',
             'game_id_count': 'matches_played',
             'fantasy_score_sum': 'total_fantasy_score',
             'fantasy_score_mean': 'avg_fantasy_score',
             'fantasy_score_std': 'std_fantasy_score',
             'fantasy_score_max': 'max_fantasy_score',
-            'goals_sum': 'total_goals',
-            'assists_sum': 'total_assists',
-            'shots_sum': 'total_shots',
-            'shots_on_target_sum': 'total_shots_on_target',
-            'passes_successful_sum': 'total_passes_successful',
-            'passes_total_sum': 'total_passes',
-            'key_passes_sum': 'total_key_passes',
-            'tackles_successful_sum': 'total_tackles',
-            'interceptions_sum': 'total_interceptions',
-            'duels_won_sum': 'total_duels_won',
-            'duels_total_sum': 'total_duels',
+            **{f'{metric}_sum': name for metric, name in SEASON_SUM_COLUMNS.items()},
         })
 
-        # 패스 성공률 계산
-        player_stats['pass_success_rate'] = (
-            player_stats['total_passes_successful'] /
-            player_stats['total_passes'].replace(0, 1) * 100
-        ).round(1)
+        player_stats = derive_player_rates(player_stats)
 
-        # 경합 승률 계산
-        player_stats['duel_win_rate'] = (
-            player_stats['total_duels_won'] /
-            player_stats['total_duels'].replace(0, 1) * 100
-        ).round(1)
+        print(f"  - 총 선수 수: {len(player_stats)}명")
 
-        # 슈팅 결정력 계산
-        player_stats['shot_conversion'] = (
-            player_stats['total_goals'] /
-            player_stats['total_shots'].replace(0, 1) * 100
-        ).round(1)
+        return player_stats
 
-        # 정렬
-        player_stats = player_stats.sort_values('avg_fantasy_score', ascending=False)
+    def _sort_by_match_date(self, fantasy_df: pd.DataFrame) -> pd.DataFrame:
+        """경기 날짜 순 정렬 (match_info 없으면 입력 순서 유지)"""
+        if self.match_info is None or 'game_date' not in self.match_info.columns:
+            return fantasy_df
+        game_dates = fantasy_df['game_id'].map(self.match_info.set_index('game_id')['game_date'])
+        return (fantasy_df.assign(_game_date=game_dates)
+                .sort_values('_game_date', kind='stable', na_position='last')
+                .drop(columns='_game_date'))
+
+    @stage()
+    def aggregate_season_stats(self, fantasy_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        선수 x 시즌 x 대회 x 소속팀 통계 (다중 시즌/이적 선수 비교용)
 
-        print(f"  - 총 선수 수: {len(player_stats)}명")
+        fantasy_df에 파티션 컬럼(season, competition)이 없으면 빈 DataFrame
+        """
+        keys = [key for key in PARTITION_KEYS if key != 'round' and key in fantasy_df.columns]
+        if not keys:
+            return pd.DataFrame()
 
-        return player_stats
+        print("\n시즌/대회별 통계 집계 중...")
+        fantasy_df = self._sort_by_match_date(fantasy_df)
+        agg_dict = {
+            'player_name_ko': 'first',
+            'main_position': 'first',
+            'game_id': 'count',
+            'fantasy_score': ['sum', 'mean'],
+            'goals': 'sum',
+            'assists': 'sum',
+        }
+        if 'minutes' in fantasy_df.columns:
+            agg_dict['minutes'] = 'sum'
+
+        season_stats = fantasy_df.groupby(['player_id'] + keys + ['team_name_ko'], observed=True, sort=False).agg(agg_dict)
+        season_stats.columns = ['_'.join(col).strip('_') for col in season_stats.columns]
+        season_stats = season_stats.reset_index().rename(columns={
+            'player_name_ko_first': 'player_name_ko',
+            'main_position_first': 'main_position',
+            'game_id_count': 'matches_played',
+            'fantasy_score_sum': 'total_fantasy_score',
+            'fantasy_score_mean': 'avg_fantasy_score',
+            'goals_sum': 'total_goals',
+            'assists_sum': 'total_assists',
+            'minutes_sum': 'total_minutes',
+        })
+
+        minutes = season_stats['total_minutes'] if 'total_minutes' in season_stats.columns \
+            else season_stats['matches_played'] * 90
+        season_stats['fantasy_score_per_90'] = per_90(season_stats['total_fantasy_score'], minutes).round(2)
+        season_stats = season_stats.sort_values(['player_id'] + keys, kind='stable').reset_index(drop=True)
+
+        transfers = (season_stats.groupby('player_id')['team_name_ko'].nunique() > 1).sum()
+        print(f"  - 선수 x 시즌 x 팀: {len(season_stats)}행 (소속팀 2개 이상 선수 {transfers}명)")
+        return season_stats
 
     def calculate_recent_form(self, fantasy_df: pd.DataFrame, n_matches: int = 5) -> pd.DataFrame:
         """최근 N경기 폼 계산"""
         print(f"\n최근 {n_matches}경기 폼 계산 중...")
 
+        if self.backend == 'duckdb':
+            recent_form_df = sql_backend.calculate_recent_form(fantasy_df, self.match_info, n_matches)
+            print(f"  - 폼 계산 선수: {len(recent_form_df)}명 (DuckDB)")
+            return recent_form_df
+
         # 경기 날짜 정보 추가
         fantasy_df = fantasy_df.merge(
             self.match_info[['game_id', 'game_date']],
@@ -409,59 +728,97 @@ class FantasyCalculator:
                     'last_match_score': recent_n.iloc[0]['fantasy_score'] if len(recent_n) > 0 else 0,
                 })
 
-        recent_form_df = pd.DataFrame(recent_form)
+        recent_form_df = pd.DataFrame(recent_form, columns=[
+            'player_id', f'recent_{n_matches}_avg', f'recent_{n_matches}_matches', 'last_match_score'
+        ])
         print(f"  - 폼 계산 선수: {len(recent_form_df)}명")
 
         return recent_form_df
 
-    def run(self):
-        """전체 파이프라인 실행"""
-        print("=" * 60)
-        print("K-Fantasy AI - 판타지 점수 계산 시작")
-        print("=" * 60)
+    def merge_recent_form(self, player_stats: pd.DataFrame, recent_form: pd.DataFrame) -> pd.DataFrame:
+        """시즌 통계에 최근 폼 병합 후 폼 지수/트렌드 계산"""
+        player_stats = player_stats.merge(recent_form, on='player_id', how='left')
 
-        # 1. 데이터 로드
-        self.load_data()
+        # 폼 지수 계산 (최근 5경기 평균 / 시즌 평균)
+        player_stats['form_index'] = (
+            player_stats['recent_5_avg'] /
+            player_stats['avg_fantasy_score'].replace(0, 1)
+        ).round(2)
+
+        # 트렌드 판단
+        player_stats['trend'] = player_stats['form_index'].apply(
+            lambda x: 'up' if x > 1.1 else ('down' if x < 0.9 else 'stable')
+        )
 
-        # 2. 골/어시스트/키패스 감지
+        return player_stats
+
+    def score_matches(self) -> pd.DataFrame:
+        """
+        로드된 raw_data로 선수-경기별 판타지 점수 계산
+        (run과 실시간 계산기 검증(live_scorer.run_batch)이 같은 입력을 쓰도록 공유)
+        """
+        # 골/어시스트/키패스 감지 + 추가 지표
         print("\n이벤트 감지 중...")
         goals = self.detect_goals()
         assists = self.detect_assists(goals)
         key_passes = self.detect_key_passes()
+        xg_df = self.calculate_xg()
+        xt_df = self.calculate_xt()
+        minutes_df = self.calculate_minutes()
+        chain_df = self.calculate_possession_chains()
+        team_stats = self.calculate_team_match_stats()
 
-        # 3. 선수별 이벤트 집계
+        # 선수별 이벤트 집계
         events_df = self.calculate_player_event_counts()
 
-        # 4. 판타지 점수 계산
-        fantasy_df = self.calculate_fantasy_scores(events_df, assists, key_passes)
+        # 판타지 점수 계산
+        return self.calculate_fantasy_scores(events_df, assists, key_passes, [minutes_df, xg_df, xt_df, chain_df],
+                                             team_stats)
+
+    def run(self, season=None, competition=None, rounds=None):
+        """
+        전체 파이프라인 실행
+
+        Args:
+            season, competition, rounds: 데이터 파티션 필터 (dataset.load_table)
+        """
+        print("=" * 60)
+        print("K-Fantasy AI - 판타지 점수 계산 시작")
+        print("=" * 60)
+
+        # 1. 데이터 로드
+        self.load_data(season, competition, rounds)
+
+        # 2~4. 이벤트 감지, 선수별 집계, 판타지 점수 계산
+        fantasy_df = self.score_matches()
 
-        # 5. 선수별 시즌 통계 집계
+        # 파티션 컬럼 (다중 시즌/대회 로드 시 season, competition)
+        partition_columns = [key for key in PARTITION_KEYS
+                             if key != 'round' and key in self.match_info.columns and key not in fantasy_df.columns]
+        if partition_columns:
+            fantasy_df = fantasy_df.merge(self.match_info[['game_id'] + partition_columns], on='game_id', how='left')
+
+        # 5. 선수별 시즌 통계 집계 (여러 시즌이면 통산, 소속팀은 최근 경기 기준)
         player_stats = self.aggregate_player_stats(fantasy_df)
+        season_stats = self.aggregate_season_stats(fantasy_df)
 
         # 6. 최근 폼 계산
         recent_form = self.calculate_recent_form(fantasy_df, n_matches=5)
 
-        # 7. 통합
-        player_stats = player_stats.merge(recent_form, on='player_id', how='left')
-
-        # 8. 폼 지수 계산 (최근 5경기 평균 / 시즌 평균)
-        player_stats['form_index'] = (
-            player_stats['recent_5_avg'] /
-            player_stats['avg_fantasy_score'].replace(0, 1)
-        ).round(2)
-
-        # 9. 트렌드 판단
-        player_stats['trend'] = player_stats['form_index'].apply(
-            lambda x: 'up' if x > 1.1 else ('down' if x < 0.9 else 'stable')
-        )
+        # 7. 통합 (폼 지수, 트렌드)
+        player_stats = self.merge_recent_form(player_stats, recent_form)
 
         # 저장
         self.fantasy_scores = fantasy_df
         self.player_stats = player_stats
 
         # CSV 저장
+        OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
+        if len(season_stats) > 0:
+            season_stats.to_csv(OUTPUT_PATH / "player_season_stats.csv", index=False, encoding='utf-8-sig')
         fantasy_df.to_csv(OUTPUT_PATH / "fantasy_scores_by_match.csv", index=False, encoding='utf-8-sig')
         player_stats.to_csv(OUTPUT_PATH / "player_fantasy_stats.csv", index=False, encoding='utf-8-sig')
+        self.possession_chains.to_csv(OUTPUT_PATH / "possession_chains.csv", index=False, encoding='utf-8-sig')
 
         print("\n" + "=" * 60)
         print("판타지 점수 계산 완료!")
@@ -473,7 +830,7 @@ class FantasyCalculator:
         print("\n판타지 점수 TOP 10:")
         print("-" * 60)
         top10 = player_stats.head(10)[['player_name_ko', 'team_name_ko', 'main_position',
-                                        'matches_played', 'avg_fantasy_score', 'total_goals',
+                                        'matches_played', 'avg_fantasy_score', 'fantasy_score_per_90', 'total_goals',
                                         'total_assists', 'form_index', 'trend']]
         print(top10.to_string(index=False))
 
@@ -481,5 +838,15 @@ class FantasyCalculator:
 
 
 if __name__ == "__main__":
+    import argparse
+
+    from dataset import parse_filter
+
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 판타지 점수 계산')
+    parser.add_argument('--season', default=None, help="시즌 (예: 2024, 2023,2024)")
+    parser.add_argument('--competition', default=None, help="대회 (예: kleague1)")
+    parser.add_argument('--rounds', default=None, help="라운드 (예: 5, 1-10)")
+    args = parser.parse_args()
+
     calculator = FantasyCalculator()
-    calculator.run()
+    calculator.run(parse_filter(args.season), parse_filter(args.competition), parse_filter(args.rounds))
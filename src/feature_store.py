@@ -0,0 +1,411 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 선수 x 라운드 피처 스토어
+========================================
+학습과 추론이 같은 피처 테이블을 읽도록 (player_id, season, game_day) 단위 피처를 한 번 계산하여 저장
+
+행의 의미:
+- (player_id, season, game_day) 행 = 해당 라운드 경기 종료 후 시점의 선수 피처 (그 라운드까지의 경기만 사용)
+- 라운드 순서는 (season, game_day) 순 (여러 시즌 데이터에서 라운드 번호가 반복되어도 섞이지 않음)
+- 학습: 경기 (player_id, s, d)의 피처 = (s, d) 이전 라운드의 마지막 행 (point-in-time 조회)
+- 추론: 선수별 마지막 행 (latest 조회)
+- season: match_info의 season 컬럼(데이터셋 파티션), 없으면 경기 날짜의 연도 (K리그 시즌 = 연도)
+
+포지션 백분위는 라운드별 스냅샷(해당 라운드까지 각 선수의 마지막 시즌 평균) 기준으로 계산하여
+시즌 종료 시점 통계가 과거 행에 섞이지 않음
+
+저장 (라운드별 파티션, 내용 해시):
+- outputs/feature_store/season=<s>/game_day=<d>/part-<해시>.parquet
+- 해시는 파티션 피처 값 기준: 점수 규칙 변경이나 과거 경기 수정으로 값이 바뀐 라운드만 다시 쓰고
+  같은 라운드는 건너뜀 (누적 피처이므로 수정된 라운드 이후 파티션이 모두 재작성됨)
+- append-only: sync는 입력에 없는 시즌/라운드 파티션을 그대로 두고 입력 시즌의 행만 반환
+  (시즌 하나만 다시 계산해도 다른 시즌 파티션은 유지)
+- 입력에 없는 파티션(이전 레이아웃 game_day=<d> 포함) 정리는 명시적 재구성에서만: python feature_store.py --rebuild
+- pyarrow 미설치 시 part-<해시>.csv로 저장
+"""
+
+import hashlib
+import importlib.util
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+from minutes_played import per_90
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+if not HAS_PYARROW:
+    print("Warning: pyarrow not installed. Feature store uses CSV partitions.")
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+FEATURE_STORE_DIR = OUTPUT_DIR / 'feature_store'
+
+KEY_COLUMNS = ['player_id', 'season', 'game_day']
+ROUND_COLUMNS = ['season', 'game_day']
+FEATURE_COLUMNS = [
+    'recent_5_avg', 'season_avg', 'form_index',
+    'position_percentile', 'matches_played', 'total_goals', 'total_assists',
+    'sca_avg', 'minutes_avg', 'season_per_90'
+]
+RECENT_MATCHES = 5
+
+
+def match_rounds(match_info: pd.DataFrame) -> pd.DataFrame:
+    """
+    경기별 라운드 키
+
+    Returns:
+        DataFrame[game_id, season, game_day]
+    """
+    rounds = match_info[['game_id', 'game_day']].copy()
+    if 'season' in match_info.columns:
+        rounds['season'] = match_info['season']
+    elif 'game_date' in match_info.columns:
+        rounds['season'] = pd.to_datetime(match_info['game_date']).dt.year
+    else:
+        rounds['season'] = 0
+    return rounds[['game_id'] + ROUND_COLUMNS]
+
+
+def _round_order(*frames) -> list:
+    """
+    frames의 (season, game_day) -> 같은 기준의 정렬 가능한 숫자 (시즌 순위 x 라운드 폭 + 라운드)
+
+    Returns:
+        frame별 numpy 배열 목록
+    """
+    seasons = pd.Index(sorted(pd.unique(pd.concat([frame['season'] for frame in frames]))))
+    width = max([frame['game_day'].max() for frame in frames if len(frame)] + [0]) + 1
+    return [seasons.get_indexer(frame['season']) * width + frame['game_day'].to_numpy(dtype=float)
+            for frame in frames]
+
+
+def last_round(features: pd.DataFrame) -> tuple:
+    """피처 테이블의 마지막 (season, game_day)"""
+    season = features['season'].max()
+    return season, int(features.loc[features['season'] == season, 'game_day'].max())
+
+
+@stage(rows=lambda result, match_scores, match_info: len(result))
+def compute_features(match_scores: pd.DataFrame, match_info: pd.DataFrame) -> pd.DataFrame:
+    """
+    경기별 점수로부터 라운드 종료 시점 피처 계산 (선수별 누적 합 기반, 파이썬 루프는 라운드 단위만)
+
+    Returns:
+        KEY_COLUMNS + ['main_position'] + FEATURE_COLUMNS, (player_id, season, game_day) 정렬
+    """
+    # 다중 시즌 점수 파일에는 season 컬럼이 이미 있음 (match_info 기준 라운드 키로 통일)
+    df = match_scores.drop(columns=ROUND_COLUMNS, errors='ignore')
+    df = df.merge(match_rounds(match_info), on='game_id', how='left')
+    df = df.sort_values(KEY_COLUMNS, kind='stable').reset_index(drop=True)
+
+    def column(name, default=0.0):
+        return df[name].fillna(0) if name in df.columns else pd.Series(default, index=df.index)
+
+    grouped = df.groupby('player_id', sort=False)
+    n_played = grouped.cumcount() + 1
+
+    def cumulative(name, default=0.0):
+        return column(name, default).groupby(df['player_id']).cumsum()
+
+    score_sum = cumulative('fantasy_score')
+    # 최근 5경기 합 = (현재까지 누적) - (5경기 전까지 누적)
+    recent_sum = score_sum - score_sum.groupby(df['player_id']).shift(RECENT_MATCHES).fillna(0)
+    recent_5 = recent_sum / np.minimum(n_played, RECENT_MATCHES)
+    season_avg = score_sum / n_played
+    form_index = np.where(season_avg > 0, recent_5 / season_avg.where(season_avg > 0, 1), 1.0)
+    minutes_sum = cumulative('minutes', 90.0)
+
+    positions = (df.groupby('player_id')['main_position'].transform('first')
+                 if 'main_position' in df.columns else pd.Series('MF', index=df.index))
+
+    features = pd.DataFrame({
+        'player_id': df['player_id'],
+        'season': df['season'],
+        'game_day': df['game_day'],
+        'main_position': positions,
+        'recent_5_avg': recent_5,
+        'season_avg': season_avg,
+        'form_index': form_index,
+        'position_percentile': _position_percentiles(df['player_id'], _round_order(df)[0], positions, season_avg),
+        'matches_played': n_played,
+        'total_goals': cumulative('goals'),
+        'total_assists': cumulative('assists'),
+        'sca_avg': cumulative('sca') / n_played,
+        'minutes_avg': minutes_sum / n_played,
+        'season_per_90': per_90(score_sum, minutes_sum),
+    })
+
+    # 같은 라운드 2경기(연기 경기 등)는 마지막 경기 후 상태만 유지
+    return features.drop_duplicates(KEY_COLUMNS, keep='last').reset_index(drop=True)
+
+
+def _position_percentiles(player_ids, round_order, positions, season_avg) -> np.ndarray:
+    """라운드별 스냅샷 내 같은 포지션 선수 대비 시즌 평균 백분위 (<= 비율)"""
+    player_codes, _ = pd.factorize(player_ids)
+    position_codes, _ = pd.factorize(positions)
+    player_position = np.empty(player_codes.max() + 1 if len(player_codes) else 0, dtype=np.int64)
+    player_position[player_codes] = position_codes
+
+    latest = np.full(len(player_position), np.nan)
+    percentile = np.full(len(player_codes), 50.0)
+    values = season_avg.to_numpy()
+
+    for _, rows in pd.Series(np.arange(len(player_codes))).groupby(round_order):
+        rows = rows.to_numpy()
+        latest[player_codes[rows]] = values[rows]
+        for code in np.unique(position_codes[rows]):
+            snapshot = latest[(player_position == code) & ~np.isnan(latest)]
+            snapshot.sort()
+            in_position = rows[position_codes[rows] == code]
+            counts = np.searchsorted(snapshot, values[in_position], side='right')
+            percentile[in_position] = counts / len(snapshot) * 100
+
+    return percentile
+
+
+def point_in_time(features: pd.DataFrame, keys: pd.DataFrame) -> pd.DataFrame:
+    """
+    keys의 각 (player_id, season, game_day)에 대해 그 라운드 이전(미포함) 마지막 피처 행 조회
+
+    Returns:
+        keys 순서 유지, 피처 없는 행은 NaN (matches_played는 0)
+    """
+    key_order, feature_order = _round_order(keys, features)
+    left = pd.DataFrame({
+        'player_id': keys['player_id'].to_numpy(),
+        'season': keys['season'].to_numpy(),
+        'game_day': keys['game_day'].to_numpy(),
+        'order': key_order,
+        'row': np.arange(len(keys)),
+    }).sort_values('order', kind='stable')
+    right = features[['player_id'] + FEATURE_COLUMNS].assign(feature_order=feature_order)
+    right = right.sort_values('feature_order', kind='stable')
+
+    merged = pd.merge_asof(
+        left, right, left_on='order', right_on='feature_order', by='player_id',
+        allow_exact_matches=False, direction='backward'
+    )
+    merged = merged.sort_values('row').set_index(keys.index)
+    merged['matches_played'] = merged['matches_played'].fillna(0)
+    return merged[KEY_COLUMNS + FEATURE_COLUMNS]
+
+
+def latest(features: pd.DataFrame, as_of=None) -> pd.DataFrame:
+    """선수별 마지막 피처 행 (as_of=(season, game_day) 지정 시 그 라운드까지), player_id 인덱스"""
+    if as_of is not None:
+        season, game_day = as_of
+        features = features[(features['season'] < season)
+                            | ((features['season'] == season) & (features['game_day'] <= game_day))]
+    rows = features.sort_values(KEY_COLUMNS, kind='stable').drop_duplicates('player_id', keep='last')
+    return rows.set_index('player_id')[ROUND_COLUMNS + FEATURE_COLUMNS]
+
+
+def _mismatched_rows(actual: pd.DataFrame, expected: pd.DataFrame, atol) -> np.ndarray:
+    return ~np.isclose(
+        actual[FEATURE_COLUMNS].to_numpy(dtype=float),
+        expected[FEATURE_COLUMNS].to_numpy(dtype=float),
+        atol=atol, equal_nan=True
+    ).all(axis=1)
+
+
+def check_consistency(features: pd.DataFrame, train_features: pd.DataFrame, inference_features: pd.DataFrame,
+                      match_scores: pd.DataFrame, match_info: pd.DataFrame, atol=1e-9) -> int:
+    """
+    학습/추론 경로가 경기 점수에서 다시 계산한 피처와 같은 값을 보는지 검증
+
+    - 저장 행: 피처 스토어 테이블 vs 경기별 점수로 재계산한 피처 (입력 라운드 범위, 누락/추가 행 포함)
+    - 학습 행: 재계산 피처의 point-in-time 조회 결과와 비교
+    - 추론 행: 재계산 피처의 다음 라운드 시점 point-in-time 조회 결과와 비교
+
+    Returns:
+        불일치 행 수
+    """
+    expected = compute_features(match_scores, match_info)
+
+    # 입력 데이터에 있는 라운드만 비교 (append-only 스토어의 다른 시즌/라운드 행은 제외)
+    features = features.merge(expected[ROUND_COLUMNS].drop_duplicates(), on=ROUND_COLUMNS)
+    stored = features.merge(expected, on=KEY_COLUMNS, how='outer', suffixes=('', '_expected'), indicator=True)
+    store_mismatch = (stored['_merge'] != 'both').to_numpy(copy=True)
+    both = stored[~store_mismatch]
+    store_mismatch[~store_mismatch] = _mismatched_rows(
+        both, both[[f'{col}_expected' for col in FEATURE_COLUMNS]].set_axis(FEATURE_COLUMNS, axis=1), atol
+    )
+
+    train_mismatch = _mismatched_rows(train_features, point_in_time(expected, train_features), atol)
+
+    season, game_day = last_round(expected)
+    keys = pd.DataFrame({'player_id': inference_features.index, 'season': season, 'game_day': game_day + 1})
+    inference_mismatch = _mismatched_rows(inference_features, point_in_time(expected, keys), atol)
+
+    mismatches = int(store_mismatch.sum() + train_mismatch.sum() + inference_mismatch.sum())
+    print(f"  - 피처 일관성 (경기 점수 재계산 기준): 저장 {len(features)}행 / 학습 {len(train_features)}행 / "
+          f"추론 {len(inference_features)}행, 불일치 {mismatches}행")
+    return mismatches
+
+
+class FeatureStore:
+    """(시즌, 라운드)별 파티션 피처 테이블 (내용 해시가 바뀐 파티션만 재작성)"""
+
+    def __init__(self, root=FEATURE_STORE_DIR):
+        self.root = Path(root)
+        self.extension = 'parquet' if HAS_PYARROW else 'csv'
+
+    def partitions(self) -> dict:
+        """저장된 파티션 {(season, game_day): 내용 해시}"""
+        if not self.root.exists():
+            return {}
+        result = {}
+        for path in self.root.glob('season=*/game_day=*/part-*'):
+            season = _partition_value(path.parent.parent.name)
+            result[(season, int(path.parent.name.split('=', 1)[1]))] = path.stem.split('-', 1)[1]
+        return result
+
+    def rounds(self) -> list:
+        """저장된 (season, game_day) 목록"""
+        return sorted(self.partitions())
+
+    def _partition(self, season, game_day) -> Path:
+        return self.root / f'season={season}' / f'game_day={game_day}'
+
+    @stage(rows=lambda result, self, features, overwrite=False, prune=False: len(features))
+    def append(self, features: pd.DataFrame, overwrite=False, prune=False) -> list:
+        """
+        라운드 파티션 저장 (같은 내용 해시의 기존 파티션은 건너뜀, overwrite=True면 모두 재작성)
+
+        Args:
+            prune: features에 없는 라운드 파티션 삭제 (이전 레이아웃 파티션 포함)
+
+        Returns:
+            저장한 (season, game_day) 목록
+        """
+        existing = self.partitions()
+        written = []
+
+        for (season, game_day), rows in features.groupby(ROUND_COLUMNS, sort=True):
+            season = _partition_value(str(season))
+            game_day = int(game_day)
+            rows = rows.drop(columns=ROUND_COLUMNS).reset_index(drop=True)
+            digest = content_hash(rows)
+            if not overwrite and existing.get((season, game_day)) == digest:
+                continue
+
+            # 임시 폴더에 쓴 뒤 이름 변경 (부분 파티션 노출 방지)
+            partition = self._partition(season, game_day)
+            staging = partition.parent / f'.game_day={game_day}.tmp'
+            if staging.exists():
+                shutil.rmtree(staging)
+            staging.mkdir(parents=True)
+            if HAS_PYARROW:
+                rows.to_parquet(staging / f'part-{digest}.parquet', index=False)
+            else:
+                rows.to_csv(staging / f'part-{digest}.csv', index=False, float_format='%.17g')
+            if partition.exists():
+                shutil.rmtree(partition)
+            staging.rename(partition)
+            written.append((season, game_day))
+
+        removed = self.prune(features) if prune else 0
+        rewritten = sum(key in existing for key in written)
+        print(f"  - 피처 스토어: 라운드 {len(written)}개 저장 (재작성 {rewritten}개, 삭제 {removed}개, "
+              f"기존 {len(existing)}개)")
+        return written
+
+    def prune(self, features: pd.DataFrame) -> int:
+        """features에 없는 라운드 파티션과 이전 레이아웃(game_day=<d>) 파티션 삭제"""
+        keep = {(_partition_value(str(season)), int(game_day))
+                for season, game_day in features[ROUND_COLUMNS].drop_duplicates().itertuples(index=False)}
+        stale = [self._partition(*key) for key in self.partitions() if key not in keep]
+        stale += [path for path in self.root.glob('game_day=*') if path.is_dir()]
+        for path in stale:
+            shutil.rmtree(path)
+        for path in self.root.glob('season=*'):
+            if path.is_dir() and not any(path.iterdir()):
+                path.rmdir()
+        return len(stale)
+
+    @stage(rows=lambda result, self, min_day=None, max_day=None, season=None: len(result))
+    def read(self, min_day=None, max_day=None, season=None) -> pd.DataFrame:
+        """라운드 범위 조회 (season: 시즌 또는 시즌 목록, 범위 밖 파티션 파일은 열지 않음)"""
+        frames = []
+        seasons = None if season is None else set(season if isinstance(season, (list, tuple, set)) else [season])
+        for part_season, game_day in self.rounds():
+            if seasons is not None and part_season not in seasons:
+                continue
+            if (min_day is not None and game_day < min_day) or (max_day is not None and game_day > max_day):
+                continue
+            for path in sorted(self._partition(part_season, game_day).glob('part-*')):
+                frame = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_csv(path)
+                frame.insert(1, 'season', part_season)
+                frame.insert(2, 'game_day', game_day)
+                frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=KEY_COLUMNS + ['main_position'] + FEATURE_COLUMNS)
+        return pd.concat(frames, ignore_index=True).sort_values(KEY_COLUMNS, kind='stable').reset_index(drop=True)
+
+    def sync(self, match_scores: pd.DataFrame, match_info: pd.DataFrame) -> pd.DataFrame:
+        """
+        경기 데이터로 피처 계산 후 바뀐 라운드만 저장 (다른 시즌 파티션은 유지)
+
+        Returns:
+            입력 데이터 시즌의 피처 테이블
+        """
+        features = compute_features(match_scores, match_info)
+        self.append(features)
+        return self.read(season=[_partition_value(str(season)) for season in features['season'].unique()])
+
+    def rebuild(self, match_scores: pd.DataFrame, match_info: pd.DataFrame) -> pd.DataFrame:
+        """전체 재작성 + 입력에 없는 파티션 삭제 (전체 시즌 데이터로 실행)"""
+        features = compute_features(match_scores, match_info)
+        self.append(features, overwrite=True, prune=True)
+        return self.read()
+
+
+def content_hash(rows: pd.DataFrame) -> str:
+    """파티션 내용 해시 (컬럼 이름 + 행 값)"""
+    digest = hashlib.sha1(','.join(rows.columns).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _partition_value(name: str):
+    """'season=2024' 또는 '2024' -> 2024 (정수가 아니면 문자열)"""
+    value = name.split('=', 1)[-1]
+    return int(value) if value.lstrip('-').isdigit() else value
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 피처 스토어')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='모든 파티션 재작성, 입력에 없는 시즌/라운드 파티션 삭제')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("K-Fantasy AI - 피처 스토어")
+    print("=" * 60)
+
+    from dataset import load_table
+    match_scores = pd.read_csv(OUTPUT_DIR / 'fantasy_scores_by_match.csv')
+    match_info = load_table('match_info')
+
+    store = FeatureStore()
+    features = store.rebuild(match_scores, match_info) if args.rebuild else store.sync(match_scores, match_info)
+    print(f"\n저장 위치: {store.root} ({store.extension})")
+    print(f"  - 라운드 {len(store.rounds())}개, 행 {len(features)}개")
+
+    start = time.perf_counter()
+    current = latest(store.read())
+    print(f"  - 최신 피처 조회: {len(current)}명 ({(time.perf_counter() - start) * 1000:.1f}ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 선수별 공간 히트맵
+=================================
+선수의 모든 이벤트를 경기장 구역(격자)별로 집계하여 웹앱 히트맵/구역 분석용으로 사전 계산
+
+계산 (한 번의 그룹 집계):
+1. 선수/이벤트 유형을 정수 코드로 변환 (pd.factorize)
+2. 좌표 -> 격자 칸 번호 변환 후 (선수, 유형, x칸, y칸)을 하나의 평탄화 인덱스로 결합
+3. np.bincount 1회로 전체 선수 x 유형 x 격자 히스토그램 생성
+   (선수별 np.histogram2d 반복 대비 파이썬 루프 없음)
+
+저장:
+- outputs/heatmaps.npz: uint16 격자 (선수, 유형, GRID_X, GRID_Y) + 선수/유형 목록
+- JSON 샤드: JSON_GRID 크기로 축소한 히트맵 + 공격 방향 3구역 비율
+
+좌표계 가정: 105m x 68m 경기장, 모든 팀이 x 증가 방향으로 공격
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+HEATMAP_PATH = OUTPUT_DIR / 'heatmaps.npz'
+
+# 경기장 규격 (m) 및 격자 크기 (5m x 약 4.9m)
+PITCH_LENGTH = 105.0
+PITCH_WIDTH = 68.0
+GRID_X = 21
+GRID_Y = 14
+
+# JSON 내보내기용 축소 격자 (GRID_X, GRID_Y의 약수)
+JSON_GRID = (7, 7)
+
+# JSON에 포함할 유형 ('all'은 전체 이벤트 합계)
+JSON_TYPES = ['all', 'Pass', 'Carry', 'Shot', 'Tackle', 'Interception', 'Recovery']
+
+UINT16_MAX = np.iinfo(np.uint16).max
+
+
+class PlayerHeatmaps:
+    """선수 x 이벤트 유형 x 격자 히스토그램"""
+
+    def __init__(self, grid_x=GRID_X, grid_y=GRID_Y):
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.player_ids = None      # (선수,)
+        self.types = None           # (유형,)
+        self.grids = None           # (선수, 유형, grid_x, grid_y) uint16
+
+    def build(self, raw_data: pd.DataFrame):
+        """전체 이벤트를 한 번에 집계"""
+        x = raw_data['start_x'].to_numpy(dtype=np.float64)
+        y = raw_data['start_y'].to_numpy(dtype=np.float64)
+        valid = raw_data['player_id'].notna().to_numpy() & np.isfinite(x) & np.isfinite(y)
+
+        events = raw_data.loc[valid, ['player_id', 'type_name']]
+        player_codes, player_ids = pd.factorize(events['player_id'], sort=True)
+        type_codes, types = pd.factorize(events['type_name'], sort=True)
+
+        cx = np.clip((x[valid] / PITCH_LENGTH * self.grid_x).astype(np.int64), 0, self.grid_x - 1)
+        cy = np.clip((y[valid] / PITCH_WIDTH * self.grid_y).astype(np.int64), 0, self.grid_y - 1)
+
+        shape = (len(player_ids), len(types), self.grid_x, self.grid_y)
+        flat = np.ravel_multi_index((player_codes, type_codes, cx, cy), shape)
+        counts = np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+        self.player_ids = np.asarray(player_ids, dtype=np.int64)
+        self.types = np.asarray(types, dtype=str)
+        self.grids = np.minimum(counts, UINT16_MAX).astype(np.uint16)
+        return self
+
+    def player_grid(self, player_id, type_name='all') -> np.ndarray:
+        """선수 1명의 격자 (type_name='all'이면 전체 유형 합계)"""
+        idx = np.searchsorted(self.player_ids, player_id)
+        if idx >= len(self.player_ids) or self.player_ids[idx] != player_id:
+            return np.zeros((self.grid_x, self.grid_y), dtype=np.uint32)
+        grids = self.grids[idx].astype(np.uint32)
+        if type_name == 'all':
+            return grids.sum(axis=0)
+        matches = np.flatnonzero(self.types == type_name)
+        return grids[matches[0]] if len(matches) else np.zeros_like(grids[0])
+
+    def downsample(self, grids: np.ndarray, size=JSON_GRID) -> np.ndarray:
+        """(..., grid_x, grid_y) -> (..., size[0], size[1]) 블록 합계"""
+        fx, fy = self.grid_x // size[0], self.grid_y // size[1]
+        blocks = grids.reshape(grids.shape[:-2] + (size[0], fx, size[1], fy))
+        return blocks.sum(axis=(-3, -1))
+
+    def to_json(self, types=JSON_TYPES, size=JSON_GRID) -> dict:
+        """
+        선수별 축소 히트맵 (웹앱 샤드용)
+
+        Returns:
+            {player_id: {'grid': [x, y], 'zones': {...}, 'heatmaps': {유형: [[...]]}}}
+        """
+        grids = self.grids.astype(np.uint32)
+        totals = grids.sum(axis=1)                          # (선수, x, y)
+
+        stacked = {'all': totals}
+        for type_name in types:
+            matches = np.flatnonzero(self.types == type_name)
+            if type_name != 'all' and len(matches):
+                stacked[type_name] = grids[:, matches[0]]
+        small = {name: self.downsample(g, size) for name, g in stacked.items()}
+
+        # 공격 방향 3구역 (수비/중앙/공격 1/3) 이벤트 비율
+        thirds = totals.sum(axis=2).reshape(len(self.player_ids), 3, -1).sum(axis=2)
+        shares = thirds / np.maximum(thirds.sum(axis=1, keepdims=True), 1) * 100
+
+        result = {}
+        for i, player_id in enumerate(self.player_ids):
+            result[int(player_id)] = {
+                'grid': list(size),
+                'zones': {
+                    'defensive': round(float(shares[i, 0]), 1),
+                    'middle': round(float(shares[i, 1]), 1),
+                    'attacking': round(float(shares[i, 2]), 1),
+                },
+                'heatmaps': {name: g[i].tolist() for name, g in small.items()},
+            }
+        return result
+
+    def save(self, path=HEATMAP_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, player_ids=self.player_ids, types=self.types, grids=self.grids)
+        return path
+
+    @classmethod
+    def load(cls, path=HEATMAP_PATH):
+        with np.load(path) as data:
+            grids = data['grids']
+            heatmaps = cls(grids.shape[2], grids.shape[3])
+            heatmaps.player_ids = data['player_ids']
+            heatmaps.types = data['types']
+            heatmaps.grids = grids
+        return heatmaps
+
+
+def main():
+    from dataset import load_table
+
+    print("=" * 60)
+    print("K-Fantasy AI - 선수별 히트맵 계산")
+    print("=" * 60)
+
+    raw_data = load_table('raw_data')
+    print(f"  - 이벤트: {len(raw_data):,}건")
+
+    start = time.perf_counter()
+    heatmaps = PlayerHeatmaps().build(raw_data)
+    elapsed = time.perf_counter() - start
+
+    path = heatmaps.save()
+    print(f"\n  - 처리 시간: {elapsed:.3f}s")
+    print(f"  - 선수: {len(heatmaps.player_ids):,}명, 유형: {len(heatmaps.types)}개, 격자: {GRID_X}x{GRID_Y}")
+    print(f"  - 격자 크기: {heatmaps.grids.nbytes / 1024 / 1024:.1f}MB (uint16)")
+    print(f"\n히트맵 저장: {path}")
+
+
+if __name__ == '__main__':
+    main()
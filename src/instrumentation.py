@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 파이프라인 단계별 계측
+=====================================
+파이프라인 각 단계의 실행 시간/CPU 시간/메모리 증가량/처리 행 수를 기록
+
+메모리 (단계별):
+- rss_delta_mb: 단계 종료 시 RSS - 시작 시 RSS (/proc 없는 환경은 None)
+- peak_rss_growth_mb: 단계 동안 프로세스 최대 RSS가 늘어난 양
+  (ru_maxrss는 프로세스 전체 최대치이므로 값 자체가 아니라 단계 전후 차이만 기록,
+   이전 단계보다 적게 쓰는 단계는 0)
+
+사용법:
+    @stage()
+    def detect_assists(self, goals): ...
+
+    with stage_timer('custom_step') as record:
+        ...
+        record['rows'] = len(df)
+
+환경 변수:
+- KFANTASY_PROFILE=1            계측 활성화 (미설정 시 원본 함수 그대로 호출)
+- KFANTASY_PROFILE_LOG=<경로>    JSON 로그를 파일에 추가 (기본: stderr)
+- KFANTASY_PROFILE_DUMP=cprofile|pyinstrument   단계별 프로파일 덤프
+- KFANTASY_PROFILE_DIR=<경로>    프로파일 덤프 폴더 (기본: outputs/profiles)
+"""
+
+import cProfile
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:  # Windows
+    HAS_RESOURCE = False
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+PROFILE_DIR = Path(os.environ.get('KFANTASY_PROFILE_DIR', BASE_DIR / 'outputs' / 'profiles'))
+
+_ENABLED = os.environ.get('KFANTASY_PROFILE', '0').lower() not in ('', '0', 'false', 'no')
+_DUMP = os.environ.get('KFANTASY_PROFILE_DUMP', '').lower()
+_LOG_PATH = os.environ.get('KFANTASY_PROFILE_LOG')
+
+# 현재 프로세스에서 기록된 최근 단계 결과 (벤치마크/테스트에서 조회)
+# 실시간 서버처럼 오래 실행되는 프로세스에서도 메모리가 늘지 않도록 MAX_RECORDS개만 유지
+MAX_RECORDS = 10_000
+records = deque(maxlen=MAX_RECORDS)
+
+
+def enable(dump=None, log_path=None):
+    """코드에서 계측 활성화 (환경 변수 대신)"""
+    global _ENABLED, _DUMP, _LOG_PATH
+    _ENABLED = True
+    if dump is not None:
+        _DUMP = dump
+    if log_path is not None:
+        _LOG_PATH = str(log_path)
+
+
+def disable():
+    global _ENABLED
+    _ENABLED = False
+
+
+def clear_records():
+    """기록된 단계 결과 초기화 (실행 단위로 집계할 때)"""
+    records.clear()
+
+
+def is_enabled():
+    return _ENABLED
+
+
+def peak_rss_mb():
+    """프로세스 최대 RSS (MB, 측정 불가 시 None)"""
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    if sys.platform == 'darwin':
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+def current_rss_mb():
+    """현재 RSS (MB, /proc/self/statm 없는 환경은 None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024, 1)
+
+
+def _difference(after, before):
+    if after is None or before is None:
+        return None
+    return round(after - before, 1)
+
+
+def count_rows(result):
+    """단계 반환값의 행 수 (DataFrame/리스트/딕셔너리)"""
+    if result is None:
+        return None
+    shape = getattr(result, 'shape', None)
+    if shape is not None and len(shape) > 0:
+        return int(shape[0])
+    if isinstance(result, (list, tuple, dict)):
+        return len(result)
+    return None
+
+
+def _emit(record):
+    """구조화 JSON 로그 1줄 출력"""
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    if _LOG_PATH:
+        with open(_LOG_PATH, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    else:
+        print(line, file=sys.stderr)
+
+
+class _Profiler:
+    """단계별 cProfile / pyinstrument 덤프"""
+
+    def __init__(self, name):
+        self.name = name
+        self.profiler = None
+        self.kind = _DUMP
+
+        if self.kind == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+                self.profiler = Profiler()
+            except ImportError:
+                self.kind = 'cprofile'
+
+        if self.kind == 'cprofile':
+            self.profiler = cProfile.Profile()
+
+    def start(self):
+        if self.profiler is None:
+            return
+        if self.kind == 'cprofile':
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+
+    def stop(self):
+        if self.profiler is None:
+            return None
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        if self.kind == 'cprofile':
+            self.profiler.disable()
+            path = PROFILE_DIR / f'{self.name}_{stamp}.prof'
+            self.profiler.dump_stats(path)
+        else:
+            self.profiler.stop()
+            path = PROFILE_DIR / f'{self.name}_{stamp}.html'
+            path.write_text(self.profiler.output_html(), encoding='utf-8')
+        return str(path)
+
+
+@contextmanager
+def stage_timer(name, **extra):
+    """
+    단계 계측 컨텍스트 매니저
+
+    Yields:
+        dict: 기록 레코드 (블록 안에서 'rows' 등 값을 채울 수 있음)
+    """
+    record = {'stage': name, **extra}
+    if not _ENABLED:
+        yield record
+        return
+
+    profiler = _Profiler(name) if _DUMP else None
+    rss_start = current_rss_mb()
+    peak_start = peak_rss_mb()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    if profiler is not None:
+        profiler.start()
+
+    status = 'ok'
+    try:
+        yield record
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        profile_path = profiler.stop() if profiler is not None else None
+        record.update({
+            'status': status,
+            'wall_sec': round(time.perf_counter() - wall_start, 4),
+            'cpu_sec': round(time.process_time() - cpu_start, 4),
+            'rss_delta_mb': _difference(current_rss_mb(), rss_start),
+            'peak_rss_growth_mb': _difference(peak_rss_mb(), peak_start),
+            'timestamp': datetime.now().isoformat(),
+        })
+        if profile_path:
+            record['profile'] = profile_path
+        records.append(record)
+        _emit(record)
+
+
+def stage(name=None, rows=None):
+    """
+    단계 계측 데코레이터
+
+    Args:
+        name: 단계 이름 (기본: 'FantasyCalculator.detect_assists' 형태의 qualname)
+        rows: (result, *args) -> 행 수 함수 (기본: 반환값 길이)
+              키워드로 전달된 인자도 func 시그니처 순서의 위치 인자로 맞추고 기본값을 채워 전달
+    """
+    def decorator(func):
+        stage_name = name or func.__qualname__
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return func(*args, **kwargs)
+
+            with stage_timer(stage_name) as record:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    bound = signature.bind(*args, **kwargs)
+                    bound.apply_defaults()
+                    record['rows'] = rows(result, *bound.args, **bound.kwargs)
+                else:
+                    record['rows'] = count_rows(result)
+            return result
+
+        return wrapper
+
+    return decorator
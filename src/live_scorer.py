@@ -0,0 +1,495 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 실시간 판타지 점수 계산기
+=========================================
+경기 이벤트를 한 건씩 받아 선수별 판타지 점수를 증분 계산하고 점수 변화(delta)를 발행
+
+특징:
+1. 선수-경기별 이벤트 카운터를 유지 (이벤트당 O(1))
+2. 팀별 성공 패스 슬라이딩 윈도우(10초/5초)로 어시스트/키패스 귀속
+3. 팀-경기별 득점/유효슈팅 카운터로 상대 팀 선수의 실점/선방을 즉시 반영
+4. 경기 종료(end_match) 시 출장 시간을 확정하고 클린시트 반영
+   -> 합계는 FantasyCalculator.score_matches와 정확히 일치
+   (OPTIONAL_FANTASY_POINTS의 xG/xT/체인 지표는 실시간으로 계산하지 않음, 기본 배점 0)
+
+입력 소스:
+- CSV 파일 일괄 재생 (iter_csv_events)
+- 기록 중인 CSV 파일 tail (tail_csv_events)
+- 로컬 큐 (iter_queue_events, 소켓 수신기 대용)
+
+주의: 같은 경기의 이벤트는 time_seconds 오름차순으로 들어와야 하며,
+      경기가 끝나면 end_match(또는 전체 종료 시 finish)를 호출해야 합니다.
+"""
+
+import csv
+import math
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+import pandas as pd
+
+from dataset import load_table
+from fantasy_calculator import CLEAN_SHEET_MIN_MINUTES, DATA_PATH, FantasyCalculator, compute_fantasy_score
+from minutes_played import minutes_from_spans
+
+# 어시스트/키패스 윈도우 (초)
+ASSIST_WINDOW = 10
+KEY_PASS_WINDOW = 5
+
+# calculate_player_event_counts + calculate_fantasy_scores 출력 컬럼 순서
+COUNTER_COLUMNS = [
+    'shots', 'shots_on_target', 'goals',
+    'passes_total', 'passes_successful', 'passes_failed',
+    'carries',
+    'tackles_total', 'tackles_successful', 'interceptions', 'blocks', 'clearances', 'recoveries',
+    'duels_total', 'duels_won',
+    'carries_progressive', 'assists', 'key_passes',
+]
+INFO_COLUMNS = ['player_name_ko', 'team_name_ko', 'main_position']
+# join_team_match_stats 컬럼 (실점/선방은 즉시, 클린시트는 경기 종료 시)
+TEAM_MATCH_COLUMNS = ['goals_conceded', 'saves', 'clean_sheet']
+# calculate_minutes 컬럼 (경기 종료 시 확정, 그 전에는 결측)
+MINUTES_COLUMNS = ['minutes', 'started']
+
+# 단순 카운트 이벤트 (type_name -> 카운터)
+SIMPLE_COUNTERS = {
+    'Interception': 'interceptions',
+    'Block': 'blocks',
+    'Clearance': 'clearances',
+    'Recovery': 'recoveries',
+}
+
+# tail 모드에서 숫자로 변환할 컬럼
+NUMERIC_FIELDS = [
+    'game_id', 'player_id', 'team_id', 'episode_id',
+    'time_seconds', 'start_x', 'start_y', 'end_x', 'end_y',
+]
+
+
+def _is_missing(value):
+    """None/NaN 여부"""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_number(value):
+    """CSV 문자열 -> int/float (빈 값은 NaN)"""
+    if value is None or value == '':
+        return float('nan')
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def _coerce_event(row):
+    """csv.DictReader 행의 숫자 컬럼 변환"""
+    for field in NUMERIC_FIELDS:
+        if field in row:
+            row[field] = _to_number(row[field])
+    return row
+
+
+class LiveScorer:
+    """이벤트 단위 증분 판타지 점수 계산기"""
+
+    def __init__(self, on_delta=None):
+        """
+        Args:
+            on_delta: 점수 변화마다 호출되는 콜백 (delta dict 인자)
+        """
+        self.on_delta = on_delta
+        self.players = {}                          # (game_id, player_id) -> 카운터/정보
+        self.game_players = defaultdict(list)      # game_id -> [(player_id, 카운터)]
+        self.pass_windows = defaultdict(deque)     # (game_id, team_id) -> (time, player_id, episode_id)
+        self.team_goals = defaultdict(int)         # (game_id, team_id) -> 득점
+        self.team_on_target = defaultdict(int)     # (game_id, team_id) -> 유효슈팅 (골 제외)
+        self.game_goals = defaultdict(int)         # game_id -> 경기 총 득점
+        self.game_on_target = defaultdict(int)     # game_id -> 경기 총 유효슈팅
+        self.ended = set()
+        self.event_count = 0
+
+    def _get_player(self, event, deltas):
+        """
+        선수-경기 카운터 조회 (첫 이벤트에서 선수 정보 확정)
+        - 출장 구간(첫/마지막 이벤트 시각) 갱신
+        - 늦게 투입된 선수는 그때까지의 팀 실점/선방을 이어받음 (배치는 경기 전체 팀 기록 사용)
+        """
+        game_id, player_id = event['game_id'], event['player_id']
+        event_time = event['time_seconds']
+        team_id = event.get('team_id')
+        player = self.players.get((game_id, player_id))
+        if player is not None:
+            player['first_time'] = min(player['first_time'], event_time)
+            player['last_time'] = max(player['last_time'], event_time)
+            if _is_missing(player['span_team_id']):
+                player['span_team_id'] = team_id
+            return player
+
+        player = {col: event.get(col, 'Unknown') for col in INFO_COLUMNS}
+        player.update({col: 0 for col in COUNTER_COLUMNS + TEAM_MATCH_COLUMNS})
+        player.update({col: None for col in MINUTES_COLUMNS})
+        player['team_id'] = team_id
+        player['span_team_id'] = team_id
+        player['first_time'] = player['last_time'] = event_time
+        player['fantasy_score'] = 0.0
+        self.players[(game_id, player_id)] = player
+        self.game_players[game_id].append((player_id, player))
+
+        if not _is_missing(team_id):
+            inherited = {
+                'goals_conceded': self.game_goals[game_id] - self.team_goals[(game_id, team_id)],
+                'saves': self.game_on_target[game_id] - self.team_on_target[(game_id, team_id)],
+            }
+            if any(inherited.values()):
+                self._apply(player, game_id, player_id, inherited, 'Team_match', event_time, deltas)
+        return player
+
+    def _find_last_pass(self, window, shot_time, shooter_id, window_seconds, episode_id=None,
+                        match_episode=False):
+        """윈도우에서 조건을 만족하는 가장 최근 성공 패스 탐색 (오른쪽부터 스캔)"""
+        for pass_time, passer_id, pass_episode in reversed(window):
+            if pass_time < shot_time - window_seconds:
+                break
+            if pass_time >= shot_time or passer_id == shooter_id:
+                continue
+            if match_episode and not pass_episode == episode_id:
+                continue
+            return passer_id, pass_time
+        return None
+
+    def _credit(self, game_id, passer_id, counter, reason, event_time, deltas):
+        """패스한 선수에게 어시스트/키패스 귀속"""
+        if _is_missing(passer_id):
+            return
+        player = self.players.get((game_id, passer_id))
+        if player is None:
+            return
+        self._apply(player, game_id, passer_id, {counter: 1}, reason, event_time, deltas)
+
+    def _apply(self, player, game_id, player_id, increments, reason, event_time, deltas):
+        """카운터 증가 후 점수 재계산, 변화량 기록"""
+        for counter, value in increments.items():
+            player[counter] += value
+
+        new_score = compute_fantasy_score(player)
+        delta = new_score - player['fantasy_score']
+        player['fantasy_score'] = new_score
+
+        if delta != 0:
+            deltas.append({
+                'game_id': game_id,
+                'player_id': player_id,
+                'player_name_ko': player['player_name_ko'],
+                'team_id': player['team_id'],
+                'team_name_ko': player['team_name_ko'],
+                'time_seconds': event_time,
+                'reason': reason,
+                'delta': delta,
+                'fantasy_score': new_score,
+            })
+
+    def process_event(self, event):
+        """
+        이벤트 1건 처리
+
+        Returns:
+            list: 이번 이벤트로 발생한 점수 변화 목록
+        """
+        self.event_count += 1
+        deltas = []
+
+        game_id = event['game_id']
+        player_id = event.get('player_id')
+        team_id = event.get('team_id')
+        type_name = event.get('type_name')
+        result_name = event.get('result_name')
+        event_time = event['time_seconds']
+
+        # 1. 본인 카운터 갱신
+        if not _is_missing(player_id):
+            player = self._get_player(event, deltas)
+            increments = self._event_increments(event, type_name, result_name)
+            if increments:
+                self._apply(player, game_id, player_id, increments, type_name, event_time, deltas)
+
+        # 2. 슈팅이면 직전 패스에 키패스/어시스트 귀속
+        window = self.pass_windows[(game_id, team_id)]
+        while window and window[0][0] < event_time - ASSIST_WINDOW:
+            window.popleft()
+
+        if type_name == 'Shot':
+            if not _is_missing(team_id) and result_name in ('Goal', 'Successful'):
+                self._team_shot(game_id, team_id, result_name == 'Goal', event_time, deltas)
+
+            key_pass = self._find_last_pass(window, event_time, player_id, KEY_PASS_WINDOW)
+            if key_pass is not None:
+                self._credit(game_id, key_pass[0], 'key_passes', 'Pass_Key', event_time, deltas)
+
+            if result_name == 'Goal':
+                assist = self._find_last_pass(
+                    window, event_time, player_id, ASSIST_WINDOW,
+                    episode_id=event.get('episode_id'),
+                    match_episode='episode_id' in event,
+                )
+                if assist is not None:
+                    self._credit(game_id, assist[0], 'assists', 'Assist', event_time, deltas)
+
+        # 3. 성공 패스는 윈도우에 추가
+        elif type_name == 'Pass' and result_name == 'Successful':
+            window.append((event_time, player_id, event.get('episode_id')))
+
+        if self.on_delta is not None:
+            for delta in deltas:
+                self.on_delta(delta)
+
+        return deltas
+
+    def _team_shot(self, game_id, team_id, is_goal, event_time, deltas):
+        """골/유효슈팅: 팀 카운터 갱신 후 상대 팀 선수의 실점/선방 증가"""
+        if is_goal:
+            self.game_goals[game_id] += 1
+            self.team_goals[(game_id, team_id)] += 1
+            counter, reason = 'goals_conceded', 'Goals_conceded'
+        else:
+            self.game_on_target[game_id] += 1
+            self.team_on_target[(game_id, team_id)] += 1
+            counter, reason = 'saves', 'Save'
+
+        for player_id, player in self.game_players[game_id]:
+            if _is_missing(player['team_id']) or player['team_id'] == team_id:
+                continue
+            self._apply(player, game_id, player_id, {counter: 1}, reason, event_time, deltas)
+
+    def _event_increments(self, event, type_name, result_name):
+        """이벤트 -> 카운터 증가분 (calculate_player_event_counts와 동일 규칙)"""
+        if type_name == 'Shot':
+            return {
+                'shots': 1,
+                'shots_on_target': int(result_name == 'Successful'),
+                'goals': int(result_name == 'Goal'),
+            }
+        if type_name == 'Pass':
+            return {
+                'passes_total': 1,
+                'passes_successful': int(result_name == 'Successful'),
+                'passes_failed': int(result_name == 'Unsuccessful'),
+            }
+        if type_name == 'Carry':
+            start_x, end_x = event.get('start_x'), event.get('end_x')
+            progressive = (
+                not _is_missing(start_x) and not _is_missing(end_x) and end_x > start_x + 10
+            )
+            return {'carries': 1, 'carries_progressive': int(progressive)}
+        if type_name == 'Tackle':
+            return {'tackles_total': 1, 'tackles_successful': int(result_name == 'Successful')}
+        if type_name == 'Duel':
+            return {'duels_total': 1, 'duels_won': int(result_name == 'Successful')}
+        if type_name in SIMPLE_COUNTERS:
+            return {SIMPLE_COUNTERS[type_name]: 1}
+        return None
+
+    def end_match(self, game_id):
+        """
+        경기 종료: 출장 시간 확정 후 클린시트 반영, 패스 윈도우 해제 (카운터는 유지)
+        - 클린시트는 무실점 + CLEAN_SHEET_MIN_MINUTES 이상 출장 (join_team_match_stats와 동일)
+
+        Returns:
+            list: 클린시트 점수 변화 목록 (이미 종료된 경기는 빈 목록)
+        """
+        for key in [k for k in self.pass_windows if k[0] == game_id]:
+            del self.pass_windows[key]
+        if game_id in self.ended:
+            return []
+        self.ended.add(game_id)
+
+        # 배치(player_spans)와 같은 player_id 순서로 교체 짝짓기
+        players = sorted(self.game_players[game_id], key=lambda item: item[0])
+        if not players:
+            return []
+        spans = pd.DataFrame({
+            'game_id': game_id,
+            'player_id': [player_id for player_id, _ in players],
+            'team_id': [player['span_team_id'] for _, player in players],
+            'first_time': [player['first_time'] for _, player in players],
+            'last_time': [player['last_time'] for _, player in players],
+        })
+        minutes = minutes_from_spans(spans)
+        end_time = spans['last_time'].max()
+
+        deltas = []
+        for (player_id, player), played, started in zip(players, minutes['minutes'], minutes['started']):
+            player['minutes'] = played
+            player['started'] = int(started)
+            if player['goals_conceded'] == 0 and played >= CLEAN_SHEET_MIN_MINUTES:
+                self._apply(player, game_id, player_id, {'clean_sheet': 1}, 'Clean_sheet', end_time, deltas)
+
+        if self.on_delta is not None:
+            for delta in deltas:
+                self.on_delta(delta)
+        return deltas
+
+    def finish(self):
+        """아직 종료되지 않은 모든 경기 종료 처리 (재생/일괄 처리 끝)"""
+        deltas = []
+        for game_id in list(self.game_players):
+            deltas.extend(self.end_match(game_id))
+        return deltas
+
+    def run(self, events):
+        """이벤트 이터러블 전체 처리 후 모든 경기 종료"""
+        for event in events:
+            self.process_event(event)
+        self.finish()
+        return self
+
+    def totals(self) -> pd.DataFrame:
+        """현재까지의 선수-경기별 합계 (calculate_fantasy_scores 출력과 동일 컬럼)"""
+        rows = []
+        for (game_id, player_id), player in self.players.items():
+            row = {'game_id': game_id, 'player_id': player_id}
+            row.update({col: player[col] for col in INFO_COLUMNS + COUNTER_COLUMNS + MINUTES_COLUMNS
+                        + TEAM_MATCH_COLUMNS})
+            row['fantasy_score'] = player['fantasy_score']
+            rows.append(row)
+
+        columns = (['game_id', 'player_id'] + INFO_COLUMNS + COUNTER_COLUMNS + MINUTES_COLUMNS
+                   + TEAM_MATCH_COLUMNS + ['fantasy_score'])
+        totals_df = pd.DataFrame(rows, columns=columns)
+        return totals_df.sort_values(['game_id', 'player_id']).reset_index(drop=True)
+
+
+# ============================================================================
+# 이벤트 소스
+# ============================================================================
+
+def sort_events(raw_data: pd.DataFrame) -> pd.DataFrame:
+    """경기 시간 순 정렬 (경기 내 time_seconds 오름차순)"""
+    return raw_data.sort_values(['game_id', 'time_seconds'], kind='stable')
+
+
+def kickoff_order(raw_data: pd.DataFrame) -> pd.DataFrame:
+    """여러 경기를 동시에 킥오프한 것처럼 경기 내 경과 시간 순으로 병합 (경기 내 순서 유지)"""
+    elapsed = raw_data['time_seconds'] - raw_data.groupby('game_id')['time_seconds'].transform('min')
+    order = np.lexsort((raw_data['game_id'].to_numpy(), elapsed.to_numpy()))
+    return raw_data.iloc[order]
+
+
+def iter_csv_events(path, chunksize=100_000):
+    """CSV 파일을 청크 단위로 읽어 경기 시간 순으로 이벤트 발행"""
+    raw_data = sort_events(pd.read_csv(path))
+    for start in range(0, len(raw_data), chunksize):
+        for event in raw_data.iloc[start:start + chunksize].to_dict('records'):
+            yield event
+
+
+def tail_csv_events(path, poll_interval=0.5, stop=None):
+    """
+    기록 중인 CSV 파일을 tail -f 방식으로 읽어 이벤트 발행
+
+    Args:
+        path: CSV 경로 (헤더 포함)
+        poll_interval: 새 행이 없을 때 대기 시간 (초)
+        stop: 호출 시 True를 반환하면 종료 (예: threading.Event().is_set)
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        header = next(csv.reader([f.readline()]))
+        buffer = ''
+        while True:
+            line = f.readline()
+            if not line:
+                if stop is not None and stop():
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            buffer += line
+            if not buffer.endswith('\n'):
+                continue  # 아직 기록 중인 행
+
+            values = next(csv.reader([buffer]))
+            buffer = ''
+            if values:
+                yield _coerce_event(dict(zip(header, values)))
+
+
+def iter_queue_events(queue, sentinel=None):
+    """큐에서 이벤트를 꺼내 발행 (sentinel 수신 시 종료)"""
+    while True:
+        event = queue.get()
+        if event is sentinel:
+            return
+        yield event
+
+
+# ============================================================================
+# 배치 결과와 비교
+# ============================================================================
+
+def compare_with_batch(stream_df: pd.DataFrame, batch_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    스트리밍 합계와 배치 결과 비교
+
+    Returns:
+        DataFrame: 불일치 선수-경기 목록 (비어 있으면 완전 일치, 종료되지 않은 경기는 출장 시간 불일치)
+    """
+    compared = COUNTER_COLUMNS + MINUTES_COLUMNS + TEAM_MATCH_COLUMNS + ['fantasy_score']
+    columns = ['game_id', 'player_id'] + compared
+    merged = batch_df[columns].merge(
+        stream_df[columns], on=['game_id', 'player_id'],
+        how='outer', suffixes=('_batch', '_stream'), indicator=True
+    )
+
+    mismatch = merged['_merge'] != 'both'
+    for col in compared:
+        mismatch |= merged[f'{col}_batch'] != merged[f'{col}_stream']
+
+    return merged[mismatch]
+
+
+def run_batch(raw_data: pd.DataFrame) -> pd.DataFrame:
+    """FantasyCalculator.run과 같은 경로(score_matches)로 경기별 점수 계산"""
+    calculator = FantasyCalculator()
+    calculator.raw_data = raw_data
+    return calculator.score_matches()
+
+
+def main():
+    print("=" * 60)
+    print("K-Fantasy AI - 실시간 판타지 점수 계산")
+    print("=" * 60)
+
+    raw_data = sort_events(load_table('raw_data'))
+    print(f"  - 이벤트: {len(raw_data):,}건")
+
+    # 1. 스트리밍 계산
+    print("\n스트리밍 계산 중...")
+    scorer = LiveScorer()
+    start = time.perf_counter()
+    delta_count = 0
+    for event in raw_data.to_dict('records'):
+        delta_count += len(scorer.process_event(event))
+    delta_count += len(scorer.finish())
+    elapsed = time.perf_counter() - start
+    print(f"  - 처리 속도: {scorer.event_count / elapsed:,.0f} events/sec")
+    print(f"  - 점수 변화: {delta_count:,}건")
+
+    # 2. 배치 결과와 비교
+    print("\n배치 결과와 비교 중...")
+    mismatches = compare_with_batch(scorer.totals(), run_batch(raw_data))
+
+    print("\n" + "=" * 60)
+    if len(mismatches) == 0:
+        print("배치 결과와 완전히 일치합니다.")
+    else:
+        print(f"불일치: {len(mismatches)}건")
+        print(mismatches.head(10).to_string(index=False))
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,605 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 실시간 점수 푸시 서버
+=====================================
+LiveScorer의 점수 변화(delta)를 구독 중인 웹 클라이언트들에게 전파
+
+구성:
+1. LiveHub: delta를 틱(기본 250ms) 단위로 선수별 병합 후 구독자에게 배포
+2. 구독 필터: 팀(team_id/team_name_ko), 라인업(player_id), 경기(game_id)
+3. 백프레셔: 클라이언트별 제한 큐, 가득 차면 가장 오래된 배치를 버리고
+   연속으로 너무 많이 밀리면 연결 종료 (메시지에 누적 점수가 있어 유실돼도 복구 가능)
+4. SSE (표준 라이브러리 asyncio), WebSocket (websockets 설치 시)
+5. GET /rankings: 통합 랭킹 인덱스 top-k 조회 (players.json 기준)
+6. 부하 테스트: 원본 이벤트 또는 fantasy_scores_by_match 기반 재생기 + 다수 SSE 클라이언트
+
+실행:
+    python live_server.py serve [--speed 10]
+    python live_server.py loadtest [--clients 2000 --speed 60]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from dataset import load_table
+from live_scorer import LiveScorer, kickoff_order
+from ranking_index import RankingIndex, query_rankings
+
+try:
+    import websockets
+    HAS_WEBSOCKETS = True
+except ImportError:
+    HAS_WEBSOCKETS = False
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+PLAYERS_JSON_PATH = BASE_DIR / 'web' / 'public' / 'data' / 'players.json'
+
+# 서버 설정
+TICK_INTERVAL = 0.25          # 배치/병합 주기 (초)
+CLIENT_QUEUE_SIZE = 32        # 클라이언트별 대기 배치 수
+MAX_CONSECUTIVE_DROPS = 40    # 이 이상 연속으로 밀리면 연결 종료 (약 10초)
+HEARTBEAT_INTERVAL = 15.0     # SSE 유휴 시 ping 주기 (초)
+SEND_TIMEOUT = MAX_CONSECUTIVE_DROPS * TICK_INTERVAL   # 전송 1건(drain)이 이보다 오래 막히면 연결 종료
+
+
+class Subscription:
+    """클라이언트 구독 조건 (비어 있으면 전체 구독)"""
+
+    def __init__(self, teams=None, players=None, games=None):
+        self.teams = frozenset(str(t) for t in (teams or []))
+        self.players = frozenset(str(p) for p in (players or []))
+        self.games = frozenset(str(g) for g in (games or []))
+        self.key = (self.teams, self.players, self.games)
+
+    @classmethod
+    def from_query(cls, query):
+        """?teams=a,b&players=1,2&games=3 형태 파싱"""
+        params = parse_qs(query)
+
+        def split(name):
+            return [v for value in params.get(name, []) for v in value.split(',') if v]
+
+        return cls(split('teams'), split('players'), split('games'))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('teams'), data.get('players'), data.get('games'))
+
+    def matches(self, update):
+        if self.games and _key(update['game_id']) not in self.games:
+            return False
+        if not self.teams and not self.players:
+            return True
+        if self.players and _key(update['player_id']) in self.players:
+            return True
+        return bool(self.teams) and (
+            _key(update['team_id']) in self.teams or str(update['team_name_ko']) in self.teams
+        )
+
+
+def _key(value):
+    """숫자 ID 문자열 정규화 (61979.0 -> '61979')"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Client:
+    """연결된 클라이언트 (제한 큐 + 백프레셔 상태)"""
+
+    def __init__(self, subscription, queue_size=CLIENT_QUEUE_SIZE):
+        self.subscription = subscription
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.consecutive_drops = 0
+        self.closed = asyncio.Event()
+
+    def offer(self, payload):
+        """배치 전달 (가득 차면 가장 오래된 배치 폐기)"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.consecutive_drops += 1
+            if self.consecutive_drops >= MAX_CONSECUTIVE_DROPS:
+                self.closed.set()
+        else:
+            self.consecutive_drops = 0
+        self.queue.put_nowait(payload)
+
+
+class LiveHub:
+    """점수 변화 병합/배포 허브"""
+
+    def __init__(self, tick_interval=TICK_INTERVAL):
+        self.tick_interval = tick_interval
+        self.clients = set()
+        self.pending = {}            # (game_id, player_id) -> 병합된 업데이트
+        self.tick = 0
+        self.stats = {'deltas': 0, 'batches': 0, 'messages': 0, 'dropped': 0, 'disconnected': 0}
+
+    def publish(self, delta):
+        """LiveScorer on_delta 콜백: 틱 내 동일 선수 delta 병합"""
+        self.stats['deltas'] += 1
+        key = (delta['game_id'], delta['player_id'])
+        update = self.pending.get(key)
+        if update is None:
+            self.pending[key] = {
+                'game_id': delta['game_id'],
+                'player_id': delta['player_id'],
+                'player_name_ko': delta['player_name_ko'],
+                'team_id': delta['team_id'],
+                'team_name_ko': delta['team_name_ko'],
+                'delta': delta['delta'],
+                'score': delta['fantasy_score'],
+                'time_seconds': delta['time_seconds'],
+            }
+        else:
+            update['delta'] += delta['delta']
+            update['score'] = delta['fantasy_score']
+            update['time_seconds'] = delta['time_seconds']
+
+    def register(self, subscription):
+        client = Client(subscription)
+        self.clients.add(client)
+        return client
+
+    def unregister(self, client):
+        if client in self.clients:
+            self.clients.discard(client)
+            self.stats['dropped'] += client.dropped
+
+    def flush(self):
+        """대기 중인 업데이트를 구독 조건별로 한 번씩만 직렬화하여 배포"""
+        if not self.pending:
+            return
+        updates = [_round_update(u) for u in self.pending.values()]
+        self.pending = {}
+        self.tick += 1
+        self.stats['batches'] += 1
+        sent_at = time.time()
+
+        payload_cache = {}
+        for client in list(self.clients):
+            sub = client.subscription
+            payload = payload_cache.get(sub.key)
+            if payload is None:
+                selected = [u for u in updates if sub.matches(u)]
+                payload = _encode_batch(self.tick, sent_at, selected) if selected else b''
+                payload_cache[sub.key] = payload
+            if payload:
+                client.offer(payload)
+                self.stats['messages'] += 1
+
+    async def run(self, stop):
+        """틱 루프"""
+        while not stop.is_set():
+            await asyncio.sleep(self.tick_interval)
+            self.flush()
+        self.flush()
+
+
+def _round_update(update):
+    update = dict(update)
+    update['game_id'] = _json_id(update['game_id'])
+    update['player_id'] = _json_id(update['player_id'])
+    update['team_id'] = _json_id(update['team_id'])
+    update['delta'] = round(update['delta'], 2)
+    update['score'] = round(update['score'], 2)
+    return update
+
+
+def _json_id(value):
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return int(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def _encode_batch(tick, sent_at, updates):
+    """SSE 프레임 (data: {...}\\n\\n)"""
+    body = json.dumps({'type': 'scores', 'tick': tick, 'sentAt': sent_at, 'updates': updates},
+                      ensure_ascii=False)
+    return f"data: {body}\n\n".encode('utf-8')
+
+
+# ============================================================================
+# SSE / WebSocket 서버
+# ============================================================================
+
+async def _write_json(writer, status, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                 f"Access-Control-Allow-Origin: *\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: close\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    writer.close()
+
+
+async def handle_sse(hub, reader, writer, rankings=None):
+    """
+    GET /stream?teams=...&players=...&games=... (text/event-stream)
+    GET /rankings?metric=...&k=...&group=...&team=...&min_price=...&max_price=... (JSON)
+    """
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass  # 헤더 무시
+        parts = request_line.decode('latin-1').split()
+        url = urlsplit(parts[1] if len(parts) > 1 else '/')
+    except (ConnectionError, asyncio.IncompleteReadError):
+        writer.close()
+        return
+
+    if url.path == '/health':
+        await _write_json(writer, '200 OK', {'clients': len(hub.clients), **hub.stats})
+        return
+
+    if url.path == '/rankings':
+        if rankings is None:
+            await _write_json(writer, '404 Not Found', {'error': 'players.json 없음'})
+            return
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            result = query_rankings(rankings, params)
+        except ValueError as e:
+            await _write_json(writer, '400 Bad Request', {'error': str(e)})
+            return
+        await _write_json(writer, '200 OK', result)
+        return
+
+    if url.path != '/stream':
+        writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        writer.close()
+        return
+
+    client = hub.register(Subscription.from_query(url.query))
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                 b"Cache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\n"
+                 b"Connection: keep-alive\r\n\r\n")
+    async def send(payload):
+        writer.write(payload)
+        await writer.drain()
+
+    try:
+        await _pump(client, send, b": ping\n\n")
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        hub.unregister(client)
+        if client.closed.is_set():
+            hub.stats['disconnected'] += 1
+            writer.transport.abort()  # 밀린 송신 버퍼를 기다리지 않고 끊음
+        else:
+            writer.close()
+
+
+async def _pump(client, send, heartbeat):
+    """
+    클라이언트 큐 -> 소켓 (전송 대기가 느린 소비자의 백프레셔)
+    - drain에서 SEND_TIMEOUT 이상 막히면 느린 소비자로 보고 closed 설정 후 종료
+    """
+    while not client.closed.is_set():
+        try:
+            payload = await asyncio.wait_for(client.queue.get(), HEARTBEAT_INTERVAL)
+        except asyncio.TimeoutError:
+            payload = heartbeat
+        try:
+            await asyncio.wait_for(send(payload), SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            client.closed.set()
+
+
+async def handle_websocket(hub, websocket):
+    """첫 메시지로 구독 조건 JSON 수신 후 배치 전송"""
+    try:
+        subscription = Subscription.from_dict(json.loads(await websocket.recv()))
+    except (ValueError, websockets.ConnectionClosed):
+        return
+
+    client = hub.register(subscription)
+
+    async def send(payload):
+        await websocket.send(payload[len(b'data: '):].strip().decode('utf-8'))
+
+    try:
+        await _pump(client, send, b'data: {"type": "ping"}\n\n')
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        if client.closed.is_set():
+            hub.stats['disconnected'] += 1
+        hub.unregister(client)
+
+
+async def start_servers(hub, host='127.0.0.1', port=8765, ws_port=None, rankings=None):
+    """SSE 서버 (및 선택적으로 WebSocket 서버) 시작"""
+    servers = [await asyncio.start_server(lambda r, w: handle_sse(hub, r, w, rankings), host, port, backlog=4096)]
+    print(f"  - SSE: http://{host}:{port}/stream")
+    if rankings is not None:
+        print(f"  - 랭킹: http://{host}:{port}/rankings (선수 {len(rankings)}명)")
+
+    if ws_port is not None:
+        if HAS_WEBSOCKETS:
+            servers.append(await websockets.serve(lambda ws: handle_websocket(hub, ws), host, ws_port))
+            print(f"  - WebSocket: ws://{host}:{ws_port}")
+        else:
+            print("  - websockets 미설치, WebSocket 비활성화")
+
+    return servers
+
+
+# ============================================================================
+# 재생기 (부하 테스트용 스코어링 스트림)
+# ============================================================================
+
+async def replay_events(hub, events, speed=10.0):
+    """
+    원본 이벤트를 경기 시간 기준으로 재생하여 LiveScorer -> LiveHub로 전달
+
+    Args:
+        events: kickoff_order로 정렬된 이벤트 (모든 경기가 동시에 킥오프)
+        speed: 재생 배속 (None이면 최대 속도)
+    """
+    scorer = LiveScorer(on_delta=hub.publish)
+    start = time.perf_counter()
+    kickoff = {}                 # game_id -> 첫 이벤트 시각
+    last_event = {event['game_id']: i for i, event in enumerate(events)}
+
+    for i, event in enumerate(events):
+        if speed is not None:
+            base_time = kickoff.setdefault(event['game_id'], event['time_seconds'])
+            wait = (event['time_seconds'] - base_time) / speed - (time.perf_counter() - start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        scorer.process_event(event)
+        # 경기의 마지막 이벤트 후 종료 처리 (클린시트 확정)
+        if last_event[event['game_id']] == i:
+            scorer.end_match(event['game_id'])
+
+    return scorer
+
+
+def deltas_from_match_scores(match_scores: pd.DataFrame, steps=18, seed=42):
+    """
+    fantasy_scores_by_match로부터 합성 delta 스트림 생성 (원본 이벤트가 없을 때)
+    - 각 선수의 경기 점수를 90분 동안 steps개 조각으로 무작위 분할
+    - 모든 경기를 같은 킥오프로 가정
+    """
+    rng = np.random.default_rng(seed)
+    n = len(match_scores)
+
+    weights = rng.dirichlet(np.ones(steps), size=n)
+    pieces = weights * match_scores['fantasy_score'].to_numpy()[:, None]
+    times = np.sort(rng.uniform(0, 90 * 60, size=(n, steps)), axis=1)
+
+    row_idx = np.repeat(np.arange(n), steps)
+    order = np.argsort(times.ravel(), kind='stable')
+    cumulative = np.cumsum(pieces, axis=1).ravel()
+
+    team_col = 'team_id' if 'team_id' in match_scores.columns else 'team_name_ko'
+    columns = ['game_id', 'player_id', 'player_name_ko', 'team_name_ko']
+    if team_col not in columns:
+        columns.append(team_col)
+    records = match_scores[columns].to_dict('records')
+    flat_pieces = pieces.ravel()
+    flat_times = times.ravel()
+
+    for i in order:
+        row = records[row_idx[i]]
+        yield {
+            'game_id': row['game_id'],
+            'player_id': row['player_id'],
+            'player_name_ko': row['player_name_ko'],
+            'team_id': row[team_col],
+            'team_name_ko': row['team_name_ko'],
+            'time_seconds': float(flat_times[i]),
+            'reason': 'replay',
+            'delta': float(flat_pieces[i]),
+            'fantasy_score': float(cumulative[i]),
+        }
+
+
+async def replay_deltas(hub, deltas, speed=10.0):
+    """합성 delta 스트림 재생"""
+    start = time.perf_counter()
+    for delta in deltas:
+        if speed is not None:
+            wait = delta['time_seconds'] / speed - (time.perf_counter() - start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        hub.publish(delta)
+
+
+# ============================================================================
+# 부하 테스트
+# ============================================================================
+
+async def _sse_client(host, port, query, results, read_delay=0.0):
+    """SSE 클라이언트: 수신 메시지 수/지연 기록 (read_delay로 느린 소비자 흉내)"""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        results['failed'] += 1
+        return
+    writer.write(f"GET /stream?{query} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('utf-8'))
+    await writer.drain()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b'data: '):
+                message = json.loads(line[6:])
+                results['messages'] += 1
+                results['updates'] += len(message.get('updates', []))
+                results['latencies'].append(time.time() - message['sentAt'])
+                if read_delay:
+                    await asyncio.sleep(read_delay)
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_load_test(n_clients=1000, speed=60.0, max_matches=2, slow_ratio=0.05,
+                        host='127.0.0.1', port=8765):
+    """
+    N개의 SSE 클라이언트를 붙이고 경기를 재생하여 배포 성능 측정
+    - 클라이언트의 구독은 전체/팀/라인업이 섞이도록 구성
+    - slow_ratio 비율의 클라이언트는 느리게 읽어 백프레셔 동작 확인
+    """
+    events, match_scores = _load_replay_source(max_matches)
+    teams = sorted(match_scores['team_name_ko'].dropna().unique())
+    players = match_scores['player_id'].dropna().unique()
+    rng = np.random.default_rng(42)
+
+    hub = LiveHub()
+    stop = asyncio.Event()
+    servers = await start_servers(hub, host, port)
+    tick_task = asyncio.create_task(hub.run(stop))
+
+    results = {'messages': 0, 'updates': 0, 'latencies': [], 'failed': 0}
+    client_tasks = []
+    for i in range(n_clients):
+        kind = i % 3
+        if kind == 0:
+            query = ''
+        elif kind == 1:
+            query = 'teams=' + quote(teams[i % len(teams)])
+        else:
+            lineup = rng.choice(players, size=min(11, len(players)), replace=False)
+            query = 'players=' + ','.join(_key(p) for p in lineup)
+        read_delay = 1.0 if rng.random() < slow_ratio else 0.0
+        client_tasks.append(asyncio.create_task(_sse_client(host, port, query, results, read_delay)))
+    await asyncio.sleep(0.5)
+    print(f"  - 연결 클라이언트: {len(hub.clients):,}개")
+
+    start = time.perf_counter()
+    if events is not None:
+        await replay_events(hub, events, speed)
+    else:
+        await replay_deltas(hub, deltas_from_match_scores(match_scores), speed)
+    stop.set()
+    await tick_task
+    await asyncio.sleep(1.0)
+    elapsed = time.perf_counter() - start
+
+    for task in client_tasks:
+        task.cancel()
+    await asyncio.gather(*client_tasks, return_exceptions=True)
+    for server in servers:
+        server.close()
+
+    latencies = np.array(results['latencies']) * 1000
+    report = {
+        'clients': n_clients,
+        'elapsed_sec': round(elapsed, 2),
+        'deltas_in': hub.stats['deltas'],
+        'batches': hub.stats['batches'],
+        'messages_sent': hub.stats['messages'],
+        'messages_received': results['messages'],
+        'messages_per_sec': round(results['messages'] / elapsed, 1),
+        'dropped_batches': hub.stats['dropped'] + sum(c.dropped for c in hub.clients),
+        'disconnected_slow': hub.stats['disconnected'],
+        'failed_connections': results['failed'],
+        'latency_p50_ms': round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+        'latency_p99_ms': round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None,
+    }
+    return report
+
+
+def _load_replay_source(max_matches):
+    """원본 이벤트가 있으면 사용, 없으면 fantasy_scores_by_match로 대체"""
+    match_scores = pd.read_csv(OUTPUT_DIR / 'fantasy_scores_by_match.csv')
+    game_ids = sorted(match_scores['game_id'].unique())[:max_matches]
+    match_scores = match_scores[match_scores['game_id'].isin(game_ids)]
+
+    try:
+        raw_data = load_table('raw_data')
+        raw_data = raw_data[raw_data['game_id'].isin(game_ids)]
+    except FileNotFoundError:
+        raw_data = None
+    if raw_data is not None and len(raw_data) > 0:
+        raw_data = kickoff_order(raw_data)
+        print(f"  - 재생 소스: raw_data ({len(raw_data):,}건, {len(game_ids)}경기)")
+        return raw_data.to_dict('records'), match_scores
+
+    print(f"  - 재생 소스: fantasy_scores_by_match ({len(match_scores):,}건, {len(game_ids)}경기)")
+    return None, match_scores
+
+
+def _load_rankings():
+    """웹 데이터(players.json)로 랭킹 인덱스 생성 (없으면 None)"""
+    if not PLAYERS_JSON_PATH.exists():
+        return None
+    with open(PLAYERS_JSON_PATH, encoding='utf-8') as f:
+        return RankingIndex.from_players(json.load(f))
+
+
+async def serve(host, port, ws_port, speed, max_matches):
+    """서버 실행 + 재생기로 점수 스트림 공급"""
+    hub = LiveHub()
+    stop = asyncio.Event()
+    servers = await start_servers(hub, host, port, ws_port, rankings=_load_rankings())
+    tick_task = asyncio.create_task(hub.run(stop))
+
+    events, match_scores = _load_replay_source(max_matches)
+    if events is not None:
+        await replay_events(hub, events, speed)
+    else:
+        await replay_deltas(hub, deltas_from_match_scores(match_scores), speed)
+
+    print("  - 재생 완료, 서버 유지 중 (Ctrl+C로 종료)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        stop.set()
+        await tick_task
+        for server in servers:
+            server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 실시간 점수 푸시 서버')
+    parser.add_argument('mode', choices=['serve', 'loadtest'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ws-port', type=int, default=None)
+    parser.add_argument('--speed', type=float, default=10.0, help='재생 배속 (0이면 최대 속도)')
+    parser.add_argument('--matches', type=int, default=2)
+    parser.add_argument('--clients', type=int, default=1000)
+    args = parser.parse_args()
+    speed = args.speed or None
+
+    print("=" * 60)
+    print("K-Fantasy AI - 실시간 점수 푸시 서버")
+    print("=" * 60)
+
+    if args.mode == 'serve':
+        try:
+            asyncio.run(serve(args.host, args.port, args.ws_port, speed, args.matches))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    report = asyncio.run(run_load_test(args.clients, speed, args.matches, host=args.host, port=args.port))
+    print("\n부하 테스트 결과:")
+    for key, value in report.items():
+        print(f"  - {key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
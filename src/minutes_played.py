@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 출장 시간 추정
+=============================
+이벤트 로그에는 교체 기록이 없으므로 선수별 첫/마지막 이벤트 시각과
+팀 단위 교체 공백으로 출장 구간을 추정
+
+추정 규칙:
+1. 경기 시작 후 STARTER_WINDOW 이내에 첫 이벤트가 있으면 선발 (0분 투입)
+2. 마지막 이벤트가 경기 종료 EXIT_WINDOW 이전이면 조기 교체/퇴장
+3. 같은 팀에서 n번째로 늦게 투입된 선수와 n번째로 일찍 빠진 선발을 짝지어
+   교체 시각 = (빠진 선수 마지막 이벤트 + 들어온 선수 첫 이벤트) / 2
+4. 짝이 없는 조기 이탈은 마지막 이벤트, 짝이 없는 교체 투입은 첫 이벤트 시각 사용
+5. 추가 시간을 포함한 실제 경기 길이를 90분으로 정규화
+
+모든 계산은 선수-경기 단위 groupby 1회 + 팀 단위 순번 병합으로 벡터화
+(실시간 계산기는 선수별 첫/마지막 이벤트 시각만 유지하다가 경기 종료 시 minutes_from_spans 호출)
+"""
+
+import numpy as np
+import pandas as pd
+
+MATCH_MINUTES = 90
+STARTER_WINDOW = 15 * 60     # 초
+EXIT_WINDOW = 10 * 60        # 초
+
+# 90분당 지표 계산 시 최소 출장 시간 (짧은 교체 출전의 과대 추정 방지)
+MIN_PER90_MINUTES = 45
+
+
+def player_spans(raw_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    선수-경기별 출장 구간 원자료
+
+    Returns:
+        DataFrame[game_id, player_id, team_id, first_time, last_time] ((game_id, player_id) 순 정렬)
+    """
+    events = raw_data.dropna(subset=['player_id'])
+    return events.groupby(['game_id', 'player_id']).agg(
+        team_id=('team_id', 'first'),
+        first_time=('time_seconds', 'min'),
+        last_time=('time_seconds', 'max'),
+    ).reset_index()
+
+
+def estimate_minutes(raw_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    선수-경기별 출장 시간 추정
+
+    Returns:
+        DataFrame[game_id, player_id, minutes, started]
+    """
+    return minutes_from_spans(player_spans(raw_data))
+
+
+def minutes_from_spans(spans: pd.DataFrame) -> pd.DataFrame:
+    """
+    출장 구간 원자료(player_spans 형식) -> 출장 시간
+
+    Returns:
+        DataFrame[game_id, player_id, minutes, started]
+    """
+    spans = spans.reset_index(drop=True)
+    game_times = spans.groupby('game_id').agg(min=('first_time', 'min'), max=('last_time', 'max'))
+    game_start = spans['game_id'].map(game_times['min']).to_numpy()
+    game_end = spans['game_id'].map(game_times['max']).to_numpy()
+    first_time = spans['first_time'].to_numpy()
+    last_time = spans['last_time'].to_numpy()
+
+    started = first_time - game_start <= STARTER_WINDOW
+    left_early = game_end - last_time > EXIT_WINDOW
+
+    on_time = np.where(started, game_start, first_time)
+    off_time = np.where(left_early, last_time, game_end)
+
+    # 팀 단위 교체 짝짓기 (n번째 투입 <-> n번째 이탈)
+    keys = ['game_id', 'team_id']
+    entries = spans.loc[~started, keys + ['first_time']].sort_values(keys + ['first_time'])
+    entries['k'] = entries.groupby(keys).cumcount()
+    exits = spans.loc[started & left_early, keys + ['last_time']].sort_values(keys + ['last_time'])
+    exits['k'] = exits.groupby(keys).cumcount()
+
+    pairs = entries.reset_index().merge(
+        exits.reset_index(), on=keys + ['k'], suffixes=('_in', '_out')
+    )
+    swap_time = np.where(
+        pairs['last_time'] < pairs['first_time'],
+        (pairs['last_time'] + pairs['first_time']) / 2,
+        pairs['first_time'],
+    )
+    on_time[pairs['index_in'].to_numpy()] = swap_time
+    off_time[pairs['index_out'].to_numpy()] = swap_time
+
+    match_length = np.maximum(game_end - game_start, 1)
+    minutes = (off_time - on_time) / match_length * MATCH_MINUTES
+
+    return pd.DataFrame({
+        'game_id': spans['game_id'],
+        'player_id': spans['player_id'],
+        'minutes': np.clip(minutes, 1, MATCH_MINUTES).round(1),
+        'started': started.astype(int),
+    })
+
+
+def per_90(values, minutes):
+    """90분당 환산 (출장 시간은 MIN_PER90_MINUTES 이상으로 보정)"""
+    return values / np.maximum(minutes, MIN_PER90_MINUTES) * MATCH_MINUTES
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 보유율 시뮬레이션
+================================
+가상 매니저 수십만 명의 스쿼드를 예산/포메이션 제약 하에 샘플링하여 선수별 보유율(%) 추정
+(가격 변동 압력, 저보유 '차별화' 선수 추천에 사용)
+
+샘플링 (NumPy 벡터화, CHUNK_SIZE 매니저씩 처리하여 메모리 상한 유지):
+1. 매니저마다 포메이션(FORMATIONS)과 예산(BUDGET_OPTIONS) 무작위 배정
+2. 선수 선택 가중치: log w = SCORE_WEIGHT x z(예측 점수) + VALUE_WEIGHT x z(점수/가격) - λ(예산) x 가격
+   - λ는 예산별로 기대 스쿼드 비용이 예산의 TARGET_SPEND가 되도록 이분 탐색
+3. 포지션 그룹별 Gumbel top-k: 가중치 로그 + Gumbel 잡음 상위 k개
+   = 가중치 비례 비복원 순차 추출 (포메이션 슬롯 수만큼 사용)
+4. 예산 초과 매니저만 다시 샘플링 (최대 MAX_ATTEMPTS회, 이후 남은 매니저는 제외)
+5. 선택된 선수 인덱스 bincount -> 보유율
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+from pricing import FORMATIONS, GROUPS, position_group
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+OWNERSHIP_PATH = OUTPUT_DIR / 'ownership.csv'
+
+# 웹앱 My Team 예산 선택지 (web/src/app/my-team/page.tsx BUDGET_OPTIONS)
+BUDGET_OPTIONS = [80, 100, 120]
+
+N_MANAGERS = 200_000
+CHUNK_SIZE = 25_000
+MAX_ATTEMPTS = 20
+SCORE_WEIGHT = 2.5
+VALUE_WEIGHT = 1.5
+TARGET_SPEND = 0.9               # 기대 스쿼드 비용 / 예산
+DIFFERENTIAL_OWNERSHIP = 5.0     # 차별화 선수 기준 보유율 (%)
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    std = values.std()
+    return (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+
+
+def selection_logits(predictions: pd.DataFrame, prices: np.ndarray) -> np.ndarray:
+    """선수 선택 로그 가중치 (가격 패널티 제외)"""
+    scores = predictions['predicted_score'].fillna(0).to_numpy(dtype=np.float64).clip(min=0)
+    return SCORE_WEIGHT * _zscore(scores) + VALUE_WEIGHT * _zscore(scores / prices)
+
+
+def _expected_cost(logits, prices, groups, slots, penalty) -> float:
+    """가격 패널티 적용 시 기대 스쿼드 비용 (그룹별 가중 평균 가격 x 평균 슬롯 수 근사)"""
+    cost = 0.0
+    for g, group in enumerate(GROUPS):
+        members = groups == g
+        if not members.any():
+            continue
+        w = logits[members] - penalty * prices[members]
+        w = np.exp(w - w.max())
+        cost += slots[group] * (w @ prices[members]) / w.sum()
+    return cost
+
+
+def calibrate_penalty(logits, prices, groups, budget, iterations=40) -> float:
+    """기대 비용이 budget x TARGET_SPEND 이하가 되는 최소 가격 패널티 λ (이분 탐색)"""
+    slots = pd.DataFrame(FORMATIONS).T[GROUPS].mean()
+    target = budget * TARGET_SPEND
+    if _expected_cost(logits, prices, groups, slots, 0.0) <= target:
+        return 0.0
+
+    low, high = 0.0, 1.0
+    while _expected_cost(logits, prices, groups, slots, high) > target and high < 1e3:
+        high *= 2
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        if _expected_cost(logits, prices, groups, slots, middle) > target:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+class OwnershipSimulator:
+    """가상 매니저 스쿼드 샘플링 기반 보유율 추정"""
+
+    def __init__(self, predictions: pd.DataFrame, prices, seed=42):
+        self.players = predictions.reset_index(drop=True)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.rng = np.random.default_rng(seed)
+
+        groups = position_group(self.players['main_position'])
+        self.groups = groups.map({g: i for i, g in enumerate(GROUPS)}).to_numpy(dtype=np.int8)
+        self.members = [np.flatnonzero(self.groups == g) for g in range(len(GROUPS))]
+
+        # 포메이션 슬롯: (포메이션 수, 그룹 수), 그룹별 최대 슬롯만큼 열을 잡음
+        self.formation_slots = pd.DataFrame(FORMATIONS).T[GROUPS].to_numpy(dtype=np.int64)
+        self.max_slots = self.formation_slots.max(axis=0)
+        for g, group in enumerate(GROUPS):
+            if len(self.members[g]) < self.max_slots[g]:
+                raise ValueError(f"{group} 선수 수({len(self.members[g])})가 슬롯 수({self.max_slots[g]})보다 적음")
+
+        logits = selection_logits(self.players, self.prices)
+        self.logits = {
+            budget: (logits - calibrate_penalty(logits, self.prices, self.groups, budget) * self.prices)
+            .astype(np.float32)
+            for budget in BUDGET_OPTIONS
+        }
+
+    def _sample(self, budget, formations) -> np.ndarray:
+        """
+        스쿼드 샘플링 (예산 검사 전)
+
+        Returns:
+            (매니저 수, 그룹별 최대 슬롯 합) 선수 인덱스, 포메이션에 없는 슬롯은 -1
+        """
+        n = len(formations)
+        columns = []
+        for g in range(len(GROUPS)):
+            members = self.members[g]
+            k = self.max_slots[g]
+            # Gumbel top-k (float32로 메모리 절반, 균등 난수 0은 -inf 키가 되어 선택되지 않음)
+            with np.errstate(divide='ignore'):
+                keys = self.logits[budget][members] - np.log(
+                    -np.log(self.rng.random((n, len(members)), dtype=np.float32))
+                )
+            top = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+            order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+            picks = members[np.take_along_axis(top, order, axis=1)]
+
+            used = np.arange(k) < self.formation_slots[formations, g][:, None]
+            columns.append(np.where(used, picks, -1))
+        return np.concatenate(columns, axis=1)
+
+    def _squad_cost(self, picks: np.ndarray) -> np.ndarray:
+        return np.where(picks >= 0, self.prices[picks], 0.0).sum(axis=1)
+
+    def sample_chunk(self, n: int):
+        """
+        매니저 n명 스쿼드 샘플링 (예산 초과 매니저는 재샘플링)
+
+        Returns:
+            (예산 내 스쿼드 선수 인덱스 배열, 제외된 매니저 수)
+        """
+        formations = self.rng.integers(len(FORMATIONS), size=n)
+        budgets = self.rng.choice(BUDGET_OPTIONS, size=n)
+        squads = []
+        dropped = 0
+
+        for budget in BUDGET_OPTIONS:
+            pending = formations[budgets == budget]
+            for _ in range(MAX_ATTEMPTS):
+                if len(pending) == 0:
+                    break
+                picks = self._sample(budget, pending)
+                valid = self._squad_cost(picks) <= budget
+                squads.append(picks[valid])
+                pending = pending[~valid]
+            dropped += len(pending)
+
+        return np.concatenate(squads), dropped
+
+    @stage(rows=lambda result, self, n_managers=N_MANAGERS, chunk_size=CHUNK_SIZE: n_managers)
+    def simulate(self, n_managers=N_MANAGERS, chunk_size=CHUNK_SIZE) -> pd.DataFrame:
+        """
+        보유율 시뮬레이션
+
+        Returns:
+            player_id, player_name_ko, main_position, position_group, price, predicted_score, ownership (%)
+        """
+        counts = np.zeros(len(self.players), dtype=np.int64)
+        managers = 0
+        dropped = 0
+
+        for start in range(0, n_managers, chunk_size):
+            squads, chunk_dropped = self.sample_chunk(min(chunk_size, n_managers - start))
+            picks = squads[squads >= 0]
+            counts += np.bincount(picks, minlength=len(counts))
+            managers += len(squads)
+            dropped += chunk_dropped
+
+        if dropped:
+            print(f"  - 예산 내 스쿼드를 찾지 못한 매니저 {dropped}명 제외")
+
+        result = self.players[['player_id', 'player_name_ko', 'main_position']].copy()
+        result['position_group'] = np.array(GROUPS)[self.groups]
+        result['price'] = self.prices
+        result['predicted_score'] = self.players['predicted_score'].to_numpy()
+        result['ownership'] = counts / max(managers, 1) * 100
+        self.managers = managers
+        return result
+
+
+def simulate_ownership(predictions: pd.DataFrame, prices, n_managers=N_MANAGERS, seed=42) -> np.ndarray:
+    """선수별 보유율 (%) - pricing.update_prices의 ownership 함수로 사용"""
+    return OwnershipSimulator(predictions, prices, seed=seed).simulate(n_managers)['ownership'].to_numpy()
+
+
+def position_summary(ownership: pd.DataFrame) -> pd.DataFrame:
+    """포지션 그룹별 보유율 요약 (평균, 최대, 보유율 합 = 매니저당 평균 선택 수 x 100)"""
+    return ownership.groupby('position_group')['ownership'].agg(['mean', 'max', 'sum']).reindex(GROUPS)
+
+
+def differentials(ownership: pd.DataFrame, max_ownership=DIFFERENTIAL_OWNERSHIP, top_n=10) -> pd.DataFrame:
+    """보유율이 낮은 고득점 예상 선수 (차별화 선택)"""
+    candidates = ownership[ownership['ownership'] <= max_ownership]
+    return candidates.nlargest(top_n, 'predicted_score')
+
+
+def main():
+    import argparse
+
+    from pricing import base_prices, load_prices
+
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 보유율 시뮬레이션')
+    parser.add_argument('--managers', type=int, default=N_MANAGERS)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("K-Fantasy AI - 보유율 시뮬레이션")
+    print("=" * 60)
+
+    predictions = pd.read_csv(OUTPUT_DIR / 'predictions.csv')
+    prices = base_prices(predictions)
+    state = load_prices()
+    if state is not None:
+        prices = (state.set_index('player_id')['price']
+                  .reindex(predictions['player_id'].astype(np.int64))
+                  .fillna(pd.Series(prices, index=predictions['player_id'].astype(np.int64)))
+                  .to_numpy())
+
+    print(f"\n가상 매니저 {args.managers:,}명 샘플링 중...")
+    start = time.perf_counter()
+    simulator = OwnershipSimulator(predictions, prices, seed=args.seed)
+    ownership = simulator.simulate(args.managers)
+    elapsed = time.perf_counter() - start
+    print(f"  - 유효 스쿼드 {simulator.managers:,}개 ({elapsed:.1f}초)")
+
+    print("\n포지션 그룹별 보유율 (%):")
+    print(position_summary(ownership).round(1).to_string())
+
+    print(f"\n차별화 선수 (보유율 {DIFFERENTIAL_OWNERSHIP:.0f}% 이하):")
+    for _, row in differentials(ownership).iterrows():
+        print(f"  {row['player_name_ko']} ({row['main_position']}, {row['price']:.1f}M): "
+              f"예측 {row['predicted_score']:.1f}점, 보유율 {row['ownership']:.1f}%")
+
+    ownership.to_csv(OWNERSHIP_PATH, index=False, encoding='utf-8-sig')
+    print(f"\n저장: {OWNERSHIP_PATH}")
+
+
+if __name__ == '__main__':
+    main()
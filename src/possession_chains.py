@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 점유 체인 분석
+=============================
+경기 이벤트를 점유 체인(possession chain)으로 분할하고 체인 단위 통계와
+슈팅 창출 관여도를 계산
+
+체인 분할 (정렬된 이벤트를 한 번 순회, 선형 시간):
+- 경기(game_id), 에피소드(episode_id), 팀(team_id)이 바뀌거나
+- 직전 이벤트와 CHAIN_MAX_GAP초 이상 벌어지면 새 체인
+
+체인 통계: 이벤트 수, 패스 수, 지속 시간, 전진 거리, 결과(goal/shot/none)
+
+선수 지표 (선수-경기별):
+1. sca: 슈팅 창출 행동 (슈팅 직전 2개 공격 행동, 슈터 본인의 캐리 포함)
+2. gca: 득점 창출 행동 (골 직전 2개 공격 행동)
+3. shot_chains: 슈팅으로 끝난 체인에 관여한 횟수
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+
+# 체인 분할 기준 (초)
+CHAIN_MAX_GAP = 15.0
+
+# 슈팅 창출 행동으로 인정하는 유형 및 슈팅 직전 행동 수
+SCA_TYPES = ['Pass', 'Carry', 'Duel', 'Take-On', 'Cross']
+SCA_DEPTH = 2
+
+CHAIN_COLUMNS = ['game_id', 'team_id', 'player_id', 'type_name', 'result_name',
+                 'time_seconds', 'start_x', 'end_x']
+
+
+class PossessionChainBuilder:
+    """점유 체인 분할 및 체인/선수 지표 계산"""
+
+    def __init__(self, max_gap=CHAIN_MAX_GAP):
+        self.max_gap = max_gap
+        self.events = None
+        self.chains = None
+
+    def build(self, raw_data: pd.DataFrame):
+        """
+        체인 분할
+
+        Returns:
+            self (events에 chain_id/chain_pos 컬럼 추가, chains에 체인 통계)
+        """
+        columns = CHAIN_COLUMNS + (['episode_id'] if 'episode_id' in raw_data.columns else [])
+        events = raw_data[columns].sort_values(['game_id', 'time_seconds'], kind='stable')
+        events = events.reset_index(drop=True)
+        n = len(events)
+
+        game = events['game_id'].to_numpy()
+        team = events['team_id'].fillna(-1).to_numpy()
+        times = events['time_seconds'].to_numpy(dtype=np.float64)
+
+        new_chain = np.ones(n, dtype=bool)
+        new_chain[1:] = (
+            (game[1:] != game[:-1]) |
+            (team[1:] != team[:-1]) |
+            (np.diff(times) > self.max_gap)
+        )
+        if 'episode_id' in events.columns:
+            episode = events['episode_id'].fillna(-1).to_numpy()
+            new_chain[1:] |= episode[1:] != episode[:-1]
+
+        chain_id = np.cumsum(new_chain) - 1
+        chain_start = np.flatnonzero(new_chain)
+        events['chain_id'] = chain_id
+        events['chain_pos'] = np.arange(n) - chain_start[chain_id]
+
+        self.events = events
+        self.chains = self._chain_stats(events, chain_start)
+        return self
+
+    def _chain_stats(self, events, chain_start):
+        """체인별 통계 (bincount 기반 집계)"""
+        chain_id = events['chain_id'].to_numpy()
+        n_chains = len(chain_start)
+        chain_end = np.append(chain_start[1:], len(events)) - 1
+
+        type_name = events['type_name'].to_numpy()
+        is_shot = type_name == 'Shot'
+        is_goal = is_shot & (events['result_name'] == 'Goal').to_numpy()
+        times = events['time_seconds'].to_numpy(dtype=np.float64)
+        start_x = events['start_x'].to_numpy(dtype=np.float64)
+        end_x = events['end_x'].to_numpy(dtype=np.float64)
+        last_x = np.where(np.isfinite(end_x), end_x, start_x)
+
+        shots = np.bincount(chain_id, weights=is_shot, minlength=n_chains)
+        goals = np.bincount(chain_id, weights=is_goal, minlength=n_chains)
+
+        chains = pd.DataFrame({
+            'chain_id': np.arange(n_chains),
+            'game_id': events['game_id'].to_numpy()[chain_start],
+            'team_id': events['team_id'].to_numpy()[chain_start],
+            'start_time': times[chain_start],
+            'end_time': times[chain_end],
+            'n_events': chain_end - chain_start + 1,
+            'n_passes': np.bincount(chain_id, weights=type_name == 'Pass', minlength=n_chains).astype(int),
+            'start_x': start_x[chain_start],
+            'end_x': last_x[chain_end],
+        })
+        chains['duration'] = chains['end_time'] - chains['start_time']
+        chains['progression'] = chains['end_x'] - chains['start_x']
+        chains['outcome'] = np.select([goals > 0, shots > 0], ['goal', 'shot'], 'none')
+        return chains
+
+    def player_metrics(self) -> pd.DataFrame:
+        """선수-경기별 sca / gca / shot_chains"""
+        events = self.events
+        chain_id = events['chain_id'].to_numpy()
+        pos = events['chain_pos'].to_numpy()
+        type_name = events['type_name'].to_numpy()
+        is_shot = type_name == 'Shot'
+        is_goal = is_shot & (events['result_name'] == 'Goal').to_numpy()
+
+        def actions_before(target):
+            """각 이벤트가 체인 내 첫 target 이벤트보다 몇 칸 앞인지 (없으면 0)"""
+            first_chain, first_idx = np.unique(chain_id[target], return_index=True)
+            target_pos = np.full(len(self.chains), -1)
+            target_pos[first_chain] = pos[target][first_idx]
+            steps = target_pos[chain_id] - pos
+            return np.where(target_pos[chain_id] >= 0, steps, 0)
+
+        is_action = np.isin(type_name, SCA_TYPES)
+        before_shot = actions_before(is_shot)
+        before_goal = actions_before(is_goal)
+        sca = is_action & (before_shot >= 1) & (before_shot <= SCA_DEPTH)
+        gca = is_action & (before_goal >= 1) & (before_goal <= SCA_DEPTH)
+
+        # 슈팅 체인 관여 (체인당 선수 1회)
+        shot_chain = (self.chains['outcome'] != 'none').to_numpy()[chain_id]
+        involved = events.loc[shot_chain, ['game_id', 'player_id', 'chain_id']].drop_duplicates()
+        shot_chains = involved.groupby(['game_id', 'player_id']).size().rename('shot_chains')
+
+        metrics = pd.DataFrame({
+            'game_id': events['game_id'],
+            'player_id': events['player_id'],
+            'sca': sca.astype(int),
+            'gca': gca.astype(int),
+        }).groupby(['game_id', 'player_id']).sum()
+
+        metrics = metrics.join(shot_chains, how='left').fillna({'shot_chains': 0})
+        metrics['shot_chains'] = metrics['shot_chains'].astype(int)
+        return metrics.reset_index()
+
+    def save(self, path=None):
+        path = Path(path or OUTPUT_DIR / 'possession_chains.csv')
+        self.chains.to_csv(path, index=False, encoding='utf-8-sig')
+        return path
+
+
+def main():
+    from dataset import load_table
+
+    print("=" * 60)
+    print("K-Fantasy AI - 점유 체인 분석")
+    print("=" * 60)
+
+    raw_data = load_table('raw_data')
+    print(f"  - 이벤트: {len(raw_data):,}건")
+
+    start = time.perf_counter()
+    builder = PossessionChainBuilder().build(raw_data)
+    metrics = builder.player_metrics()
+    elapsed = time.perf_counter() - start
+
+    chains = builder.chains
+    print(f"\n  - 처리 시간: {elapsed:.3f}s")
+    print(f"  - 체인: {len(chains):,}개 (평균 {chains['n_events'].mean():.1f}이벤트, {chains['duration'].mean():.1f}초)")
+    print(f"  - 결과: {chains['outcome'].value_counts().to_dict()}")
+    print(f"  - SCA 합계: {metrics['sca'].sum():,} / GCA 합계: {metrics['gca'].sum():,}")
+    print(f"\n체인 저장: {builder.save()}")
+
+
+if __name__ == '__main__':
+    main()
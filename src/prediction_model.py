@@ -5,6 +5,10 @@ K-Fantasy AI - LightGBM 기반 판타지 점수 예측 모델
 ==================================================
 다음 라운드 선수별 예상 판타지 점수 예측
 
+모델:
+- LightGBM 설치 시 GBM (lightgbm은 학습 시점에 지연 import)
+- 미설치 시 NumPy 릿지 회귀 (정규 방정식 닫힌 해, 학습 수 ms)
+
 피처:
 1. recent_5_avg: 최근 5경기 평균 판타지 점수
 2. season_avg: 시즌 평균 판타지 점수
@@ -12,38 +16,108 @@ K-Fantasy AI - LightGBM 기반 판타지 점수 예측 모델
 4. is_home: 홈/원정 여부
 5. form_index: 폼 지수 (최근 3경기 / 전체 평균)
 6. position_percentile: 포지션별 상대 성적
+7. sca_avg: 경기당 슈팅 창출 행동 (점유 체인 분석)
+8. minutes_avg: 경기당 평균 출장 시간 (추정)
+9. season_per_90: 90분당 판타지 점수
+
+피처는 feature_store의 (선수, 라운드) 테이블에서 학습(point-in-time)과 추론(최신 행) 모두 같은 값으로 조회
+
+재학습 (--retrain auto): 저장된 트리 모델이 있고 피처 드리프트/정확도 저하가 없으면
+학습을 건너뛰고 트리 모델로 예측 (accuracy_monitor.needs_retraining)
 """
 
+import importlib.util
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
-try:
-    import lightgbm as lgb
-    HAS_LIGHTGBM = True
-except ImportError:
-    HAS_LIGHTGBM = False
-    print("Warning: LightGBM not installed. Using fallback prediction.")
+from accuracy_monitor import (AccuracyMonitor, archive_predictions, build_drift_reference,
+                              load_drift_reference, needs_retraining, save_drift_reference)
+from dataset import DATA_ROOT, load_table
+from instrumentation import stage
+from ranking_index import RankingIndex
+from feature_store import (FEATURE_COLUMNS, FeatureStore, check_consistency, compute_features,
+                           _round_order, last_round, latest, match_rounds, point_in_time)
+from tree_model import TREE_MODEL_PATH, TreeEnsemble, compile_booster
+
+# 설치 여부만 확인 (import 비용은 GBM 학습 시에만 발생)
+HAS_LIGHTGBM = importlib.util.find_spec('lightgbm') is not None
+if not HAS_LIGHTGBM:
+    print("Warning: LightGBM not installed. Using ridge fallback.")
 
 # 경로 설정
 BASE_DIR = Path(__file__).parent.parent
-DATA_DIR = BASE_DIR.parent / '_shared' / 'data'
+DATA_DIR = DATA_ROOT
 OUTPUT_DIR = BASE_DIR / 'outputs'
 
+RIDGE_L2 = 1.0
+GBM_ROUNDS_WITHOUT_VALIDATION = 100
+
+
+def _lightgbm():
+    """LightGBM 지연 import"""
+    import lightgbm
+    return lightgbm
+
+
+class RidgeRegressor:
+    """
+    NumPy 릿지 회귀 (LightGBM 미설치 시 폴백)
+    - 피처 표준화 후 (X'X + λI) β = X'y 를 닫힌 해로 풀이 (절편은 정규화 제외)
+    - 학습 데이터 평균을 그대로 보존하므로 예측 평균이 실제 평균과 일치
+    """
+
+    def __init__(self, l2=RIDGE_L2):
+        self.l2 = l2
+        self.mean = None
+        self.scale = None
+        self.coef = None            # 표준화 피처 기준 계수
+        self.intercept = 0.0
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        Z = (X - self.mean) / self.scale
+
+        self.intercept = y.mean()
+        gram = Z.T @ Z + self.l2 * np.eye(Z.shape[1])
+        self.coef = np.linalg.solve(gram, Z.T @ (y - self.intercept))
+        return self
+
+    def predict(self, X):
+        Z = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        return Z @ self.coef + self.intercept
+
+    def feature_importance(self):
+        """표준화 계수 절댓값 (LightGBM gain 중요도 대응)"""
+        return np.abs(self.coef)
+
 
 class FantasyPredictor:
     """판타지 점수 예측 모델"""
 
-    def __init__(self):
+    def __init__(self, model_type='auto'):
+        """
+        Args:
+            model_type: 'auto' (LightGBM 있으면 gbm), 'gbm', 'ridge'
+        """
+        if model_type == 'auto':
+            model_type = 'gbm' if HAS_LIGHTGBM else 'ridge'
+        self.model_type = model_type
         self.model = None
-        self.feature_columns = [
-            'recent_5_avg', 'season_avg', 'form_index',
-            'position_percentile', 'matches_played', 'total_goals', 'total_assists'
-        ]
+        self.feature_columns = list(FEATURE_COLUMNS)
         self.feature_importance = {}
+        self.features = None            # 피처 스토어 테이블 (없으면 match_scores로 계산)
+        self.inference_features = None  # 마지막 predict_next_round 입력 (player_id 인덱스)
+        self.validation_rmse = None
 
+    @stage(rows=lambda result, self: len(self.match_scores))
     def load_data(self):
         """데이터 로드"""
         print("데이터 로드 중...")
@@ -51,85 +125,57 @@ class FantasyPredictor:
         # 판타지 통계 로드
         self.player_stats = pd.read_csv(OUTPUT_DIR / 'player_fantasy_stats.csv')
         self.match_scores = pd.read_csv(OUTPUT_DIR / 'fantasy_scores_by_match.csv')
-        self.match_info = pd.read_csv(DATA_DIR / 'match_info.csv')
+        self.match_info = load_table('match_info')
 
         print(f"  - 선수 통계: {len(self.player_stats)}명")
         print(f"  - 경기별 점수: {len(self.match_scores)}건")
         print(f"  - 경기 정보: {len(self.match_info)}경기")
 
+    @stage()
     def prepare_training_data(self):
-        """학습 데이터 준비"""
+        """학습 데이터 준비 (피처 스토어 point-in-time 조회, 해당 경기 이전 라운드 피처만 사용)"""
         print("\n학습 데이터 준비 중...")
 
-        # 경기별 점수에 라운드 정보 추가 (game_day를 라운드로 사용)
-        df = self.match_scores.merge(
-            self.match_info[['game_id', 'game_day', 'home_team_name', 'away_team_name']],
-            on='game_id',
-            how='left'
+        if self.features is None:
+            self.features = compute_features(self.match_scores, self.match_info)
+
+        # 경기별 점수에 라운드 정보 추가 ((season, game_day)를 라운드로 사용)
+        df = self.match_scores[['player_id', 'game_id', 'fantasy_score']].merge(
+            match_rounds(self.match_info), on='game_id', how='left'
         )
+        df = df.sort_values(['player_id', 'season', 'game_day'], kind='stable').reset_index(drop=True)
 
-        # 라운드별 정렬
-        df = df.sort_values(['player_id', 'game_day'])
-
-        # 각 선수별 피처 계산
-        features_list = []
-
-        for player_id, player_df in df.groupby('player_id'):
-            player_df = player_df.sort_values('game_day')
-
-            for i in range(len(player_df)):
-                row = player_df.iloc[i]
-                past_data = player_df.iloc[:i]
-
-                # 최소 3경기 이상 데이터가 있어야 학습
-                if len(past_data) < 3:
-                    continue
-
-                # 피처 계산
-                recent_5 = past_data.tail(5)['fantasy_score'].mean() if len(past_data) >= 1 else 0
-                season_avg = past_data['fantasy_score'].mean()
-                form_index = recent_5 / season_avg if season_avg > 0 else 1.0
-
-                # 포지션별 백분위
-                position = row.get('main_position', 'MF')
-                position_stats = self.player_stats[self.player_stats['main_position'] == position]
-                if len(position_stats) > 0:
-                    percentile = (position_stats['avg_fantasy_score'] <= season_avg).sum() / len(position_stats) * 100
-                else:
-                    percentile = 50.0
-
-                features_list.append({
-                    'player_id': player_id,
-                    'game_day': row['game_day'],
-                    'game_id': row['game_id'],
-                    'recent_5_avg': recent_5,
-                    'season_avg': season_avg,
-                    'form_index': form_index,
-                    'position_percentile': percentile,
-                    'matches_played': len(past_data),
-                    'total_goals': past_data['goal_count'].sum() if 'goal_count' in past_data.columns else 0,
-                    'total_assists': past_data['assist_count'].sum() if 'assist_count' in past_data.columns else 0,
-                    'target': row['fantasy_score']  # 예측 대상
-                })
-
-        self.train_df = pd.DataFrame(features_list)
+        train_df = point_in_time(self.features, df)
+        train_df['game_id'] = df['game_id']
+        train_df['target'] = df['fantasy_score']  # 예측 대상
+
+        # 최소 3경기 이상 데이터가 있어야 학습
+        self.train_df = train_df[train_df['matches_played'] >= 3].reset_index(drop=True)
         print(f"  - 학습 샘플: {len(self.train_df)}건")
 
         return self.train_df
 
+    @stage(rows=lambda result, self: len(self.train_df))
     def train_model(self):
-        """LightGBM 모델 학습"""
-        print("\nLightGBM 모델 학습 중...")
+        """모델 학습 (LightGBM 또는 릿지 회귀)"""
+        use_gbm = self.model_type == 'gbm' and HAS_LIGHTGBM
+        print(f"\n{'LightGBM' if use_gbm else '릿지 회귀'} 모델 학습 중...")
+
+        if self.model_type == 'gbm' and not HAS_LIGHTGBM:
+            print("  - LightGBM 미설치, 릿지 회귀 사용")
 
-        if not HAS_LIGHTGBM:
-            print("  - LightGBM 미설치, 폴백 모델 사용")
+        if len(self.train_df) < len(self.feature_columns):
+            print("  - 학습 샘플 부족, 가중 평균 폴백 사용")
             return
 
-        # 학습/검증 분할 (game_day 기준)
-        max_day = self.train_df['game_day'].max()
+        # 학습/검증 분할 ((season, game_day) 라운드 순서 기준, 앞 80% 라운드 학습)
+        train_order, feature_order = _round_order(self.train_df, self.features)
+        rounds = np.unique(feature_order)
+        round_position = np.searchsorted(rounds, train_order) + 1
+        max_day = len(rounds)
         train_days = int(max_day * 0.8)
 
-        train_mask = self.train_df['game_day'] <= train_days
+        train_mask = round_position <= train_days
         X_train = self.train_df[train_mask][self.feature_columns]
         y_train = self.train_df[train_mask]['target']
         X_val = self.train_df[~train_mask][self.feature_columns]
@@ -138,6 +184,44 @@ class FantasyPredictor:
         print(f"  - 학습 데이터: {len(X_train)}건 (라운드 1-{train_days})")
         print(f"  - 검증 데이터: {len(X_val)}건 (라운드 {train_days+1}-{max_day})")
 
+        if len(X_train) == 0:
+            print("  - 학습 라운드 샘플 없음, 가중 평균 폴백 사용")
+            return
+
+        if use_gbm:
+            self.model = self._train_gbm(X_train, y_train, X_val, y_val)
+            importance = self.model.feature_importance(importance_type='gain')
+        else:
+            self.model = RidgeRegressor().fit(X_train, y_train)
+            importance = self.model.feature_importance()
+
+        # 피처 중요도
+        total_importance = sum(importance)
+        for i, col in enumerate(self.feature_columns):
+            self.feature_importance[col] = round(importance[i] / total_importance * 100, 2) if total_importance else 0.0
+
+        print(f"\n  피처 중요도:")
+        for feat, imp in sorted(self.feature_importance.items(), key=lambda x: -x[1]):
+            print(f"    - {feat}: {imp}%")
+
+        # 검증 성능
+        if len(X_val) > 0:
+            y_pred = self.model.predict(X_val)
+            rmse = np.sqrt(np.mean((y_val - y_pred) ** 2))
+            mae = np.mean(np.abs(y_val - y_pred))
+            print(f"\n  검증 성능:")
+            print(f"    - RMSE: {rmse:.2f}")
+            print(f"    - MAE: {mae:.2f}")
+            self.validation_rmse = float(rmse)
+
+        # 릿지는 학습 비용이 작으므로 전체 데이터로 재학습
+        if not use_gbm:
+            self.model = RidgeRegressor().fit(self.train_df[self.feature_columns], self.train_df['target'])
+
+    def _train_gbm(self, X_train, y_train, X_val, y_val):
+        """LightGBM 학습 (lightgbm은 이 시점에 import)"""
+        lgb = _lightgbm()
+
         # LightGBM 파라미터
         params = {
             'objective': 'regression',
@@ -154,10 +238,13 @@ class FantasyPredictor:
 
         # 데이터셋 생성
         train_data = lgb.Dataset(X_train, label=y_train)
+        if len(X_val) == 0:
+            # 검증 라운드가 없으면 조기 종료 없이 고정 라운드 학습
+            return lgb.train(params, train_data, num_boost_round=GBM_ROUNDS_WITHOUT_VALIDATION)
         val_data = lgb.Dataset(X_val, label=y_val, reference=train_data)
 
         # 모델 학습
-        self.model = lgb.train(
+        return lgb.train(
             params,
             train_data,
             num_boost_round=500,
@@ -166,59 +253,79 @@ class FantasyPredictor:
             callbacks=[lgb.early_stopping(50), lgb.log_evaluation(0)]
         )
 
-        # 피처 중요도
-        importance = self.model.feature_importance(importance_type='gain')
-        total_importance = sum(importance)
-        for i, col in enumerate(self.feature_columns):
-            self.feature_importance[col] = round(importance[i] / total_importance * 100, 2)
-
-        print(f"\n  피처 중요도:")
-        for feat, imp in sorted(self.feature_importance.items(), key=lambda x: -x[1]):
-            print(f"    - {feat}: {imp}%")
-
-        # 검증 성능
-        y_pred = self.model.predict(X_val)
-        rmse = np.sqrt(np.mean((y_val - y_pred) ** 2))
-        mae = np.mean(np.abs(y_val - y_pred))
-        print(f"\n  검증 성능:")
-        print(f"    - RMSE: {rmse:.2f}")
-        print(f"    - MAE: {mae:.2f}")
-
+    def export_trees(self, path=TREE_MODEL_PATH):
+        """
+        학습된 LightGBM 부스터를 NumPy 트리 배열(npz)로 내보내기
+        (조회/추천 워커는 load_trees로 LightGBM 없이 예측)
+
+        GBM이 아닌 모델(릿지/가중 평균 폴백)로 학습한 경우 이전 트리 모델을 삭제
+        (--retrain auto나 조회 워커가 지난 GBM으로 예측하지 않도록)
+
+        Returns:
+            저장 경로 (GBM 모델이 아니면 None)
+        """
+        if not hasattr(self.model, 'dump_model'):
+            print("  - GBM 모델 아님, 트리 내보내기 생략")
+            path = Path(path)
+            if path.exists():
+                path.unlink()
+                print(f"  - 이전 트리 모델 삭제: {path}")
+            return None
+
+        ensemble = compile_booster(self.model)
+        if len(self.train_df) > 0:
+            X = self.train_df[self.feature_columns]
+            max_diff = np.abs(ensemble.predict(X) - self.model.predict(X)).max()
+            print(f"  - LightGBM 대비 최대 오차: {max_diff:.2e}")
+
+        path = ensemble.save(path)
+        print(f"트리 모델 저장: {path} (트리 {ensemble.num_trees}개)")
+        return path
+
+    def load_trees(self, path=TREE_MODEL_PATH):
+        """export_trees로 저장한 트리 모델을 memmap 로드하여 예측 모델로 사용"""
+        self.model = TreeEnsemble.load(path)
+        return self.model
+
+    @stage()
     def predict_next_round(self):
         """다음 라운드 예측"""
         print("\n다음 라운드 예측 중...")
 
-        predictions = []
+        if self.features is None:
+            self.features = compute_features(self.match_scores, self.match_info)
 
-        for _, player in self.player_stats.iterrows():
-            player_id = player['player_id']
+        # 선수별 최신 피처 (학습과 같은 피처 스토어 테이블)
+        season_avg = self.player_stats['avg_fantasy_score'].to_numpy()
+        X = latest(self.features).reindex(self.player_stats['player_id'])[self.feature_columns]
+        X = X.reset_index(drop=True)
 
-            # 피처 준비
-            features = {
-                'recent_5_avg': player.get('recent_5_avg', player['avg_fantasy_score']),
-                'season_avg': player['avg_fantasy_score'],
-                'form_index': player.get('form_index', 1.0),
-                'position_percentile': self._get_position_percentile(player),
-                'matches_played': player['matches_played'],
-                'total_goals': player.get('total_goals', 0),
-                'total_assists': player.get('total_assists', 0)
-            }
-
-            # NaN 처리
-            for key in features:
-                if pd.isna(features[key]):
-                    features[key] = 0 if key in ['total_goals', 'total_assists'] else player['avg_fantasy_score']
-
-            # 예측
-            if HAS_LIGHTGBM and self.model is not None:
-                X = pd.DataFrame([features])[self.feature_columns]
-                predicted_score = self.model.predict(X)[0]
+        # NaN 처리 (피처 스토어에 없는 선수)
+        for key in self.feature_columns:
+            if key in ['matches_played', 'total_goals', 'total_assists', 'sca_avg']:
+                X[key] = X[key].fillna(0)
+            elif key == 'minutes_avg':
+                X[key] = X[key].fillna(90.0)
             else:
-                # 폴백: 가중 평균 (최근 폼 반영)
-                recent = features['recent_5_avg']
-                season = features['season_avg']
-                form = features['form_index']
-                predicted_score = recent * 0.5 + season * 0.3 + (season * form) * 0.2
+                X[key] = X[key].fillna(pd.Series(season_avg))
+        self.inference_features = X.set_index(self.player_stats['player_id'].to_numpy())
+
+        players = [player for _, player in self.player_stats.iterrows()]
+        features_list = X.to_dict('records')
+
+        # 예측 (전체 선수 한 번에)
+        if self.model is not None and len(X) > 0:
+            predicted_scores = self.model.predict(X[self.feature_columns])
+        else:
+            # 폴백: 가중 평균 (최근 폼 반영)
+            recent = X['recent_5_avg'].to_numpy()
+            season = X['season_avg'].to_numpy()
+            form = X['form_index'].to_numpy()
+            predicted_scores = recent * 0.5 + season * 0.3 + (season * form) * 0.2
+
+        predictions = []
+        for player, features, predicted_score in zip(players, features_list, predicted_scores):
+            player_id = player['player_id']
 
             # 피처 기여도 계산 (XAI용)
             contributions = self._calculate_contributions(features, predicted_score)
@@ -233,6 +340,8 @@ class FantasyPredictor:
                 'season_avg': round(features['season_avg'], 2),
                 'form_index': round(features['form_index'], 2),
                 'matches_played': int(features['matches_played']),
+                'avg_minutes': round(features['minutes_avg'], 1),
+                'season_per_90': round(features['season_per_90'], 2),
                 'total_goals': int(features['total_goals']),
                 'total_assists': int(features['total_assists']),
                 'contribution_recent_form': contributions.get('recent_form', 0),
@@ -249,18 +358,6 @@ class FantasyPredictor:
 
         return self.predictions_df
 
-    def _get_position_percentile(self, player):
-        """포지션별 백분위 계산"""
-        position = player['main_position']
-        position_stats = self.player_stats[self.player_stats['main_position'] == position]
-
-        if len(position_stats) == 0:
-            return 50.0
-
-        player_avg = player['avg_fantasy_score']
-        percentile = (position_stats['avg_fantasy_score'] <= player_avg).sum() / len(position_stats) * 100
-        return round(percentile, 1)
-
     def _calculate_contributions(self, features, predicted_score):
         """XAI용 피처 기여도 계산"""
         # 단순화된 기여도 계산 (실제로는 SHAP 사용 권장)
@@ -287,15 +384,10 @@ class FantasyPredictor:
         return contributions
 
     def get_position_rankings(self):
-        """포지션별 TOP 선수"""
-        rankings = {}
-
-        for position in ['GK', 'CB', 'LB', 'RB', 'DMF', 'CMF', 'AMF', 'LMF', 'RMF', 'LWF', 'RWF', 'CF']:
-            pos_df = self.predictions_df[self.predictions_df['main_position'] == position]
-            if len(pos_df) > 0:
-                rankings[position] = pos_df.head(5).to_dict('records')
-
-        return rankings
+        """포지션별 TOP 5 선수 (데이터에 있는 모든 포지션)"""
+        index = RankingIndex(self.predictions_df)
+        return {position: top.to_dict('records')
+                for position, top in index.top_k_by('position', 'predicted_score', 5).items()}
 
     def save_predictions(self):
         """예측 결과 저장"""
@@ -318,26 +410,57 @@ class FantasyPredictor:
 
 
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 예측 모델')
+    parser.add_argument('--retrain', choices=['always', 'auto'], default='always',
+                        help='auto: 드리프트/정확도 저하가 있을 때만 재학습')
+    args = parser.parse_args()
+
     print("=" * 60)
     print("K-Fantasy AI - LightGBM 예측 모델")
     print("=" * 60)
 
     predictor = FantasyPredictor()
 
-    # 1. 데이터 로드
+    # 1. 데이터 로드 (새 라운드 피처를 피처 스토어에 추가)
     predictor.load_data()
+    predictor.features = FeatureStore().sync(predictor.match_scores, predictor.match_info)
+
+    # 지난 예측 정확도 갱신 (새로 결과가 나온 라운드만)
+    print("\n예측 정확도 갱신 중...")
+    monitor = AccuracyMonitor()
+    monitor.update(predictor.match_scores, predictor.match_info)
 
     # 2. 학습 데이터 준비
     predictor.prepare_training_data()
 
-    # 3. 모델 학습
-    predictor.train_model()
+    # 3. 모델 학습 (auto: 필요할 때만)
+    retrain, reason = True, '항상 재학습'
+    if args.retrain == 'auto':
+        if TREE_MODEL_PATH.exists():
+            retrain, reason = needs_retraining(load_drift_reference(), latest(predictor.features), monitor)
+        else:
+            reason = '저장된 트리 모델 없음'
+    print(f"\n재학습 {'실행' if retrain else '생략'}: {reason}")
+
+    if retrain:
+        predictor.train_model()
+        save_drift_reference(build_drift_reference(predictor.train_df, predictor.validation_rmse))
+    else:
+        predictor.load_trees()
 
     # 4. 다음 라운드 예측
     predictions = predictor.predict_next_round()
 
-    # 5. 결과 저장
+    # 5. 결과 저장 (학습/추론 피처 일관성 검증, 다음 라운드 정확도 평가용 보관)
+    check_consistency(predictor.features, predictor.train_df, predictor.inference_features,
+                      predictor.match_scores, predictor.match_info)
     predictor.save_predictions()
+    if retrain:
+        predictor.export_trees()
+    season, last_day = last_round(predictor.features)
+    archive_predictions(predictions, season, last_day + 1)
 
     # 6. TOP 10 출력
     print("\n" + "=" * 60)
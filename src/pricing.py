@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 선수 가격 엔진
+=============================
+예측 점수 / 폼 / 포지션 희소성으로 선수 가격을 정하고, 라운드마다 폼 변화와
+보유율 변화에 따라 가격을 조정 (웹앱은 내보낸 값을 그대로 사용)
+
+가격 (3M ~ 15M, 0.1M 단위):
+1. 점수 지수 = 예측 점수 x 폼 보정 x 포지션 희소성 계수
+   - 희소성: 스쿼드 수요(포메이션 평균 슬롯 비율) / 상위권 선수 공급 비율
+2. 전체 선수 중 점수 지수 백분위를 볼록 곡선으로 가격 범위에 매핑 (상위 선수일수록 가격 간격 큼)
+
+라운드별 가격 변동 (outputs/player_prices.csv 상태 기준, 라운드 = (season, game_day)):
+- 압력 = 폼 변화(최근 5경기 평균 변화 / 시즌 평균) + 보유율 변화(%p)
+- 변동 = MAX_PRICE_CHANGE x tanh(압력), 0.1M 단위 반올림 (작은 압력은 0)
+- 같은 라운드에 다시 실행하면 저장된 가격 그대로 사용 (시즌이 바뀌면 라운드 번호가 작아도 새 라운드)
+
+보유율: main은 가상 매니저 시뮬레이션(ownership.py), 기본값은 그룹 내 가성비 소프트맥스 근사(estimate_ownership)
+
+같은 경기 데이터로 최근 경기 점수 배열(recent_games)과 출전 상태(availability)도 생성
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from feature_store import compute_features, last_round, latest
+from instrumentation import stage
+from similarity import POSITION_TO_GROUP
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+PRICES_PATH = OUTPUT_DIR / 'player_prices.csv'
+
+PRICE_MIN = 3.0
+PRICE_MAX = 15.0
+PRICE_STEP = 0.1
+PRICE_CURVE = 1.6                # 백분위 -> 가격 곡선 지수 (1보다 크면 상위권 가격 간격 확대)
+FORM_WEIGHT = 0.3                # 폼 지수 1.0 대비 편차의 가격 반영 비율
+SCARCITY_EXPONENT = 0.25
+SCARCITY_RANGE = (0.85, 1.2)
+QUALITY_QUANTILE = 0.75          # 희소성 계산 시 '상위권 선수' 기준 (예측 점수 분위)
+
+MAX_PRICE_CHANGE = 0.3           # 라운드당 최대 변동 (M)
+FORM_SENSITIVITY = 1.5
+OWNERSHIP_SENSITIVITY = 0.1      # 보유율 1%p 변화당 압력
+OWNERSHIP_TEMPERATURE = 1.0
+
+RECENT_GAMES = 5
+
+# 웹앱 My Team 포메이션 (web/src/app/my-team/page.tsx FORMATIONS)
+FORMATIONS = {
+    '4-3-3': {'GK': 1, 'DF': 4, 'MF': 3, 'FW': 3},
+    '4-4-2': {'GK': 1, 'DF': 4, 'MF': 4, 'FW': 2},
+    '3-5-2': {'GK': 1, 'DF': 3, 'MF': 5, 'FW': 2},
+}
+GROUPS = ['GK', 'DF', 'MF', 'FW']
+
+
+def position_group(positions: pd.Series) -> pd.Series:
+    """포지션 -> GK/DF/MF/FW (웹앱 getPositionGroup과 동일하게 미등록 포지션은 FW)"""
+    return positions.map(POSITION_TO_GROUP).fillna('FW')
+
+
+def squad_demand() -> pd.Series:
+    """포메이션 평균 그룹별 슬롯 수"""
+    return pd.DataFrame(FORMATIONS).T[GROUPS].mean()
+
+
+def scarcity_multipliers(predictions: pd.DataFrame) -> pd.Series:
+    """포지션 그룹별 희소성 계수 (수요 비율 / 상위권 공급 비율)"""
+    groups = position_group(predictions['main_position'])
+    scores = predictions['predicted_score'].fillna(0)
+    quality = scores >= scores.quantile(QUALITY_QUANTILE)
+
+    demand = squad_demand()
+    demand_share = demand / demand.sum()
+    supply = quality.groupby(groups).sum().reindex(GROUPS, fill_value=0).clip(lower=1)
+    supply_share = supply / supply.sum()
+
+    multipliers = (demand_share / supply_share) ** SCARCITY_EXPONENT
+    return multipliers.clip(*SCARCITY_RANGE)
+
+
+def _round_price(values) -> np.ndarray:
+    return np.round(np.round(np.asarray(values, dtype=np.float64) / PRICE_STEP) * PRICE_STEP, 1)
+
+
+def base_prices(predictions: pd.DataFrame) -> np.ndarray:
+    """예측 점수 / 폼 / 포지션 희소성 기반 기준 가격 (PRICE_MIN ~ PRICE_MAX)"""
+    groups = position_group(predictions['main_position'])
+    form = predictions['form_index'].fillna(1.0).clip(0.5, 1.5) if 'form_index' in predictions.columns else 1.0
+    index = (predictions['predicted_score'].fillna(0).clip(lower=0)
+             * (1 + FORM_WEIGHT * (form - 1))
+             * groups.map(scarcity_multipliers(predictions)).to_numpy())
+
+    percentile = index.rank(pct=True, method='average').to_numpy()
+    return _round_price(PRICE_MIN + (PRICE_MAX - PRICE_MIN) * percentile ** PRICE_CURVE)
+
+
+def estimate_ownership(predictions: pd.DataFrame, prices) -> np.ndarray:
+    """
+    보유율 추정 (%): 그룹 슬롯 수 x 그룹 내 가성비 소프트맥스 확률
+
+    가성비는 그룹 내 표준화 후 OWNERSHIP_TEMPERATURE로 나눠 분포를 조절
+    """
+    groups = position_group(predictions['main_position'])
+    value = predictions['predicted_score'].fillna(0).to_numpy() / np.asarray(prices, dtype=np.float64)
+    value = pd.Series(value, index=predictions.index)
+
+    grouped = value.groupby(groups)
+    z = (value - grouped.transform('mean')) / grouped.transform('std').replace(0, 1).fillna(1)
+    weights = np.exp(z / OWNERSHIP_TEMPERATURE)
+    share = weights / weights.groupby(groups).transform('sum')
+
+    ownership = share * groups.map(squad_demand()).to_numpy() * 100
+    return ownership.clip(upper=100).to_numpy()
+
+
+def form_deltas(features: pd.DataFrame) -> pd.Series:
+    """선수별 마지막 라운드 대비 직전 라운드 최근 5경기 평균 변화 (시즌 평균 대비 비율)"""
+    season, last_day = last_round(features)
+    current = latest(features)
+    previous = latest(features, as_of=(season, last_day - 1))
+
+    delta = current['recent_5_avg'] - previous['recent_5_avg'].reindex(current.index)
+    # 마지막 라운드에 출전한 선수만 폼 변화가 있음
+    delta = delta.where((current['season'] == season) & (current['game_day'] == last_day), 0.0)
+    return (delta / current['season_avg'].abs().clip(lower=1.0)).fillna(0.0)
+
+
+def price_changes(form_delta, ownership_delta) -> np.ndarray:
+    """폼 변화 / 보유율 변화(%p) -> 가격 변동 (0.1M 단위, ±MAX_PRICE_CHANGE)"""
+    pressure = (FORM_SENSITIVITY * np.asarray(form_delta, dtype=np.float64)
+                + OWNERSHIP_SENSITIVITY * np.asarray(ownership_delta, dtype=np.float64))
+    return _round_price(MAX_PRICE_CHANGE * np.tanh(pressure))
+
+
+@stage(rows=lambda result, predictions, features, state=None, ownership=None: len(result))
+def update_prices(predictions: pd.DataFrame, features: pd.DataFrame, state=None, ownership=None) -> pd.DataFrame:
+    """
+    라운드 가격 갱신
+
+    Args:
+        predictions: predictions.csv (player_id, main_position, predicted_score, form_index)
+        features: 피처 스토어 테이블 (player_id, season, game_day, recent_5_avg, season_avg)
+        state: 이전 player_prices.csv (없으면 기준 가격에서 시작, 보유율 변화 0)
+        ownership: 보유율(%) 배열 또는 (predictions, prices) -> 배열 함수 (없으면 estimate_ownership)
+
+    Returns:
+        player_id, season, game_day, price, price_change, ownership
+    """
+    season, last_day = last_round(features)
+    ids = predictions['player_id'].astype(np.int64).to_numpy()
+    base = base_prices(predictions)
+
+    if state is not None and len(state) and _state_round(state) >= (season, last_day):
+        # 같은 라운드 재실행: 저장된 가격 유지 (새 선수만 기준 가격)
+        previous = state.set_index('player_id')
+        result = pd.DataFrame({'player_id': ids, 'season': season, 'game_day': last_day})
+        result['price'] = previous['price'].reindex(ids).fillna(pd.Series(base, index=ids)).to_numpy()
+        result['price_change'] = previous['price_change'].reindex(ids).fillna(0.0).to_numpy()
+        result['ownership'] = previous['ownership'].reindex(ids).to_numpy()
+        missing = result['ownership'].isna().to_numpy()
+        result.loc[missing, 'ownership'] = estimate_ownership(predictions, result['price'])[missing]
+        return result
+
+    previous = state.set_index('player_id') if state is not None and len(state) else None
+    previous_price = base if previous is None else \
+        previous['price'].reindex(ids).fillna(pd.Series(base, index=ids)).to_numpy()
+
+    if ownership is None:
+        ownership = estimate_ownership
+    if callable(ownership):
+        ownership = ownership(predictions, previous_price)
+    ownership = np.asarray(ownership, dtype=np.float64)
+    previous_ownership = ownership if previous is None else \
+        previous['ownership'].reindex(ids).fillna(pd.Series(ownership, index=ids)).to_numpy()
+
+    change = price_changes(form_deltas(features).reindex(ids).fillna(0.0).to_numpy(),
+                           ownership - previous_ownership)
+    price = np.clip(_round_price(previous_price + change), PRICE_MIN, PRICE_MAX)
+
+    return pd.DataFrame({
+        'player_id': ids,
+        'season': season,
+        'game_day': last_day,
+        'price': price,
+        'price_change': _round_price(price - previous_price),
+        'ownership': np.round(ownership, 2),
+    })
+
+
+def _state_round(state: pd.DataFrame) -> tuple:
+    """저장된 가격 상태의 (season, game_day) (season 컬럼이 없는 이전 상태는 가장 오래된 라운드로 취급)"""
+    if 'season' not in state.columns:
+        return (-np.inf, -np.inf)
+    season = state['season'].max()
+    return season, int(state.loc[state['season'] == season, 'game_day'].max())
+
+
+def default_prices(predictions: pd.DataFrame) -> pd.DataFrame:
+    """저장된 가격 상태가 없을 때 사용하는 기준 가격 (변동 0, 추정 보유율)"""
+    prices = predictions[['player_id']].copy()
+    prices['price'] = base_prices(predictions)
+    prices['price_change'] = 0.0
+    prices['ownership'] = estimate_ownership(predictions, prices['price'])
+    return prices
+
+
+def load_prices(path=PRICES_PATH):
+    """저장된 가격 상태 (없으면 None)"""
+    try:
+        return pd.read_csv(path)
+    except FileNotFoundError:
+        return None
+
+
+def _sort_matches(match_scores: pd.DataFrame, match_info=None) -> pd.DataFrame:
+    """선수별 경기 시간 순 정렬 (match_info 없으면 game_id 순)"""
+    df = match_scores
+    if match_info is not None:
+        df = df.merge(match_info[['game_id', 'game_day']], on='game_id', how='left')
+        order = ['player_id', 'game_day', 'game_id']
+    else:
+        order = ['player_id', 'game_id']
+    return df.sort_values(order, kind='stable').reset_index(drop=True)
+
+
+@stage(rows=lambda result, match_scores, match_info=None, n=RECENT_GAMES: len(match_scores))
+def recent_games(match_scores: pd.DataFrame, match_info=None, n=RECENT_GAMES) -> dict:
+    """
+    선수별 최근 n경기 판타지 점수 (오래된 경기 -> 최근 경기 순)
+
+    정렬 1회 + 선수 경계 인덱스로 배열 분할 (선수별 groupby 루프 없음)
+    """
+    df = _sort_matches(match_scores, match_info)
+    tail = df.groupby('player_id', sort=False).cumcount(ascending=False) < n
+    df = df[tail.to_numpy()]
+
+    ids = df['player_id'].astype(np.int64).to_numpy()
+    scores = np.round(df['fantasy_score'].fillna(0).to_numpy(dtype=np.float64), 1)
+    player_ids, starts = np.unique(ids, return_index=True)
+    return dict(zip(player_ids.tolist(), (chunk.tolist() for chunk in np.split(scores, starts[1:]))))
+
+
+@stage(rows=lambda result, match_scores, match_info=None: len(match_scores))
+def availability(match_scores: pd.DataFrame, match_info=None) -> dict:
+    """
+    출전 상태: 소속팀의 마지막 경기에 출전하지 않은 선수는 'doubtful'
+
+    Returns:
+        선수 id -> PlayerAvailability (web/src/types)
+    """
+    df = _sort_matches(match_scores, match_info)
+    order = 'game_day' if match_info is not None else 'game_id'
+    last_player = df.groupby('player_id')[[order, 'team_name_ko']].last()
+    last_team = df.groupby('team_name_ko')[order].max()
+    missed = last_player[order] < last_team.reindex(last_player['team_name_ko']).to_numpy()
+
+    # 마지막 경기일 기준 (내용이 같으면 델타 내보내기에서 변경으로 잡히지 않도록)
+    if match_info is not None and 'game_date' in match_info.columns:
+        updated = str(pd.to_datetime(match_info['game_date']).max().date())
+    else:
+        updated = datetime.now().strftime('%Y-%m-%d')
+    result = {}
+    for player_id, is_missed in zip(last_player.index.astype(np.int64).tolist(), missed.tolist()):
+        status = {'status': 'doubtful', 'reason': '최근 경기 미출전'} if is_missed else {'status': 'available'}
+        result[player_id] = {**status, 'lastUpdated': updated}
+    return result
+
+
+def main():
+    print("=" * 60)
+    print("K-Fantasy AI - 선수 가격")
+    print("=" * 60)
+
+    from dataset import load_table
+    from ownership import simulate_ownership
+
+    print("\n데이터 로드 중...")
+    predictions = pd.read_csv(OUTPUT_DIR / 'predictions.csv')
+    match_scores = pd.read_csv(OUTPUT_DIR / 'fantasy_scores_by_match.csv')
+    match_info = load_table('match_info')
+    print(f"  - 예측 {len(predictions)}명, 경기 기록 {len(match_scores)}건")
+
+    print("\n가격 계산 중...")
+    features = compute_features(match_scores, match_info)
+    prices = update_prices(predictions, features, state=load_prices(), ownership=simulate_ownership)
+    prices.to_csv(PRICES_PATH, index=False, encoding='utf-8-sig')
+
+    changed = prices['price_change'] != 0
+    print(f"  - {prices['season'].iloc[0]} 라운드 {prices['game_day'].iloc[0]}: 평균 {prices['price'].mean():.1f}M "
+          f"(최저 {prices['price'].min():.1f}M, 최고 {prices['price'].max():.1f}M)")
+    print(f"  - 가격 변동: 상승 {(prices['price_change'] > 0).sum()}명, 하락 {(prices['price_change'] < 0).sum()}명, "
+          f"유지 {(~changed).sum()}명")
+    print(f"\n저장: {PRICES_PATH}")
+
+
+if __name__ == '__main__':
+    main()
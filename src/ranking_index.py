@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 통합 랭킹 인덱스
+===============================
+예측 랭킹 / 포지션 그룹 랭킹 / 다크호스 / API 조회가 같은 정렬 인덱스를 사용하도록 통합
+
+인덱스:
+- (지표, 범위) 정렬 순서를 처음 조회할 때 한 번 계산하여 캐시 (범위: 전체, 포지션 그룹, 포지션, 팀)
+- 포지션 그룹은 pricing.position_group (웹앱 getPositionGroup과 동일, 미등록 포지션은 FW)
+- NaN 지표는 오름차순/내림차순 모두 맨 뒤
+
+top-k 조회:
+- 필터 없음: 정렬 순서 앞 k개 (O(k))
+- 여러 범위(예: group=['DF', 'MF']): 범위별 정렬 순서를 heapq.merge로 지연 병합 (O(k log 범위 수))
+- 추가 필터 (팀/가격 등): 가장 좁은 정렬 순서를 블록 단위로 훑으며 조건을 벡터화 검사,
+  k개를 채우면 중단
+"""
+
+import heapq
+import json
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from pricing import position_group
+
+DEFAULT_K = 10
+SCAN_BLOCK = 64
+
+
+def _listed(wanted) -> list:
+    return list(wanted) if isinstance(wanted, (list, tuple, set, np.ndarray)) else [wanted]
+
+
+class RankingIndex:
+    """지표별 정렬 인덱스 (player 행 단위)"""
+
+    def __init__(self, players: pd.DataFrame, position_column='main_position', team_column='team_name_ko',
+                 price_column='price'):
+        self.players = players.reset_index(drop=True)
+        self.price_column = price_column
+        self.scopes = {
+            'position': self.players[position_column].to_numpy(dtype=object)
+            if position_column in self.players.columns else None,
+            'group': position_group(self.players[position_column]).to_numpy(dtype=object)
+            if position_column in self.players.columns else None,
+            'team': self.players[team_column].to_numpy(dtype=object)
+            if team_column in self.players.columns else None,
+        }
+        self._orders = {}
+
+    @classmethod
+    def from_players(cls, players: list):
+        """players.json 형식 (camelCase 필드) 목록으로 생성"""
+        return cls(pd.DataFrame(players), position_column='position', team_column='team', price_column='price')
+
+    def __len__(self):
+        return len(self.players)
+
+    def _values(self, metric) -> np.ndarray:
+        return self.players[metric].to_numpy(dtype=np.float64)
+
+    def order(self, metric, scope=None, value=None, ascending=False) -> np.ndarray:
+        """(지표, 범위) 정렬된 행 인덱스 (캐시, 같은 값은 원래 행 순서 유지)"""
+        key = (metric, scope, value, ascending)
+        cached = self._orders.get(key)
+        if cached is not None:
+            return cached
+
+        values = self._values(metric)
+        rows = np.arange(len(values)) if scope is None else np.flatnonzero(self.scopes[scope] == value)
+        sort_key = values[rows] if ascending else -values[rows]
+        # NaN은 정렬 키를 +inf로 두어 맨 뒤로
+        sort_key = np.where(np.isnan(sort_key), np.inf, sort_key)
+        order = rows[np.argsort(sort_key, kind='stable')]
+        self._orders[key] = order
+        return order
+
+    def rank(self, metric, scope=None, ascending=False) -> np.ndarray:
+        """
+        행별 순위 (1부터, scope 지정 시 범위 내 순위)
+
+        Returns:
+            행 순서와 같은 정수 배열 (지표가 NaN인 행도 범위 내 마지막 순위)
+        """
+        ranks = np.zeros(len(self.players), dtype=np.int64)
+        values = [None] if scope is None else pd.unique(self.scopes[scope])
+        for value in values:
+            order = self.order(metric, scope, value, ascending)
+            ranks[order] = np.arange(1, len(order) + 1)
+        return ranks
+
+    def _candidates(self, metric, ascending, group=None, position=None, team=None):
+        """가장 좁은 범위의 정렬 순서 이터레이터 (여러 값이면 heapq.merge)"""
+        filters = {'group': group, 'position': position, 'team': team}
+        chosen = None
+        for scope, wanted in filters.items():
+            if wanted is None or self.scopes[scope] is None:
+                continue
+            wanted = _listed(wanted)
+            size = sum(len(self.order(metric, scope, value, ascending)) for value in wanted)
+            if chosen is None or size < chosen[2]:
+                chosen = (scope, wanted, size)
+
+        if chosen is None:
+            return self.order(metric, None, None, ascending), None
+
+        scope, wanted, _ = chosen
+        orders = [self.order(metric, scope, value, ascending) for value in wanted]
+        if len(orders) == 1:
+            return orders[0], scope
+
+        values = self._values(metric)
+        sign = 1.0 if ascending else -1.0
+
+        def sort_key(row):
+            value = values[row]
+            return (np.inf if np.isnan(value) else sign * value, row)
+
+        return heapq.merge(*[iter(order.tolist()) for order in orders], key=sort_key), scope
+
+    def _mask(self, rows, skip_scope, group=None, position=None, team=None, min_price=None, max_price=None):
+        """행 블록에 대한 조건 검사 (벡터화)"""
+        mask = np.ones(len(rows), dtype=bool)
+        for scope, wanted in [('group', group), ('position', position), ('team', team)]:
+            if wanted is None or scope == skip_scope or self.scopes[scope] is None:
+                continue
+            wanted = _listed(wanted)
+            mask &= np.isin(self.scopes[scope][rows], wanted)
+        if (min_price is not None or max_price is not None) and self.price_column in self.players.columns:
+            prices = self.players[self.price_column].to_numpy(dtype=np.float64)[rows]
+            if min_price is not None:
+                mask &= prices >= min_price
+            if max_price is not None:
+                mask &= prices <= max_price
+        return mask
+
+    def top_k_rows(self, metric, k=DEFAULT_K, ascending=False, group=None, position=None, team=None,
+                   min_price=None, max_price=None) -> np.ndarray:
+        """조건을 만족하는 상위 k개 행 인덱스"""
+        candidates, scope = self._candidates(metric, ascending, group, position, team)
+        filters = dict(group=group, position=position, team=team, min_price=min_price, max_price=max_price)
+        needs_mask = any(value is not None for name, value in filters.items() if name != scope)
+
+        if isinstance(candidates, np.ndarray) and not needs_mask:
+            return candidates[:k]
+
+        iterator = iter(candidates)
+        found = []
+        block = max(k, SCAN_BLOCK)
+        while len(found) < k:
+            rows = np.fromiter(islice(iterator, block), dtype=np.int64)
+            if len(rows) == 0:
+                break
+            if needs_mask:
+                rows = rows[self._mask(rows, scope, **filters)]
+            found.extend(rows[:k - len(found)].tolist())
+            block *= 2
+        return np.asarray(found, dtype=np.int64)
+
+    def top_k(self, metric, k=DEFAULT_K, **filters) -> pd.DataFrame:
+        """상위 k개 선수 (원본 컬럼, 순서대로)"""
+        return self.players.iloc[self.top_k_rows(metric, k, **filters)]
+
+    def top_k_by(self, scope, metric, k=DEFAULT_K, **filters) -> dict:
+        """범위 값별 상위 k개 (범위 값은 처음 등장 순서, 결측 제외)"""
+        return {value: self.top_k(metric, k, **{scope: value}, **filters)
+                for value in pd.unique(self.scopes[scope]) if not pd.isna(value)}
+
+
+def query_rankings(index: RankingIndex, params: dict) -> dict:
+    """
+    API 조회 (쿼리 문자열 파라미터 -> JSON 응답)
+
+    params: metric, k, order (asc/desc), group, position, team (쉼표 구분 가능), min_price, max_price
+    """
+    def listed(name):
+        value = params.get(name)
+        return value.split(',') if value else None
+
+    def number(name):
+        value = params.get(name)
+        return float(value) if value not in (None, '') else None
+
+    metric = params.get('metric', 'predictedScore')
+    if metric not in index.players.columns:
+        raise ValueError(f"알 수 없는 지표: {metric}")
+
+    rows = index.top_k_rows(
+        metric, k=int(params.get('k', DEFAULT_K)), ascending=params.get('order') == 'asc',
+        group=listed('group'), position=listed('position'), team=listed('team'),
+        min_price=number('min_price'), max_price=number('max_price'),
+    )
+    players = json.loads(index.players.iloc[rows].to_json(orient='records', force_ascii=False))
+    return {'metric': metric, 'count': len(players), 'players': players}
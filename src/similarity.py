@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 선수 유사도 인덱스
+=================================
+90분당 지표 벡터로 "X와 비슷한 선수"를 찾는 최근접 이웃 검색 (대체 선수 추천, 비교 페이지용)
+
+방식:
+1. player_fantasy_stats의 90분당 지표를 표준화(z-score) 후 L2 정규화
+2. 코사인 유사도 = 단위 벡터 내적 -> 행렬 곱 한 번으로 전체 후보 점수 계산
+3. np.argpartition으로 top-k 추출 (정렬은 k개만)
+4. 전체 선수 top-k는 BATCH_SIZE행씩 묶어 행렬 곱으로 일괄 계산
+
+선수 수백 명 규모에서는 트리 인덱스보다 정확한 일괄 내적이 빠르고 단순함
+
+증분 갱신 (update):
+- 변경/추가 선수 행만 교체 (표준화 기준값은 유지)
+- 변경 선수와 기존 이웃 목록이 겹치는 선수만 전체 재계산
+- 나머지 선수는 기존 top-k와 변경 선수 점수만 병합
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+SIMILAR_PATH = OUTPUT_DIR / 'similar_players.json'
+
+# 유사도 계산 지표 (player_fantasy_stats에 있는 컬럼만 사용)
+SIMILARITY_FEATURES = [
+    'fantasy_score_per_90', 'goals_per_90', 'assists_per_90', 'shots_per_90',
+    'key_passes_per_90', 'tackles_per_90', 'interceptions_per_90',
+    'xg_per_90', 'xt_per_90', 'sca_per_90',
+    'pass_success_rate', 'duel_win_rate',
+]
+
+# 포지션 그룹 (같은 그룹 내에서만 검색할 때 사용, 미등록 포지션은 자기 자신이 그룹)
+POSITION_GROUPS = {
+    'GK': ['GK'],
+    'DF': ['CB', 'LB', 'RB', 'LWB', 'RWB'],
+    'MF': ['DMF', 'CMF', 'AMF', 'LMF', 'RMF', 'CM', 'CDM', 'CAM', 'LM', 'RM'],
+    'FW': ['CF', 'SS', 'LWF', 'RWF', 'LW', 'RW', 'ST'],
+}
+POSITION_TO_GROUP = {pos: group for group, positions in POSITION_GROUPS.items() for pos in positions}
+
+TOP_K = 10
+BATCH_SIZE = 1024
+
+
+class SimilarityIndex:
+    """코사인 유사도 기반 선수 최근접 이웃 인덱스"""
+
+    def __init__(self, features=None, by_position=True, k=TOP_K):
+        self.features = features or SIMILARITY_FEATURES
+        self.by_position = by_position
+        self.k = k
+        self.player_ids = None      # (n,)
+        self.groups = None          # (n,) 포지션 그룹
+        self.mean = None
+        self.scale = None
+        self.vectors = None         # (n, d) 단위 벡터 (float32)
+        self.neighbors = None       # (n, k) 이웃 행 번호 (-1: 없음)
+        self.scores = None          # (n, k) 유사도
+
+    # ------------------------------------------------------------------
+    # 벡터화
+    # ------------------------------------------------------------------
+
+    def _matrix(self, player_stats: pd.DataFrame) -> np.ndarray:
+        return player_stats[self.features].fillna(0).to_numpy(dtype=np.float64)
+
+    def _unit_vectors(self, matrix: np.ndarray) -> np.ndarray:
+        z = (matrix - self.mean) / self.scale
+        norms = np.linalg.norm(z, axis=1, keepdims=True)
+        return (z / np.maximum(norms, 1e-12)).astype(np.float32)
+
+    def _groups(self, player_stats: pd.DataFrame) -> np.ndarray:
+        positions = player_stats['main_position'].fillna('')
+        return positions.map(POSITION_TO_GROUP).fillna(positions).to_numpy(dtype=object)
+
+    def fit(self, player_stats: pd.DataFrame):
+        """인덱스 생성 + 전체 선수 top-k 계산"""
+        self.features = [f for f in self.features if f in player_stats.columns]
+        matrix = self._matrix(player_stats)
+
+        self.mean = matrix.mean(axis=0)
+        self.scale = matrix.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+
+        self.player_ids = player_stats['player_id'].to_numpy(dtype=np.int64)
+        self.groups = self._groups(player_stats)
+        self.vectors = self._unit_vectors(matrix)
+
+        self.neighbors, self.scores = self._top_k_rows(np.arange(len(self.player_ids)))
+        return self
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+
+    def _masked_scores(self, rows: np.ndarray, candidates=None) -> np.ndarray:
+        """rows x 후보 유사도 (자기 자신/다른 포지션 그룹은 -inf)"""
+        cand = np.arange(len(self.player_ids)) if candidates is None else candidates
+        sims = self.vectors[rows] @ self.vectors[cand].T
+        sims[rows[:, None] == cand[None, :]] = -np.inf
+        if self.by_position:
+            sims[self.groups[rows][:, None] != self.groups[cand][None, :]] = -np.inf
+        return sims
+
+    def _select_top_k(self, sims: np.ndarray, ids: np.ndarray):
+        """행별 상위 k개 (점수 내림차순), 후보 부족 시 -1"""
+        k = min(self.k, sims.shape[1])
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k] if k > 0 else np.zeros((len(sims), 0), dtype=int)
+        part_scores = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind='stable')
+        top = np.take_along_axis(part, order, axis=1)
+        top_scores = np.take_along_axis(part_scores, order, axis=1)
+
+        neighbors = np.full((len(sims), self.k), -1, dtype=np.int64)
+        scores = np.full((len(sims), self.k), -np.inf, dtype=np.float32)
+        valid = np.isfinite(top_scores)
+        neighbors[:, :k] = np.where(valid, ids[top], -1)
+        scores[:, :k] = top_scores
+        return neighbors, scores
+
+    def _top_k_rows(self, rows: np.ndarray):
+        """지정 행들의 전체 후보 대상 top-k (BATCH_SIZE행씩 행렬 곱)"""
+        neighbors = np.empty((len(rows), self.k), dtype=np.int64)
+        scores = np.empty((len(rows), self.k), dtype=np.float32)
+        all_ids = np.arange(len(self.player_ids))
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            neighbors[start:start + len(batch)], scores[start:start + len(batch)] = \
+                self._select_top_k(self._masked_scores(batch), all_ids)
+        return neighbors, scores
+
+    def _row(self, player_id) -> int:
+        rows = np.flatnonzero(self.player_ids == player_id)
+        if len(rows) == 0:
+            raise KeyError(f"인덱스에 없는 선수: {player_id}")
+        return int(rows[0])
+
+    def query(self, player_id, k=None) -> pd.DataFrame:
+        """
+        선수 1명의 유사 선수 (인덱스 재계산 없이 단일 행렬-벡터 곱)
+
+        Returns:
+            DataFrame[player_id, similarity]
+        """
+        k = k or self.k
+        row = self._row(player_id)
+        sims = self._masked_scores(np.array([row]))[0]
+        k = min(k, int(np.isfinite(sims).sum()))
+        if k == 0:
+            return pd.DataFrame({'player_id': [], 'similarity': []})
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind='stable')]
+        return pd.DataFrame({'player_id': self.player_ids[top], 'similarity': sims[top].round(4)})
+
+    # ------------------------------------------------------------------
+    # 증분 갱신
+    # ------------------------------------------------------------------
+
+    def update(self, changed_stats: pd.DataFrame):
+        """
+        일부 선수 벡터 변경/추가 반영
+
+        Args:
+            changed_stats: 변경/신규 선수의 player_fantasy_stats 행
+        Returns:
+            int: 전체 재계산한 행 수
+        """
+        changed_ids = changed_stats['player_id'].to_numpy(dtype=np.int64)
+        existing = pd.Index(self.player_ids).get_indexer(changed_ids)
+        is_new = existing < 0
+
+        vectors = self._unit_vectors(self._matrix(changed_stats))
+        groups = self._groups(changed_stats)
+
+        # 기존 행 교체
+        old_rows = existing[~is_new]
+        self.vectors[old_rows] = vectors[~is_new]
+        self.groups[old_rows] = groups[~is_new]
+
+        # 신규 행 추가
+        n_new = int(is_new.sum())
+        if n_new:
+            self.player_ids = np.concatenate([self.player_ids, changed_ids[is_new]])
+            self.groups = np.concatenate([self.groups, groups[is_new]])
+            self.vectors = np.vstack([self.vectors, vectors[is_new]])
+            self.neighbors = np.vstack([self.neighbors, np.full((n_new, self.k), -1, dtype=np.int64)])
+            self.scores = np.vstack([self.scores, np.full((n_new, self.k), -np.inf, dtype=np.float32)])
+
+        n = len(self.player_ids)
+        changed_rows = np.concatenate([old_rows, np.arange(n - n_new, n)])
+        is_changed = np.zeros(n, dtype=bool)
+        is_changed[changed_rows] = True
+
+        # 변경 선수를 이웃으로 갖던 선수 -> 순위가 내려갈 수 있으므로 전체 재계산
+        had_changed = (is_changed[np.maximum(self.neighbors, 0)] & (self.neighbors >= 0)).any(axis=1)
+        recompute = np.flatnonzero(is_changed | had_changed)
+        if len(recompute):
+            self.neighbors[recompute], self.scores[recompute] = self._top_k_rows(recompute)
+
+        # 나머지: 기존 top-k + 변경 선수 점수 병합
+        merge = np.flatnonzero(~(is_changed | had_changed))
+        if len(merge) and len(changed_rows):
+            sims = self._masked_scores(merge, changed_rows)
+            combined_ids = np.hstack([self.neighbors[merge], np.broadcast_to(changed_rows, sims.shape)])
+            combined = np.hstack([np.where(self.neighbors[merge] >= 0, self.scores[merge], -np.inf), sims])
+            top, top_scores = self._select_top_k(combined, np.arange(combined.shape[1]))
+            valid = top >= 0
+            self.neighbors[merge] = np.where(valid, np.take_along_axis(combined_ids, np.maximum(top, 0), axis=1), -1)
+            self.scores[merge] = top_scores
+
+        return len(recompute)
+
+    # ------------------------------------------------------------------
+    # 내보내기
+    # ------------------------------------------------------------------
+
+    def to_json(self) -> dict:
+        """{player_id: [{'id': 이웃 id, 'similarity': 유사도}, ...]}"""
+        result = {}
+        for i, player_id in enumerate(self.player_ids):
+            valid = self.neighbors[i] >= 0
+            result[int(player_id)] = [
+                {'id': int(self.player_ids[j]), 'similarity': round(float(s), 3)}
+                for j, s in zip(self.neighbors[i][valid], self.scores[i][valid])
+            ]
+        return result
+
+    def save(self, path=SIMILAR_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f)
+        return path
+
+
+def main():
+    print("=" * 60)
+    print("K-Fantasy AI - 선수 유사도 인덱스")
+    print("=" * 60)
+
+    player_stats = pd.read_csv(OUTPUT_DIR / 'player_fantasy_stats.csv')
+    print(f"  - 선수: {len(player_stats)}명")
+
+    start = time.perf_counter()
+    index = SimilarityIndex().fit(player_stats)
+    elapsed = time.perf_counter() - start
+    print(f"\n  - 인덱스 생성 + 전체 top-{index.k}: {elapsed:.3f}s (지표 {len(index.features)}개)")
+
+    sample = player_stats.iloc[0]
+    start = time.perf_counter()
+    similar = index.query(sample['player_id'])
+    elapsed = (time.perf_counter() - start) * 1000
+    names = player_stats.set_index('player_id')['player_name_ko']
+    print(f"  - 단일 조회: {elapsed:.3f}ms")
+    print(f"\n  {sample['player_name_ko']}와(과) 유사한 선수:")
+    for _, row in similar.head(5).iterrows():
+        print(f"    {names.get(row['player_id'], row['player_id'])}: {row['similarity']:.3f}")
+
+    print(f"\n유사 선수 저장: {index.save()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - DuckDB SQL 실행 백엔드
+=====================================
+그룹 집계/조인 단계를 DuckDB SQL로 실행 (선택 의존성, 멀티스레드 벡터화 실행)
+
+대상 단계:
+1. aggregate_player_stats: 선수별 시즌 합계 (비율/90분당 지표는 pandas와 같은 derive_player_rates 사용)
+2. calculate_recent_form: 선수별 최근 N경기 (row_number 윈도 함수)
+3. create_team_stats_json: 팀별 통계
+
+사용:
+    KFANTASY_BACKEND=duckdb python fantasy_calculator.py
+    python sql_backend.py query "SELECT team_name_ko, avg(avg_fantasy_score) FROM player_fantasy_stats GROUP BY 1"
+    python sql_backend.py tables
+    python sql_backend.py verify --scale small    (pandas 경로와 결과 비교)
+
+query는 outputs/의 CSV/Parquet 파일을 파일 이름(확장자 제외)의 뷰로, 피처 스토어를 feature_store 뷰로 등록
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HAS_DUCKDB = importlib.util.find_spec('duckdb') is not None
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+
+BACKENDS = ['pandas', 'duckdb']
+
+
+def resolve_backend(backend=None) -> str:
+    """실행 백엔드 결정 (None이면 KFANTASY_BACKEND 환경 변수, DuckDB 미설치 시 pandas)"""
+    backend = backend or os.environ.get('KFANTASY_BACKEND', 'pandas')
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 백엔드: {backend} (가능: {', '.join(BACKENDS)})")
+    if backend == 'duckdb' and not HAS_DUCKDB:
+        print("Warning: duckdb not installed. Using pandas backend.")
+        return 'pandas'
+    return backend
+
+
+def connect(**tables):
+    """DuckDB 연결 (DataFrame은 복사 없이 테이블로 등록)"""
+    import duckdb
+
+    con = duckdb.connect()
+    for name, frame in tables.items():
+        con.register(name, frame)
+    return con
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _with_row_order(frame: pd.DataFrame) -> pd.DataFrame:
+    """입력 행 순서 컬럼 추가 (pandas first/last와 같은 동순위 처리용)"""
+    return frame.assign(_row=np.arange(len(frame)))
+
+
+def _match_dates(match_info) -> pd.DataFrame:
+    if match_info is None or 'game_date' not in match_info.columns:
+        return pd.DataFrame({'game_id': pd.Series(dtype='int64'), 'game_date': pd.Series(dtype='str')})
+    return match_info[['game_id', 'game_date']].drop_duplicates('game_id')
+
+
+def aggregate_player_stats(fantasy_df: pd.DataFrame, match_info=None) -> pd.DataFrame:
+    """FantasyCalculator.aggregate_player_stats의 SQL 구현 (소속팀은 최근 경기 기준)"""
+    from fantasy_calculator import SEASON_SUM_COLUMNS, derive_player_rates, season_sum_columns
+
+    sums = []
+    for metric in season_sum_columns(fantasy_df.columns):
+        column = 's.' + _quote(metric)
+        if pd.api.types.is_integer_dtype(fantasy_df[metric]) or pd.api.types.is_bool_dtype(fantasy_df[metric]):
+            # DuckDB 정수 합계는 HUGEINT(-> float)이므로 BIGINT로 고정, 실수 합계는 pandas와 같은 보정 합(fsum)
+            sums.append(f"sum({column}::BIGINT)::BIGINT AS {_quote(SEASON_SUM_COLUMNS[metric])}")
+        else:
+            sums.append(f"fsum({column}) AS {_quote(SEASON_SUM_COLUMNS[metric])}")
+
+    order = "ORDER BY m.game_date NULLS LAST, s._row"
+    con = connect(scores=_with_row_order(fantasy_df), match_dates=_match_dates(match_info))
+    player_stats = con.execute(f"""
+        SELECT s.player_id,
+               first(s.player_name_ko {order}) AS player_name_ko,
+               last(s.team_name_ko {order}) AS team_name_ko,
+               count(DISTINCT s.team_name_ko) AS teams_played,
+               first(s.main_position {order}) AS main_position,
+               count(s.game_id) AS matches_played,
+               fsum(s.fantasy_score) AS total_fantasy_score,
+               fsum(s.fantasy_score) / count(s.fantasy_score) AS avg_fantasy_score,
+               stddev_samp(s.fantasy_score) AS std_fantasy_score,
+               max(s.fantasy_score) AS max_fantasy_score,
+               {', '.join(sums)}
+        FROM scores s
+        LEFT JOIN match_dates m USING (game_id)
+        GROUP BY s.player_id
+        ORDER BY s.player_id
+    """).df()
+    con.close()
+
+    return derive_player_rates(player_stats)
+
+
+def calculate_recent_form(fantasy_df: pd.DataFrame, match_info, n_matches=5) -> pd.DataFrame:
+    """FantasyCalculator.calculate_recent_form의 SQL 구현 (최소 3경기)"""
+    con = connect(scores=_with_row_order(fantasy_df), match_dates=_match_dates(match_info))
+    recent_form = con.execute(f"""
+        WITH ranked AS (
+            SELECT s.player_id, s.fantasy_score,
+                   row_number() OVER (
+                       PARTITION BY s.player_id ORDER BY m.game_date DESC NULLS LAST, s._row
+                   ) AS recency
+            FROM scores s
+            LEFT JOIN match_dates m USING (game_id)
+        )
+        SELECT player_id,
+               avg(fantasy_score) AS recent_{n_matches}_avg,
+               count(*) AS recent_{n_matches}_matches,
+               arg_min(fantasy_score, recency) AS last_match_score
+        FROM ranked
+        WHERE recency <= {int(n_matches)}
+        GROUP BY player_id
+        HAVING count(*) >= 3
+        ORDER BY player_id
+    """).df()
+    con.close()
+    return recent_form
+
+
+def team_stats(player_stats: pd.DataFrame) -> pd.DataFrame:
+    """
+    팀별 선수 수/평균 점수/골/어시스트/최고 선수 (export_json.create_team_stats_json용)
+
+    Returns:
+        팀 첫 등장 순서 (pandas unique()와 동일)
+    """
+    con = connect(player_stats=_with_row_order(player_stats))
+    teams = con.execute("""
+        SELECT team_name_ko,
+               count(*) AS player_count,
+               avg(avg_fantasy_score) AS avg_fantasy_score,
+               sum(total_goals::BIGINT)::BIGINT AS total_goals,
+               sum(total_assists::BIGINT)::BIGINT AS total_assists,
+               first(player_name_ko ORDER BY avg_fantasy_score DESC NULLS LAST, _row) AS top_player
+        FROM player_stats
+        GROUP BY team_name_ko
+        ORDER BY min(_row)
+    """).df()
+    con.close()
+    return teams
+
+
+def output_views(con, output_dir=OUTPUT_DIR) -> list:
+    """outputs/의 CSV/Parquet 파일과 피처 스토어를 뷰로 등록"""
+    views = []
+    for path in sorted(Path(output_dir).glob('*')):
+        if path.suffix == '.csv':
+            source = f"read_csv_auto('{path.as_posix()}')"
+        elif path.suffix == '.parquet':
+            source = f"read_parquet('{path.as_posix()}')"
+        else:
+            continue
+        con.execute(f"CREATE VIEW {_quote(path.stem)} AS SELECT * FROM {source}")
+        views.append(path.stem)
+
+    store = Path(output_dir) / 'feature_store'
+    for suffix, reader in [('parquet', 'read_parquet'), ('csv', 'read_csv_auto')]:
+        if any(store.glob(f'season=*/game_day=*/part-*.{suffix}')):
+            pattern = (store / f'season=*/game_day=*/part-*.{suffix}').as_posix()
+            con.execute(f"CREATE VIEW feature_store AS SELECT * FROM {reader}('{pattern}', hive_partitioning=true)")
+            views.append('feature_store')
+            break
+    return views
+
+
+def _compare_frames(name, left: pd.DataFrame, right: pd.DataFrame, key) -> int:
+    """두 결과 비교 (수치 컬럼은 허용 오차, 그 외는 일치), 불일치 셀 수 반환"""
+    left = left.sort_values(key).reset_index(drop=True)
+    right = right.sort_values(key).reset_index(drop=True)
+    if list(left[key]) != list(right[key]) or set(left.columns) != set(right.columns):
+        print(f"  - {name}: 행/컬럼 불일치 ({len(left)} vs {len(right)}행)")
+        return max(len(left), len(right))
+
+    mismatches = 0
+    for column in left.columns:
+        a, b = left[column], right[column]
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            same = np.isclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float), rtol=1e-9, atol=1e-9, equal_nan=True)
+        else:
+            same = (a.astype(str) == b.astype(str)).to_numpy()
+        if not same.all():
+            print(f"    {column}: {(~same).sum()}행 불일치")
+        mismatches += int((~same).sum())
+
+    print(f"  - {name}: {len(left)}행 x {len(left.columns)}컬럼, 불일치 {mismatches}")
+    return mismatches
+
+
+def verify(fantasy_df: pd.DataFrame, match_info: pd.DataFrame) -> int:
+    """pandas 경로와 DuckDB 경로 결과 비교 (불일치 셀 수 반환)"""
+    import contextlib
+    import io
+
+    from export_json import create_team_stats_json
+    from fantasy_calculator import FantasyCalculator
+
+    results = {}
+    for backend in BACKENDS:
+        calculator = FantasyCalculator(backend=backend)
+        calculator.match_info = match_info
+        with contextlib.redirect_stdout(io.StringIO()):
+            player_stats = calculator.aggregate_player_stats(fantasy_df)
+            recent_form = calculator.calculate_recent_form(fantasy_df, n_matches=5)
+            teams = create_team_stats_json({'player_stats': player_stats}, backend=backend)
+        results[backend] = (player_stats, recent_form, pd.DataFrame(teams))
+
+    (stats_a, form_a, teams_a), (stats_b, form_b, teams_b) = results['pandas'], results['duckdb']
+    mismatches = _compare_frames('aggregate_player_stats', stats_a, stats_b, 'player_id')
+    mismatches += _compare_frames('calculate_recent_form', form_a, form_b, 'player_id')
+    mismatches += _compare_frames('create_team_stats_json', teams_a, teams_b, 'name')
+    if list(teams_a['name']) != list(teams_b['name']):
+        print("  - create_team_stats_json: 팀 순서 불일치")
+        mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='K-Fantasy AI SQL 백엔드 (DuckDB)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    query_parser = subparsers.add_parser('query', help='outputs/ 파일에 SQL 실행')
+    query_parser.add_argument('sql')
+    query_parser.add_argument('--limit', type=int, default=50, help='출력 행 수')
+    query_parser.add_argument('--csv', default=None, help='결과 CSV 저장 경로')
+    subparsers.add_parser('tables', help='조회 가능한 뷰 목록')
+    verify_parser = subparsers.add_parser('verify', help='pandas 경로와 결과 비교')
+    verify_parser.add_argument('--scale', default=None, help='합성 데이터 규모 (미지정 시 outputs/ 결과 사용)')
+    args = parser.parse_args()
+
+    if not HAS_DUCKDB:
+        print("duckdb 미설치: pip install duckdb")
+        sys.exit(1)
+
+    if args.command == 'verify':
+        print("=" * 60)
+        print("K-Fantasy AI - SQL 백엔드 검증 (pandas vs DuckDB)")
+        print("=" * 60)
+        if args.scale:
+            from backtest import synthetic_inputs
+            fantasy_df, match_info = synthetic_inputs(args.scale)
+        else:
+            from dataset import load_table
+            fantasy_df = pd.read_csv(OUTPUT_DIR / 'fantasy_scores_by_match.csv')
+            match_info = load_table('match_info')
+        mismatches = verify(fantasy_df, match_info)
+        print(f"\n{'결과 일치' if mismatches == 0 else f'불일치 {mismatches}건'}")
+        sys.exit(1 if mismatches else 0)
+
+    con = connect()
+    views = output_views(con)
+
+    if args.command == 'tables':
+        for view in views:
+            columns = con.execute(f"DESCRIBE {_quote(view)}").df()['column_name']
+            print(f"{view} ({len(columns)}컬럼): {', '.join(columns[:8])}{' ...' if len(columns) > 8 else ''}")
+        return
+
+    result = con.execute(args.sql).df()
+    if args.csv:
+        result.to_csv(args.csv, index=False, encoding='utf-8-sig')
+        print(f"저장: {args.csv} ({len(result)}행)")
+    else:
+        with pd.option_context('display.max_columns', None, 'display.width', 200):
+            print(result.head(args.limit).to_string(index=False))
+        if len(result) > args.limit:
+            print(f"... ({len(result)}행 중 {args.limit}행 표시)")
+
+
+if __name__ == '__main__':
+    main()
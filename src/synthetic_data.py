@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 합성 K리그 이벤트 데이터 생성기
+==============================================
+raw_data.csv / match_info.csv와 같은 스키마의 합성 데이터를 규모별로 생성
+(벤치마크/부하 테스트용, 실제 데이터 없이 파이프라인 전체 실행 가능)
+
+생성 규칙:
+1. 12개 팀 더블 라운드 로빈 (라운드당 6경기), 팀당 25명 스쿼드
+2. 경기당 선발 11명 + 교체 3명 출전, 교체 선수는 후반에 투입
+3. 점유(에피소드) 단위로 팀이 번갈아 공격, episode_id는 경기 내 순번
+4. 이벤트 유형/결과 비율과 좌표는 포지션/유형별 분포에서 벡터화 샘플링
+
+실행:
+    python synthetic_data.py --scale small --out ../outputs/synthetic
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+SYNTHETIC_DIR = BASE_DIR / 'outputs' / 'synthetic'
+
+# 규모 프리셋 (라운드 수, 경기당 평균 이벤트 수)
+SCALES = {
+    'tiny': {'rounds': 4, 'events_per_game': 600},
+    'small': {'rounds': 6, 'events_per_game': 1600},
+    'medium': {'rounds': 19, 'events_per_game': 1800},
+    'full': {'rounds': 38, 'events_per_game': 2000},
+}
+
+TEAMS = [
+    '울산 HD FC', '포항 스틸러스', '전북 현대 모터스', 'FC서울', '광주FC', '수원FC',
+    '인천 유나이티드', '대전 하나 시티즌', '강원FC', '제주 유나이티드', '대구FC', '김천 상무 프로축구단',
+]
+
+# 스쿼드 포지션 구성 (25명)
+SQUAD_POSITIONS = [
+    'GK', 'GK', 'GK',
+    'CB', 'CB', 'CB', 'CB', 'LB', 'LB', 'RB', 'RB',
+    'CDM', 'CDM', 'CM', 'CM', 'CM', 'CAM', 'CAM', 'LM', 'RM',
+    'LW', 'RW', 'CF', 'ST', 'ST',
+]
+# 선발 11명 (4-3-3 계열)
+STARTING_SLOTS = [0, 3, 4, 7, 9, 11, 13, 16, 20, 21, 23]
+BENCH_SLOTS = [5, 14, 24]
+
+EVENT_TYPES = ['Pass', 'Carry', 'Duel', 'Recovery', 'Interception', 'Clearance',
+               'Tackle', 'Block', 'Shot', 'Throw-In', 'Foul']
+EVENT_PROBS = np.array([0.46, 0.20, 0.08, 0.06, 0.03, 0.04, 0.03, 0.015, 0.015, 0.04, 0.03])
+EVENT_PROBS = EVENT_PROBS / EVENT_PROBS.sum()
+
+# 포지션 그룹별 이벤트 유형 가중치 (행: GK/DF/MF/FW, 열: EVENT_TYPES)
+POSITION_GROUP = {'GK': 0, 'CB': 1, 'LB': 1, 'RB': 1, 'CDM': 2, 'CM': 2, 'CAM': 2,
+                  'LM': 2, 'RM': 2, 'LW': 3, 'RW': 3, 'CF': 3, 'ST': 3}
+TYPE_WEIGHTS = np.array([
+    # Pass Carry Duel Rec  Int  Clr  Tck  Blk  Shot Thr  Foul
+    [0.6, 0.1, 0.05, 0.5, 0.1, 0.8, 0.05, 0.1, 0.01, 0.1, 0.05],  # GK
+    [1.0, 0.8, 1.0, 1.3, 1.5, 1.8, 1.3, 1.6, 0.3, 1.5, 1.0],     # DF
+    [1.3, 1.0, 1.0, 1.0, 1.0, 0.6, 1.1, 0.8, 0.9, 0.8, 1.0],     # MF
+    [0.7, 1.2, 1.2, 0.5, 0.4, 0.2, 0.5, 0.3, 2.5, 0.4, 1.0],     # FW
+])
+
+# 결과 확률
+PASS_SUCCESS = 0.82
+DUEL_SUCCESS = 0.5
+TACKLE_SUCCESS = 0.6
+SHOT_RESULTS = ['Goal', 'Successful', 'Unsuccessful']
+SHOT_RESULT_PROBS = [0.11, 0.30, 0.59]
+
+PITCH_LENGTH = 105.0
+PITCH_WIDTH = 68.0
+MATCH_SECONDS = 95 * 60
+
+
+def build_schedule(rounds, seed=0):
+    """라운드 로빈 일정 (circle method)"""
+    rng = np.random.default_rng(seed)
+    n = len(TEAMS)
+    teams = list(range(n))
+    rows = []
+    game_id = 100000
+    start_date = pd.Timestamp('2024-03-01')
+
+    for round_idx in range(rounds):
+        shift = round_idx % (n - 1)
+        rotation = teams[:1] + teams[1 + shift:] + teams[1:1 + shift]
+        for i in range(n // 2):
+            home, away = rotation[i], rotation[n - 1 - i]
+            if (round_idx // (n - 1)) % 2 == 1:
+                home, away = away, home
+            game_id += 1
+            rows.append({
+                'game_id': game_id,
+                'game_day': round_idx + 1,
+                'game_date': (start_date + pd.Timedelta(days=7 * round_idx + int(rng.integers(0, 3)))).strftime('%Y-%m-%d'),
+                'home_team_id': 1000 + home,
+                'away_team_id': 1000 + away,
+                'home_team_name': TEAMS[home],
+                'away_team_name': TEAMS[away],
+            })
+
+    return pd.DataFrame(rows)
+
+
+def build_squads():
+    """팀별 스쿼드 (player_id, 이름, 포지션)"""
+    rows = []
+    for team_idx, team in enumerate(TEAMS):
+        for slot, position in enumerate(SQUAD_POSITIONS):
+            player_id = 200000 + team_idx * 100 + slot
+            rows.append({
+                'team_id': 1000 + team_idx,
+                'team_name_ko': team,
+                'slot': slot,
+                'player_id': player_id,
+                'player_name_ko': f'선수{player_id}',
+                'main_position': position,
+            })
+    return pd.DataFrame(rows)
+
+
+def generate_match_events(game, squads, events_per_game, rng):
+    """한 경기 이벤트 생성 (벡터화)"""
+    n = max(int(rng.normal(events_per_game, events_per_game * 0.08)), 100)
+
+    # 시간 / 전후반
+    time_seconds = np.sort(rng.uniform(0, MATCH_SECONDS, n)).round(1)
+    period_id = np.where(time_seconds < MATCH_SECONDS / 2, 1, 2)
+
+    # 점유(에피소드): 평균 8이벤트 길이로 팀 교대
+    run_lengths = rng.geometric(1 / 8, size=n)
+    episode_of_event = np.repeat(np.arange(len(run_lengths)), run_lengths)[:n]
+    home_starts = rng.random() < 0.5
+    is_home = (episode_of_event % 2 == 0) == home_starts
+
+    # 이벤트 유형 (포지션 가중치 반영 전 기본 분포)
+    type_idx = rng.choice(len(EVENT_TYPES), size=n, p=EVENT_PROBS)
+
+    # 출전 선수: 선발 11명, 교체 3명은 60~80분 사이 투입
+    team_ids = np.where(is_home, game['home_team_id'], game['away_team_id'])
+    player_idx = np.empty(n, dtype=np.int64)
+    for side, team_id in ((True, game['home_team_id']), (False, game['away_team_id'])):
+        squad = squads[squads['team_id'] == team_id].sort_values('slot')
+        groups = squad['main_position'].map(POSITION_GROUP).to_numpy()
+        mask = is_home == side
+        sub_times = np.sort(rng.uniform(60 * 60, 80 * 60, len(BENCH_SLOTS)))
+        replaced = rng.choice(np.arange(1, len(STARTING_SLOTS)), size=len(BENCH_SLOTS), replace=False)
+
+        event_times = time_seconds[mask]
+        event_types = type_idx[mask]
+        # 시점별 출전 명단 (교체 반영)
+        lineup = np.tile(np.array(STARTING_SLOTS), (mask.sum(), 1))
+        for sub_time, bench_slot, out_idx in zip(sub_times, BENCH_SLOTS, replaced):
+            lineup[event_times >= sub_time, out_idx] = bench_slot
+
+        weights = TYPE_WEIGHTS[groups[lineup], event_types[:, None]]
+        weights = weights / weights.sum(axis=1, keepdims=True)
+        choice = (weights.cumsum(axis=1) > rng.random((mask.sum(), 1))).argmax(axis=1)
+        player_idx[mask] = squad.index.to_numpy()[lineup[np.arange(mask.sum()), choice]]
+
+    players = squads.loc[player_idx]
+    types = np.array(EVENT_TYPES)[type_idx]
+
+    # 결과
+    u = rng.random(n)
+    result = np.where(u < PASS_SUCCESS, 'Successful', 'Unsuccessful').astype(object)
+    result[types == 'Duel'] = np.where(u[types == 'Duel'] < DUEL_SUCCESS, 'Successful', 'Unsuccessful')
+    result[types == 'Tackle'] = np.where(u[types == 'Tackle'] < TACKLE_SUCCESS, 'Successful', 'Unsuccessful')
+    shots = types == 'Shot'
+    result[shots] = rng.choice(SHOT_RESULTS, size=shots.sum(), p=SHOT_RESULT_PROBS)
+
+    # 좌표 (모든 팀이 오른쪽으로 공격하는 정규화 좌표)
+    group = players['main_position'].map(POSITION_GROUP).to_numpy()
+    base_x = np.array([8.0, 35.0, 55.0, 78.0])[group]
+    start_x = np.clip(rng.normal(base_x, 14.0), 0, PITCH_LENGTH)
+    start_x[shots] = np.clip(rng.normal(91.0, 6.0, shots.sum()), 60, PITCH_LENGTH)
+    start_y = np.clip(rng.normal(PITCH_WIDTH / 2, 17.0, n), 0, PITCH_WIDTH)
+    start_y[shots] = np.clip(rng.normal(PITCH_WIDTH / 2, 8.0, shots.sum()), 0, PITCH_WIDTH)
+
+    dx = np.zeros(n)
+    dy = np.zeros(n)
+    moving = np.isin(types, ['Pass', 'Carry'])
+    dx[moving] = rng.normal(np.where(types[moving] == 'Pass', 6.0, 4.0), np.where(types[moving] == 'Pass', 14.0, 7.0))
+    dy[moving] = rng.normal(0.0, 10.0, moving.sum())
+    dx[shots] = PITCH_LENGTH - start_x[shots]
+    dy[shots] = PITCH_WIDTH / 2 - start_y[shots] + rng.normal(0, 3.0, shots.sum())
+    end_x = np.clip(start_x + dx, 0, PITCH_LENGTH)
+    end_y = np.clip(start_y + dy, 0, PITCH_WIDTH)
+
+    return pd.DataFrame({
+        'game_id': game['game_id'],
+        'period_id': period_id,
+        'episode_id': episode_of_event + 1,
+        'time_seconds': time_seconds,
+        'team_id': team_ids,
+        'team_name_ko': players['team_name_ko'].to_numpy(),
+        'player_id': players['player_id'].to_numpy(),
+        'player_name_ko': players['player_name_ko'].to_numpy(),
+        'main_position': players['main_position'].to_numpy(),
+        'type_name': types,
+        'result_name': result,
+        'start_x': start_x.round(2),
+        'start_y': start_y.round(2),
+        'end_x': end_x.round(2),
+        'end_y': end_y.round(2),
+    })
+
+
+def generate(scale='small', rounds=None, events_per_game=None, seed=42):
+    """
+    합성 데이터 생성
+
+    Args:
+        scale: SCALES 프리셋 이름
+        rounds / events_per_game: 프리셋 값 덮어쓰기
+
+    Returns:
+        (raw_data, match_info) DataFrame
+    """
+    preset = SCALES[scale]
+    rounds = rounds or preset['rounds']
+    events_per_game = events_per_game or preset['events_per_game']
+    rng = np.random.default_rng(seed)
+
+    match_info = build_schedule(rounds, seed)
+    squads = build_squads()
+
+    events = [
+        generate_match_events(game, squads, events_per_game, rng)
+        for game in match_info.to_dict('records')
+    ]
+    raw_data = pd.concat(events, ignore_index=True)
+
+    # 경기 결과 (골 이벤트 집계)
+    goals = raw_data[(raw_data['type_name'] == 'Shot') & (raw_data['result_name'] == 'Goal')]
+    goal_counts = goals.groupby(['game_id', 'team_id']).size()
+    match_info['home_score'] = [
+        int(goal_counts.get((g, t), 0)) for g, t in zip(match_info['game_id'], match_info['home_team_id'])
+    ]
+    match_info['away_score'] = [
+        int(goal_counts.get((g, t), 0)) for g, t in zip(match_info['game_id'], match_info['away_team_id'])
+    ]
+
+    return raw_data, match_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 합성 데이터 생성기')
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--rounds', type=int, default=None)
+    parser.add_argument('--events-per-game', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default=str(SYNTHETIC_DIR))
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("K-Fantasy AI - 합성 데이터 생성")
+    print("=" * 60)
+
+    raw_data, match_info = generate(args.scale, args.rounds, args.events_per_game, args.seed)
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    raw_data.to_csv(out_dir / 'raw_data.csv', index=False, encoding='utf-8-sig')
+    match_info.to_csv(out_dir / 'match_info.csv', index=False, encoding='utf-8-sig')
+
+    print(f"  - raw_data: {len(raw_data):,}건")
+    print(f"  - match_info: {len(match_info):,}경기")
+    print(f"  - 위치: {out_dir}")
+
+
+if __name__ == '__main__':
+    main()
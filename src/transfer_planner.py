@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 이적(교체) 추천 엔진
+===================================
+저장된 스쿼드(My Team의 SavedTeam)를 기준으로 향후 K라운드 예상 점수 합계를
+가장 많이 올리는 1인/2인 교체를 예산 내에서 추천
+
+평가 (벡터화):
+1. 선수별 K라운드 가치 = 라운드별 예측 점수 합계
+   (predicted_score_r1..rK 컬럼이 있으면 사용, 없으면 predicted_score에 라운드별 감쇠 적용)
+2. 1인 교체: 스쿼드 x 전체 선수 이득 행렬 (같은 포지션 그룹 + 예산 마스크)
+3. 2인 교체: 후보 사전 가지치기 후 (방출 쌍 x 영입 쌍) 이득 행렬
+   - 같은 그룹에서 자신보다 싸고 가치가 높은 선수가 2명 이상이면 어떤 2인 교체에서도
+     그 선수로 대체 가능 -> 최적해에 불필요하므로 제외 (지배 관계 가지치기)
+4. 무료 교체 횟수를 넘는 교체는 TRANSFER_PENALTY만큼 차감
+
+가격: predictions에 price 컬럼이 있으면 사용 (main은 pricing.py의 player_prices.csv 병합),
+없으면 pricing.base_prices 기준 가격
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pricing import PRICES_PATH, base_prices, load_prices, position_group
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+
+DEFAULT_BUDGET = 100.0           # 백만원 (My Team 기본 예산)
+DEFAULT_ROUNDS = 3
+ROUND_DECAY = 0.9                # 단일 라운드 예측을 다음 라운드로 확장할 때의 감쇠
+FREE_TRANSFERS = 1
+TRANSFER_PENALTY = 4.0           # 무료 횟수 초과 교체 1회당 차감 점수
+
+GROUP_CODES = {'GK': 0, 'DF': 1, 'MF': 2, 'FW': 3}
+
+
+def horizon_values(predictions: pd.DataFrame, rounds=DEFAULT_ROUNDS, decay=ROUND_DECAY) -> np.ndarray:
+    """선수별 향후 rounds 라운드 예상 점수 합계"""
+    round_columns = [f'predicted_score_r{r}' for r in range(1, rounds + 1)]
+    if all(col in predictions.columns for col in round_columns):
+        return predictions[round_columns].fillna(0).to_numpy().sum(axis=1)
+
+    weights = decay ** np.arange(rounds)
+    return predictions['predicted_score'].fillna(0).to_numpy() * weights.sum()
+
+
+class TransferPlanner:
+    """예산 내 1인/2인 교체 추천"""
+
+    def __init__(self, predictions: pd.DataFrame, rounds=DEFAULT_ROUNDS, prices=None):
+        self.players = predictions.reset_index(drop=True)
+        self.rounds = rounds
+        self.ids = self.players['player_id'].to_numpy(dtype=np.int64)
+        # 그룹 비교를 정수 연산으로 하기 위해 코드로 저장
+        self.groups = position_group(self.players['main_position']).map(GROUP_CODES).to_numpy(dtype=np.int8)
+        self.values = horizon_values(self.players, rounds)
+        if prices is not None:
+            self.prices = np.asarray(prices, dtype=np.float64)
+        elif 'price' in self.players.columns:
+            self.prices = self.players['price'].to_numpy(dtype=np.float64)
+        else:
+            self.prices = base_prices(self.players)
+
+    def _rows(self, player_ids) -> np.ndarray:
+        rows = pd.Index(self.ids).get_indexer(np.asarray(player_ids, dtype=np.int64))
+        missing = np.asarray(player_ids)[rows < 0]
+        if len(missing):
+            raise KeyError(f"예측 데이터에 없는 선수: {missing.tolist()}")
+        return rows
+
+    def _prune(self, candidates: np.ndarray, keep_dominated=1) -> np.ndarray:
+        """
+        그룹별 지배 관계 가지치기
+        - 같은 그룹에서 (가격 <=, 가치 >=) 인 다른 후보 수가 keep_dominated 이하인 후보만 유지
+        """
+        kept = []
+        for group in np.unique(self.groups[candidates]):
+            rows = candidates[self.groups[candidates] == group]
+            price, value = self.prices[rows], self.values[rows]
+            # 동률은 행 번호로 구분하여 서로 지배하지 않도록 처리
+            better = (
+                (price[None, :] <= price[:, None]) & (value[None, :] >= value[:, None]) &
+                ((price[None, :] < price[:, None]) | (value[None, :] > value[:, None]) |
+                 (rows[None, :] < rows[:, None]))
+            )
+            kept.append(rows[better.sum(axis=1) <= keep_dominated])
+        return np.concatenate(kept) if kept else candidates[:0]
+
+    def plan(self, squad_ids, budget=DEFAULT_BUDGET, top_n=10, free_transfers=FREE_TRANSFERS,
+             max_transfers=2) -> pd.DataFrame:
+        """
+        교체 추천
+
+        Returns:
+            DataFrame[transfers, out_ids, in_ids, gain, net_gain, cost, bank_after] (net_gain 내림차순)
+        """
+        squad = self._rows(squad_ids)
+        bank = budget - self.prices[squad].sum()
+
+        in_squad = np.zeros(len(self.ids), dtype=bool)
+        in_squad[squad] = True
+        pool = np.flatnonzero(~in_squad)
+
+        suggestions = []
+
+        # 1인 교체: (스쿼드, 후보) 이득 행렬
+        gain = self.values[pool][None, :] - self.values[squad][:, None]
+        feasible = (
+            (self.groups[squad][:, None] == self.groups[pool][None, :]) &
+            (self.prices[pool][None, :] <= bank + self.prices[squad][:, None])
+        )
+        out_idx, in_idx = np.nonzero(feasible & (gain > 0))
+        if len(out_idx):
+            order = np.argsort(-gain[out_idx, in_idx], kind='stable')[:top_n]
+            out_idx, in_idx = out_idx[order], in_idx[order]
+            suggestions.append(pd.DataFrame({
+                'transfers': 1,
+                'out_ids': [[int(self.ids[squad[o]])] for o in out_idx],
+                'in_ids': [[int(self.ids[pool[i]])] for i in in_idx],
+                'gain': gain[out_idx, in_idx],
+                'cost': self.prices[pool[in_idx]] - self.prices[squad[out_idx]],
+            }))
+
+        # 2인 교체: 가지치기 후 (방출 쌍, 영입 쌍) 이득 행렬
+        if max_transfers >= 2 and len(squad) >= 2:
+            candidates = self._prune(pool)
+            o1, o2 = np.triu_indices(len(squad), k=1)
+            c1, c2 = np.triu_indices(len(candidates), k=1)
+            out_a, out_b = squad[o1], squad[o2]
+            in_a, in_b = candidates[c1], candidates[c2]
+
+            g = self.groups
+            same_groups = (
+                ((g[out_a][:, None] == g[in_a][None, :]) & (g[out_b][:, None] == g[in_b][None, :])) |
+                ((g[out_a][:, None] == g[in_b][None, :]) & (g[out_b][:, None] == g[in_a][None, :]))
+            )
+            freed = bank + self.prices[out_a] + self.prices[out_b]
+            spent = self.prices[in_a] + self.prices[in_b]
+            pair_gain = (
+                (self.values[in_a] + self.values[in_b])[None, :] -
+                (self.values[out_a] + self.values[out_b])[:, None]
+            )
+            feasible = same_groups & (spent[None, :] <= freed[:, None]) & (pair_gain > 0)
+
+            out_pair, in_pair = np.nonzero(feasible)
+            if len(out_pair):
+                order = np.argsort(-pair_gain[out_pair, in_pair], kind='stable')[:top_n]
+                out_pair, in_pair = out_pair[order], in_pair[order]
+                suggestions.append(pd.DataFrame({
+                    'transfers': 2,
+                    'out_ids': [[int(self.ids[out_a[o]]), int(self.ids[out_b[o]])] for o in out_pair],
+                    'in_ids': [[int(self.ids[in_a[i]]), int(self.ids[in_b[i]])] for i in in_pair],
+                    'gain': pair_gain[out_pair, in_pair],
+                    'cost': spent[in_pair] - (self.prices[out_a] + self.prices[out_b])[out_pair],
+                }))
+
+        if not suggestions:
+            return pd.DataFrame(columns=['transfers', 'out_ids', 'in_ids', 'gain', 'net_gain', 'cost', 'bank_after'])
+
+        result = pd.concat(suggestions, ignore_index=True)
+        result['net_gain'] = result['gain'] - np.maximum(result['transfers'] - free_transfers, 0) * TRANSFER_PENALTY
+        result['bank_after'] = bank - result['cost']
+        result = result.sort_values('net_gain', ascending=False, kind='stable').head(top_n)
+        return result[['transfers', 'out_ids', 'in_ids', 'gain', 'net_gain', 'cost', 'bank_after']] \
+            .round({'gain': 2, 'net_gain': 2, 'cost': 1, 'bank_after': 1}).reset_index(drop=True)
+
+
+def load_saved_team(path) -> list:
+    """SavedTeam JSON (web/src/types SavedTeam) -> 선수 id 목록"""
+    with open(path, 'r', encoding='utf-8') as f:
+        team = json.load(f)
+    return [int(player['id']) for player in team['players'].values() if player]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='K-Fantasy AI 교체 추천')
+    parser.add_argument('--team', help='SavedTeam JSON 경로')
+    parser.add_argument('--squad', help='선수 id 목록 (쉼표 구분, --team 대신 사용)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET)
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument('--free-transfers', type=int, default=FREE_TRANSFERS)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("K-Fantasy AI - 교체 추천")
+    print("=" * 60)
+
+    predictions = pd.read_csv(OUTPUT_DIR / 'predictions.csv')
+    prices = load_prices()
+    if prices is not None:
+        predictions = predictions.merge(prices[['player_id', 'price']], on='player_id', how='left')
+        predictions['price'] = predictions['price'].fillna(pd.Series(base_prices(predictions), index=predictions.index))
+        print(f"  - 가격: {PRICES_PATH.name}")
+    planner = TransferPlanner(predictions, rounds=args.rounds)
+
+    if args.team:
+        squad = load_saved_team(args.team)
+    elif args.squad:
+        squad = [int(pid) for pid in args.squad.split(',')]
+    else:
+        # 예시: 포지션 그룹별 예측 점수 중위권 선수로 4-3-3 구성
+        groups = position_group(predictions['main_position'])
+        squad = []
+        for group, count in {'GK': 1, 'DF': 4, 'MF': 3, 'FW': 3}.items():
+            ranked = predictions[groups == group].sort_values('predicted_score', ascending=False)
+            middle = len(ranked) // 2
+            squad += ranked['player_id'].iloc[middle:middle + count].astype(int).tolist()
+        print("  - 스쿼드 미지정: 예시 스쿼드 사용")
+
+    start = time.perf_counter()
+    suggestions = planner.plan(squad, budget=args.budget, top_n=args.top, free_transfers=args.free_transfers)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    names = predictions.set_index('player_id')['player_name_ko']
+    print(f"  - 스쿼드 {len(squad)}명, 후보 {len(predictions)}명, {args.rounds}라운드 기준 ({elapsed:.1f}ms)\n")
+    for _, row in suggestions.iterrows():
+        outs = ', '.join(str(names.get(pid, pid)) for pid in row['out_ids'])
+        ins = ', '.join(str(names.get(pid, pid)) for pid in row['in_ids'])
+        print(f"  [{row['transfers']}인] {outs} -> {ins}: +{row['net_gain']:.1f}점 (잔여 {row['bank_after']:.1f}M)")
+
+
+if __name__ == '__main__':
+    main()
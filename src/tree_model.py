@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - NumPy 트리 앙상블 평가기
+=======================================
+학습된 LightGBM 부스터(dump_model)를 평탄한 NumPy 배열로 변환하여
+LightGBM 런타임 없이 예측 (조회/추천 워커용)
+
+배열 구성 (전체 트리의 노드를 하나의 배열에 연결):
+- feature / threshold: 분기 피처 인덱스, 임계값
+- left / right: 자식 노드 인덱스 (리프는 자기 자신을 가리킴)
+- value: 리프 값 (내부 노드는 0)
+- default_left / missing_type: 결측값 분기 방향, 결측 유형 (0: None, 1: Zero, 2: NaN)
+- roots: 트리별 루트 노드 인덱스
+
+평가 (레벨 단위 순회):
+- (샘플, 트리) 노드 행렬을 최대 깊이만큼 한 번에 갱신
+- 리프는 자기 자신으로 이동하므로 분기 마스킹 없이 max_depth회 반복 후 리프 값 합산
+- 결측 처리 규칙은 LightGBM NumericalDecision과 동일
+
+저장:
+- outputs/gbm_trees.npz: 비압축 npz (load 시 각 배열을 np.memmap으로 직접 매핑)
+"""
+
+import json
+import struct
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+TREE_MODEL_PATH = OUTPUT_DIR / 'gbm_trees.npz'
+
+MISSING_TYPES = {'None': 0, 'Zero': 1, 'NaN': 2}
+# LightGBM kZeroThreshold
+ZERO_THRESHOLD = 1e-35
+# 한 번에 평가할 샘플 수 (노드 행렬 메모리 제한)
+BATCH_SIZE = 4096
+
+ARRAY_NAMES = ['feature', 'threshold', 'left', 'right', 'value',
+               'default_left', 'missing_type', 'roots']
+
+
+def compile_booster(dump):
+    """
+    dump_model() 결과(dict) 또는 lightgbm.Booster를 TreeEnsemble로 변환
+
+    지원: 단일 출력 회귀 (항등 변환), 수치형 분기
+    """
+    if hasattr(dump, 'dump_model'):
+        dump = dump.dump_model()
+
+    if dump.get('num_class', 1) != 1:
+        raise ValueError("다중 클래스 모델은 지원하지 않음")
+    objective = str(dump.get('objective', 'regression')).split()[0]
+    if not objective.startswith('regression'):
+        raise ValueError(f"항등 변환이 아닌 목적 함수는 지원하지 않음: {objective}")
+
+    columns = {name: [] for name in ARRAY_NAMES if name != 'roots'}
+    roots = []
+    max_depth = 0
+
+    for tree in dump['tree_info']:
+        roots.append(len(columns['value']))
+        # (노드, 깊이) 스택 기반 전위 순회, 자식 인덱스는 나중에 채움
+        stack = [(tree['tree_structure'], None, None, 0)]
+        while stack:
+            node, parent, side, depth = stack.pop()
+            index = len(columns['value'])
+            if parent is not None:
+                columns[side][parent] = index
+            max_depth = max(max_depth, depth)
+
+            if 'leaf_value' in node:
+                columns['feature'].append(0)
+                columns['threshold'].append(0.0)
+                columns['left'].append(index)
+                columns['right'].append(index)
+                columns['value'].append(node['leaf_value'])
+                columns['default_left'].append(False)
+                columns['missing_type'].append(0)
+                continue
+
+            if node['decision_type'] != '<=':
+                raise ValueError(f"범주형 분기는 지원하지 않음: {node['decision_type']}")
+
+            columns['feature'].append(node['split_feature'])
+            columns['threshold'].append(node['threshold'])
+            columns['left'].append(-1)
+            columns['right'].append(-1)
+            columns['value'].append(0.0)
+            columns['default_left'].append(node['default_left'])
+            columns['missing_type'].append(MISSING_TYPES[node['missing_type']])
+
+            stack.append((node['right_child'], index, 'right', depth + 1))
+            stack.append((node['left_child'], index, 'left', depth + 1))
+
+    arrays = {
+        'feature': np.array(columns['feature'], dtype=np.int32),
+        'threshold': np.array(columns['threshold'], dtype=np.float64),
+        'left': np.array(columns['left'], dtype=np.int32),
+        'right': np.array(columns['right'], dtype=np.int32),
+        'value': np.array(columns['value'], dtype=np.float64),
+        'default_left': np.array(columns['default_left'], dtype=bool),
+        'missing_type': np.array(columns['missing_type'], dtype=np.int8),
+        'roots': np.array(roots, dtype=np.int32),
+    }
+    if dump.get('average_output'):
+        arrays['value'] /= max(len(roots), 1)
+
+    return TreeEnsemble(arrays, dump['feature_names'], max_depth)
+
+
+class TreeEnsemble:
+    """평탄화된 트리 앙상블 (predict 인터페이스는 lightgbm.Booster와 동일)"""
+
+    def __init__(self, arrays, feature_names, max_depth):
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.feature_names = list(feature_names)
+        self.max_depth = int(max_depth)
+
+    @property
+    def num_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        """
+        배치 예측
+
+        Args:
+            X: DataFrame (feature_names 순서로 재정렬) 또는 (n, n_features) 배열
+        """
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+
+        predictions = np.empty(len(X))
+        for start in range(0, len(X), BATCH_SIZE):
+            predictions[start:start + BATCH_SIZE] = self._predict_batch(X[start:start + BATCH_SIZE])
+        return predictions
+
+    def _predict_batch(self, X):
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), self.num_trees))
+
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            missing_type = self.missing_type[node]
+            is_nan = np.isnan(x)
+            # NaN을 결측으로 보지 않는 분기에서는 0으로 취급
+            x = np.where(is_nan & (missing_type != 2), 0.0, x)
+            missing = (((missing_type == 1) & (np.abs(x) <= ZERO_THRESHOLD))
+                       | ((missing_type == 2) & is_nan))
+            go_left = np.where(missing, self.default_left[node], x <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return self.value[node].sum(axis=1)
+
+    def save(self, path=TREE_MODEL_PATH):
+        """비압축 npz 저장 (memmap 로드를 위해 압축하지 않음)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = json.dumps({'feature_names': self.feature_names, 'max_depth': self.max_depth})
+        with open(path, 'wb') as f:
+            np.savez(f, meta=np.frombuffer(meta.encode('utf-8'), dtype=np.uint8),
+                     **{name: getattr(self, name) for name in ARRAY_NAMES})
+        return path
+
+    @classmethod
+    def load(cls, path=TREE_MODEL_PATH, mmap=True):
+        """npz 로드 (mmap=True면 파일을 읽지 않고 각 배열을 읽기 전용 memmap으로 매핑)"""
+        if mmap:
+            arrays = _mmap_npz(path)
+        else:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        meta = json.loads(bytes(arrays.pop('meta')).decode('utf-8'))
+        return cls(arrays, meta['feature_names'], meta['max_depth'])
+
+
+def _mmap_npz(path):
+    """
+    비압축 npz의 각 멤버를 np.memmap으로 매핑
+    (np.load는 npz에 mmap_mode를 적용하지 않으므로 zip 로컬 헤더와 .npy 헤더를 직접 파싱)
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, 'rb') as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"압축된 멤버는 memmap 불가: {info.filename}")
+
+            # 로컬 파일 헤더 (30바이트 고정부 + 파일명 + extra)
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            name = info.filename[:-len('.npy')]
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    return arrays
+
+
+def main():
+    import time
+
+    print("=" * 60)
+    print("K-Fantasy AI - NumPy 트리 앙상블 평가기")
+    print("=" * 60)
+
+    if not TREE_MODEL_PATH.exists():
+        print(f"모델 없음: {TREE_MODEL_PATH} (prediction_model.py를 LightGBM으로 먼저 실행)")
+        return
+
+    start = time.perf_counter()
+    ensemble = TreeEnsemble.load()
+    print(f"\n로드: {TREE_MODEL_PATH} ({(time.perf_counter() - start) * 1000:.2f}ms)")
+    print(f"  - 트리 {ensemble.num_trees}개, 노드 {len(ensemble.value)}개, 최대 깊이 {ensemble.max_depth}")
+    print(f"  - 피처: {', '.join(ensemble.feature_names)}")
+
+    # 처리량 측정 (임의 입력)
+    X = np.random.default_rng(42).normal(size=(10000, len(ensemble.feature_names)))
+    start = time.perf_counter()
+    ensemble.predict(X)
+    print(f"\n예측 처리량: {len(X)}건 {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 기대 득점(xG) 모델
+=================================
+슈팅 좌표(start_x, start_y)로부터 득점 확률을 추정
+
+피처 (모두 NumPy 배열로 일괄 계산):
+1. distance: 골문 중앙까지 거리 (m)
+2. angle: 슈팅 위치에서 골문 양 포스트가 이루는 각도 (rad)
+3. distance * angle: 상호작용 항
+
+모델: L2 정규화 로지스틱 회귀 (뉴턴-랩슨/IRLS, NumPy만 사용)
+
+좌표계 가정: 105m x 68m 경기장, 모든 팀이 x 증가 방향으로 공격
+(전진 캐리 판정 end_x > start_x + 10과 동일한 가정)
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+MODEL_PATH = OUTPUT_DIR / 'xg_model.json'
+
+# 경기장 규격 (m)
+PITCH_LENGTH = 105.0
+PITCH_WIDTH = 68.0
+GOAL_WIDTH = 7.32
+GOAL_X = PITCH_LENGTH
+GOAL_Y = PITCH_WIDTH / 2
+
+FEATURE_NAMES = ['distance', 'angle', 'distance_x_angle']
+
+# 절편 정규화 (헤시안 특이 방지용 아주 작은 값)
+INTERCEPT_L2 = 1e-6
+
+
+def shot_features(x, y) -> np.ndarray:
+    """
+    슈팅 좌표 -> 피처 행렬 (n, 3)
+
+    Args:
+        x, y: 슈팅 시작 좌표 배열
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    dx = np.clip(GOAL_X - x, 0.0, None)
+    dy = y - GOAL_Y
+    distance = np.hypot(dx, dy)
+
+    # 골문 시야각: atan(w*dx / (dx^2 + dy^2 - (w/2)^2)), 음수는 pi 보정
+    angle = np.arctan2(GOAL_WIDTH * dx, dx ** 2 + dy ** 2 - (GOAL_WIDTH / 2) ** 2)
+    angle = np.where(angle < 0, angle + np.pi, angle)
+
+    return np.column_stack([distance, angle, distance * angle])
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+
+
+class XGModel:
+    """로지스틱 회귀 xG 모델"""
+
+    def __init__(self, l2=1.0):
+        self.l2 = l2
+        self.mean = None
+        self.scale = None
+        self.coef = None            # [절편, 피처...]
+        self.base_rate = 0.1        # 좌표 결측 슈팅에 사용
+
+    def _design(self, features):
+        z = (features - self.mean) / self.scale
+        return np.column_stack([np.ones(len(z)), z])
+
+    def fit(self, x, y, goals, max_iter=50, tol=1e-8):
+        """
+        뉴턴-랩슨으로 학습
+
+        Args:
+            x, y: 슈팅 좌표 배열
+            goals: 득점 여부 (0/1) 배열
+        """
+        features = shot_features(x, y)
+        target = np.asarray(goals, dtype=np.float64)
+        valid = np.isfinite(features).all(axis=1)
+        features, target = features[valid], target[valid]
+
+        self.base_rate = float(target.mean()) if len(target) else 0.1
+        self.mean = features.mean(axis=0) if len(features) else np.zeros(features.shape[1])
+        self.scale = features.std(axis=0) if len(features) else np.ones(features.shape[1])
+        self.scale[self.scale == 0] = 1.0
+
+        coef = np.zeros(features.shape[1] + 1)
+        prior = np.clip(self.base_rate, 1e-6, 1 - 1e-6)
+        coef[0] = np.log(prior / (1 - prior))
+
+        # 슈팅이 없거나 한쪽 결과만 있으면 학습할 정보가 없으므로 평균 득점률 모델
+        if len(np.unique(target)) < 2:
+            self.coef = coef
+            return self
+
+        X = self._design(features)
+        penalty = np.full(X.shape[1], self.l2)
+        penalty[0] = INTERCEPT_L2  # 절편은 사실상 정규화하지 않음
+
+        for _ in range(max_iter):
+            p = _sigmoid(X @ coef)
+            gradient = X.T @ (p - target) + penalty * coef
+            hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(penalty)
+            step = np.linalg.solve(hessian, gradient)
+            coef -= step
+            if np.abs(step).max() < tol:
+                break
+
+        self.coef = coef
+        return self
+
+    def predict(self, x, y) -> np.ndarray:
+        """슈팅별 득점 확률 (좌표 결측 시 평균 득점률)"""
+        features = shot_features(x, y)
+        valid = np.isfinite(features).all(axis=1)
+        xg = np.full(len(features), self.base_rate)
+        if valid.any():
+            xg[valid] = _sigmoid(self._design(features[valid]) @ self.coef)
+        return xg
+
+    def save(self, path=MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'features': FEATURE_NAMES,
+                'l2': self.l2,
+                'mean': self.mean.tolist(),
+                'scale': self.scale.tolist(),
+                'coef': self.coef.tolist(),
+                'base_rate': self.base_rate,
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            params = json.load(f)
+        model = cls(l2=params['l2'])
+        model.mean = np.array(params['mean'])
+        model.scale = np.array(params['scale'])
+        model.coef = np.array(params['coef'])
+        model.base_rate = params['base_rate']
+        return model
+
+
+def shot_mask(raw_data: pd.DataFrame) -> np.ndarray:
+    return (raw_data['type_name'] == 'Shot').to_numpy()
+
+
+def fit_and_score(raw_data: pd.DataFrame, model=None):
+    """
+    이벤트 로그 전체 슈팅에 대해 학습(모델 미지정 시) 후 일괄 xG 산출
+
+    Returns:
+        (XGModel, shots DataFrame[game_id, player_id, xg])
+    """
+    shots = raw_data.loc[shot_mask(raw_data), ['game_id', 'player_id', 'start_x', 'start_y', 'result_name']]
+    x = shots['start_x'].to_numpy()
+    y = shots['start_y'].to_numpy()
+
+    if model is None:
+        model = XGModel().fit(x, y, (shots['result_name'] == 'Goal').to_numpy())
+
+    shots = shots[['game_id', 'player_id']].copy()
+    shots['xg'] = model.predict(x, y)
+    return model, shots
+
+
+def player_match_xg(shots: pd.DataFrame) -> pd.DataFrame:
+    """선수-경기별 xG 합계"""
+    return shots.groupby(['game_id', 'player_id'], as_index=False)['xg'].sum()
+
+
+def calibration_table(xg, goals, bins=10) -> pd.DataFrame:
+    """xG 구간별 예측 평균 vs 실제 득점률"""
+    edges = np.quantile(xg, np.linspace(0, 1, bins + 1))
+    idx = np.clip(np.searchsorted(edges, xg, side='right') - 1, 0, bins - 1)
+    counts = np.bincount(idx, minlength=bins)
+    safe = np.maximum(counts, 1)
+    return pd.DataFrame({
+        'shots': counts,
+        'mean_xg': np.bincount(idx, weights=xg, minlength=bins) / safe,
+        'goal_rate': np.bincount(idx, weights=goals, minlength=bins) / safe,
+    })
+
+
+def main():
+    from dataset import load_table
+
+    print("=" * 60)
+    print("K-Fantasy AI - xG 모델 학습")
+    print("=" * 60)
+
+    raw_data = load_table('raw_data')
+    print(f"  - 이벤트: {len(raw_data):,}건, 슈팅: {shot_mask(raw_data).sum():,}건")
+
+    start = time.perf_counter()
+    model, shots = fit_and_score(raw_data)
+    elapsed = time.perf_counter() - start
+    model.save()
+
+    goals = (raw_data.loc[shot_mask(raw_data), 'result_name'] == 'Goal').to_numpy()
+    print(f"\n  - 학습+산출 시간: {elapsed:.3f}s")
+    print(f"  - 총 xG: {shots['xg'].sum():.1f} / 실제 골: {goals.sum()}")
+    print(f"  - 계수: {dict(zip(['intercept'] + FEATURE_NAMES, np.round(model.coef, 3)))}")
+    print("\n  보정(calibration):")
+    print(calibration_table(shots['xg'].to_numpy(), goals).round(3).to_string())
+    print(f"\n모델 저장: {MODEL_PATH}")
+
+
+if __name__ == '__main__':
+    main()
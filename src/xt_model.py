@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+K-Fantasy AI - 기대 위협(xT) 모델
+=================================
+경기장을 격자로 나누고 각 칸에서 공을 가졌을 때의 득점 기대값(xT)을 학습한 뒤,
+패스/캐리마다 도착 칸과 출발 칸의 xT 차이를 가치로 부여
+
+학습 (모두 벡터화):
+1. np.histogram2d로 칸별 슈팅/골/이동 횟수 및 칸 간 이동(전이) 횟수 집계
+2. 슈팅 확률 s, 이동 확률 m, 슈팅 득점률 g, 전이 행렬 T 계산
+   (실패한 이동은 분모에만 포함 -> 점유 상실은 가치 0)
+3. 가치 반복: xT = s*g + m * (T @ xT) 를 행렬 연산으로 수렴할 때까지 반복
+
+좌표계 가정: 105m x 68m 경기장, 모든 팀이 x 증가 방향으로 공격
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 경로 설정
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / 'outputs'
+MODEL_PATH = OUTPUT_DIR / 'xt_grid.json'
+
+# 경기장 규격 (m) 및 격자 크기
+PITCH_LENGTH = 105.0
+PITCH_WIDTH = 68.0
+GRID_X = 16
+GRID_Y = 12
+
+MOVE_TYPES = ['Pass', 'Carry']
+
+
+def cell_index(x, y, grid_x=GRID_X, grid_y=GRID_Y) -> np.ndarray:
+    """좌표 -> 격자 칸 번호 (x 방향 우선, 결측은 -1)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.isfinite(x) & np.isfinite(y)
+
+    cx = np.clip((np.nan_to_num(x) / PITCH_LENGTH * grid_x).astype(np.int64), 0, grid_x - 1)
+    cy = np.clip((np.nan_to_num(y) / PITCH_WIDTH * grid_y).astype(np.int64), 0, grid_y - 1)
+    return np.where(valid, cx * grid_y + cy, -1)
+
+
+def successful_moves(raw_data: pd.DataFrame) -> np.ndarray:
+    """성공한 패스/캐리 마스크 (캐리는 실패로 기록된 경우만 제외)"""
+    type_name = raw_data['type_name']
+    result_name = raw_data['result_name']
+    return (
+        ((type_name == 'Pass') & (result_name == 'Successful')) |
+        ((type_name == 'Carry') & (result_name != 'Unsuccessful'))
+    ).to_numpy()
+
+
+class XTModel:
+    """격자 기반 xT 모델"""
+
+    def __init__(self, grid_x=GRID_X, grid_y=GRID_Y):
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.grid = None            # (grid_x, grid_y) xT 값
+        self.iterations = 0
+
+    @property
+    def n_cells(self):
+        return self.grid_x * self.grid_y
+
+    def _cells(self, x, y):
+        return cell_index(x, y, self.grid_x, self.grid_y)
+
+    def fit(self, raw_data: pd.DataFrame, max_iter=100, tol=1e-6):
+        """이벤트 로그로 xT 격자 학습"""
+        n = self.n_cells
+        bins = np.arange(n + 1) - 0.5
+
+        type_name = raw_data['type_name'].to_numpy()
+        is_shot = type_name == 'Shot'
+        is_goal = is_shot & (raw_data['result_name'] == 'Goal').to_numpy()
+        is_move = np.isin(type_name, MOVE_TYPES)
+        is_success = successful_moves(raw_data) & is_move
+
+        start = self._cells(raw_data['start_x'], raw_data['start_y'])
+        end = self._cells(raw_data['end_x'], raw_data['end_y'])
+
+        def cell_counts(mask):
+            cells = start[mask & (start >= 0)]
+            counts, _ = np.histogram(cells, bins=bins)
+            return counts.astype(np.float64)
+
+        shots = cell_counts(is_shot)
+        goals = cell_counts(is_goal)
+        moves = cell_counts(is_move)
+
+        # 칸 간 전이 횟수 (출발 칸 x 도착 칸)
+        ok = is_success & (start >= 0) & (end >= 0)
+        transitions, _, _ = np.histogram2d(start[ok], end[ok], bins=[bins, bins])
+
+        actions = shots + moves
+        safe_actions = np.maximum(actions, 1)
+        shoot_prob = shots / safe_actions
+        move_prob = moves / safe_actions
+        goal_prob = goals / np.maximum(shots, 1)
+        transition = transitions / np.maximum(moves, 1)[:, None]
+
+        # 가치 반복 (행렬 연산)
+        reward = shoot_prob * goal_prob
+        xt = np.zeros(n)
+        for i in range(max_iter):
+            updated = reward + move_prob * (transition @ xt)
+            delta = np.abs(updated - xt).max()
+            xt = updated
+            if delta < tol:
+                break
+
+        self.iterations = i + 1
+        self.grid = xt.reshape(self.grid_x, self.grid_y)
+        return self
+
+    def value(self, x, y) -> np.ndarray:
+        """좌표별 xT 값 (결측은 0)"""
+        cells = self._cells(x, y)
+        flat = self.grid.ravel()
+        return np.where(cells >= 0, flat[np.maximum(cells, 0)], 0.0)
+
+    def move_values(self, raw_data: pd.DataFrame) -> np.ndarray:
+        """
+        이벤트별 xT 변화량 (성공한 패스/캐리만, 나머지는 0)
+        - 한 번의 벡터화 조회: xT[도착 칸] - xT[출발 칸]
+        """
+        delta = (
+            self.value(raw_data['end_x'], raw_data['end_y']) -
+            self.value(raw_data['start_x'], raw_data['start_y'])
+        )
+        mask = successful_moves(raw_data)
+        return np.where(mask, delta, 0.0)
+
+    def save(self, path=MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'grid_x': self.grid_x,
+                'grid_y': self.grid_y,
+                'grid': np.round(self.grid, 6).tolist(),
+            }, f)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            params = json.load(f)
+        model = cls(params['grid_x'], params['grid_y'])
+        model.grid = np.array(params['grid'])
+        return model
+
+
+def fit_and_score(raw_data: pd.DataFrame, model=None):
+    """
+    xT 학습(모델 미지정 시) 후 선수-경기별 xT 합계 산출
+
+    Returns:
+        (XTModel, DataFrame[game_id, player_id, xt])
+    """
+    if model is None:
+        model = XTModel().fit(raw_data)
+
+    values = model.move_values(raw_data)
+    moved = values != 0
+    xt_df = pd.DataFrame({
+        'game_id': raw_data['game_id'].to_numpy()[moved],
+        'player_id': raw_data['player_id'].to_numpy()[moved],
+        'xt': values[moved],
+    })
+    return model, xt_df.groupby(['game_id', 'player_id'], as_index=False)['xt'].sum()
+
+
+def main():
+    from dataset import load_table
+
+    print("=" * 60)
+    print("K-Fantasy AI - xT 모델 학습")
+    print("=" * 60)
+
+    raw_data = load_table('raw_data')
+    print(f"  - 이벤트: {len(raw_data):,}건")
+
+    start = time.perf_counter()
+    model, xt_df = fit_and_score(raw_data)
+    elapsed = time.perf_counter() - start
+    model.save()
+
+    print(f"\n  - 학습+산출 시간: {elapsed:.3f}s (가치 반복 {model.iterations}회)")
+    print(f"  - 최대 xT 칸: {model.grid.max():.3f}")
+    print(f"  - 선수-경기 xT 합계: {xt_df['xt'].sum():.1f}")
+    print(f"\n모델 저장: {MODEL_PATH}")
+
+
+if __name__ == '__main__':
+    main()
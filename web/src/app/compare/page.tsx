@@ -12,6 +12,7 @@ import {
   Legend,
 } from 'recharts';
 import { Player, getPositionGroup, normalizeFormIndex } from '@/types';
+import { loadPlayers } from '@/lib/deltaSync';
 
 const getPositionBadgeClass = (position: string) => {
   if (position === 'GK') return 'badge-gk';
@@ -36,8 +37,7 @@ export default function ComparePage() {
   const [activeSlot, setActiveSlot] = useState<1 | 2 | null>(null);
 
   useEffect(() => {
-    fetch('/data/players.json')
-      .then(r => r.json())
+    loadPlayers()
       .then(data => {
         setPlayers(data);
         setLoading(false);
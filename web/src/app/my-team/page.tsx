@@ -6,6 +6,7 @@ import { Player, SavedTeam, Formation, getPositionGroup, getAvailabilityLabel, g
 import BudgetMeter, { BudgetSelector, BudgetMeterMini } from '@/components/BudgetMeter';
 import { PriceTag, ValueStars } from '@/components/ValueRatingBadge';
 import { enrichPlayersData, filterByBudget, sortByValue } from '@/lib/dataEnricher';
+import { loadPlayers } from '@/lib/deltaSync';
 import { SkeletonFormation, SkeletonStatCard } from '@/components/SkeletonLoader';
 
 const FORMATIONS: Record<Formation, { GK: number; DF: number; MF: number; FW: number }> = {
@@ -48,8 +49,7 @@ export default function MyTeamPage() {
   }, []);
 
   useEffect(() => {
-    fetch('/data/players.json')
-      .then(r => r.json())
+    loadPlayers()
       .then(data => {
         // 선수 데이터 보강 (가격, 가성비, 출전 정보 추가)
         const enrichedData = enrichPlayersData(data);
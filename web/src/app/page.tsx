@@ -29,6 +29,7 @@ import {
 import PlayerCard from '@/components/PlayerCard';
 import PlayerModal from '@/components/PlayerModal';
 import { Player, DarkHorse, Summary } from '@/types';
+import { loadPlayers } from '@/lib/deltaSync';
 import { useCountAnimation } from '@/hooks/useCountAnimation';
 import AnimatedBarChart, { RankBarChart, StackedProgress } from '@/components/charts/AnimatedBarChart';
 import GradientAreaChart from '@/components/charts/GradientAreaChart';
@@ -85,7 +86,7 @@ export default function Dashboard() {
     const loadData = async () => {
       try {
         const [playersRes, darkHorsesRes, summaryRes] = await Promise.all([
-          fetch('/data/players.json').then(r => r.json()),
+          loadPlayers(),
           fetch('/data/dark_horses.json').then(r => r.json()),
           fetch('/data/summary.json').then(r => r.json())
         ]);
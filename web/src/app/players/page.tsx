@@ -7,6 +7,7 @@ import PlayerModal from '@/components/PlayerModal';
 import { AvailableOnlyToggle } from '@/components/AvailabilityFilter';
 import { Player, K_LEAGUE_TEAMS, AvailabilityStatus } from '@/types';
 import { enrichPlayersData } from '@/lib/dataEnricher';
+import { loadPlayers } from '@/lib/deltaSync';
 import { SkeletonPlayerCard } from '@/components/SkeletonLoader';
 
 const POSITIONS = ['전체', 'GK', 'CB', 'LB', 'RB', 'DMF', 'CMF', 'AMF', 'CF', 'LWF', 'RWF', 'LW', 'RW', 'SS'];
@@ -28,11 +29,10 @@ export default function PlayersPage() {
   const [isModalOpen, setIsModalOpen] = useState(false);
 
   useEffect(() => {
-    fetch('/data/players.json')
-      .then(r => r.json())
+    loadPlayers()
       .then(data => {
         // 선수 데이터 보강 (가격, 출전정보 등)
-        const enrichedPlayers = enrichPlayersData(Array.isArray(data) ? data : data.players || []);
+        const enrichedPlayers = enrichPlayersData(data);
         setPlayers(enrichedPlayers);
         setLoading(false);
       })
@@ -5,6 +5,7 @@ import { Calendar, TrendingUp, Users, ChevronLeft, ChevronRight, Target, Shield,
 import MatchupCard, { MatchupCardMini, RecommendedPlayerCard } from '@/components/MatchupCard';
 import DifficultyBadge, { calculateMatchupDifficulty, DifficultyStars } from '@/components/DifficultyBadge';
 import { Schedule, Match, TeamMatchup, HeadToHead, DifficultyLevel, Player } from '@/types';
+import { loadPlayers } from '@/lib/deltaSync';
 import { SkeletonChart, SkeletonPlayerCard } from '@/components/SkeletonLoader';
 
 interface MatchupsData {
@@ -73,19 +74,18 @@ export default function SchedulePage() {
   useEffect(() => {
     async function loadData() {
       try {
-        const [scheduleRes, matchupsRes, playersRes] = await Promise.all([
+        const [scheduleRes, matchupsRes, playersData] = await Promise.all([
           fetch('/data/schedule.json'),
           fetch('/data/matchups.json'),
-          fetch('/data/players.json')
+          loadPlayers()
         ]);
 
         const schedule = await scheduleRes.json();
         const matchups = await matchupsRes.json();
-        const playersData = await playersRes.json();
 
         setScheduleData(schedule);
         setMatchupsData(matchups);
-        setPlayers(playersData.players || playersData);
+        setPlayers(playersData);
         setSelectedRound(schedule.currentRound || 28);
       } catch (error) {
         console.error('Failed to load data:', error);
@@ -6,6 +6,7 @@ import Link from 'next/link';
 import PlayerCard from '@/components/PlayerCard';
 import PlayerModal from '@/components/PlayerModal';
 import { Player, getPositionGroup } from '@/types';
+import { loadPlayers } from '@/lib/deltaSync';
 import {
   BarChart,
   Bar,
@@ -34,8 +35,7 @@ export default function TeamsPage() {
   const [isModalOpen, setIsModalOpen] = useState(false);
 
   useEffect(() => {
-    fetch('/data/players.json')
-      .then(r => r.json())
+    loadPlayers()
       .then(data => {
         setPlayers(data);
         setLoading(false);
@@ -0,0 +1,96 @@
+// 컬럼형 바이너리 선수 데이터 리더
+// players.bin: [uint32 헤더 길이][헤더 JSON][컬럼 버퍼...] (리틀 엔디언, 생성: src/columnar_export.py)
+// 숫자 컬럼은 ArrayBuffer 위 TypedArray 뷰로 복사 없이 사용
+
+import { Player } from '@/types';
+
+const COLUMNAR_URL = '/data/players.bin';
+
+export interface ColumnSpec {
+  name: string;               // 중첩 필드는 점 표기 (contributions.recentForm)
+  type: 'float32' | 'int32' | 'uint16';
+  offset: number;             // 파일 시작 기준 바이트 오프셋
+  length: number;
+  decimals?: number;          // 원래 JSON 반올림 자릿수
+  dictionary?: string[];      // 문자열 컬럼 사전 (값은 코드)
+  null?: number;              // 정수 컬럼 결측 값 (float32는 NaN)
+}
+
+export interface ColumnarHeader {
+  version: number;
+  count: number;
+  columns: ColumnSpec[];
+}
+
+export type Column = Float32Array | Int32Array | Uint16Array;
+
+export interface ColumnarPlayers {
+  header: ColumnarHeader;
+  columns: Record<string, Column>;
+}
+
+// 바이너리 파싱 (헤더만 JSON 디코딩, 컬럼은 뷰 생성)
+export function parseColumnar(buffer: ArrayBuffer): ColumnarPlayers {
+  const headerLength = new DataView(buffer).getUint32(0, true);
+  const header: ColumnarHeader = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength))
+  );
+
+  const columns: Record<string, Column> = {};
+  for (const spec of header.columns) {
+    if (spec.type === 'float32') {
+      columns[spec.name] = new Float32Array(buffer, spec.offset, spec.length);
+    } else if (spec.type === 'int32') {
+      columns[spec.name] = new Int32Array(buffer, spec.offset, spec.length);
+    } else {
+      columns[spec.name] = new Uint16Array(buffer, spec.offset, spec.length);
+    }
+  }
+  return { header, columns };
+}
+
+export async function loadColumnar(url: string = COLUMNAR_URL): Promise<ColumnarPlayers> {
+  const buffer = await fetch(url).then(r => r.arrayBuffer());
+  return parseColumnar(buffer);
+}
+
+function decodeValue(spec: ColumnSpec, column: Column, i: number): number | string | undefined {
+  const raw = column[i];
+  if (spec.dictionary) {
+    return raw === spec.null ? undefined : spec.dictionary[raw];
+  }
+  if (spec.type === 'float32') {
+    if (Number.isNaN(raw)) return undefined;
+    const scale = 10 ** (spec.decimals ?? 6);
+    return Math.round(raw * scale) / scale;
+  }
+  return raw === spec.null ? undefined : raw;
+}
+
+// i번째 선수의 컬럼 값 (사전 복원, 결측은 undefined)
+export function columnValue(data: ColumnarPlayers, name: string, i: number): number | string | undefined {
+  const spec = data.header.columns.find(c => c.name === name);
+  const column = data.columns[name];
+  return spec && column ? decodeValue(spec, column, i) : undefined;
+}
+
+// 기존 화면용 Player 객체 배열로 변환 (players.json과 같은 구조)
+export function toPlayers(data: ColumnarPlayers): Player[] {
+  const players: Record<string, unknown>[] = Array.from({ length: data.header.count }, () => ({}));
+
+  for (const spec of data.header.columns) {
+    const column = data.columns[spec.name];
+    const path = spec.name.split('.');
+    const key = path.pop() as string;
+    for (let i = 0; i < players.length; i++) {
+      const value = decodeValue(spec, column, i);
+      if (value === undefined) continue;
+      let target = players[i];
+      for (const parent of path) {
+        target = (target[parent] ??= {}) as Record<string, unknown>;
+      }
+      target[key] = value;
+    }
+  }
+  return players as unknown as Player[];
+}
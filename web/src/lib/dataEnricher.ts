@@ -1,5 +1,6 @@
 // 선수 데이터 보강 유틸리티
 // 가격, 가성비, 출전 정보 등을 동적으로 추가
+// (players.json에 가격/최근 경기/출전 정보가 포함되어 있으면 그대로 사용 - src/pricing.py)
 
 import { Player, AvailabilityStatus, PlayerAvailability, PlayerHistory, GameHistory } from '@/types';
 
@@ -190,6 +191,9 @@ export function generatePlayerHistory(player: Player): PlayerHistory {
 
 // 전체 선수 데이터 보강
 export function enrichPlayerData(player: Player): Player {
+  // 내보내기 단계에서 계산된 데이터
+  if (player.price !== undefined) return player;
+
   const price = generatePlayerPrice(player);
   const valueRating = calculateValueRating(player, price);
   const priceChange = generatePriceChange(player);
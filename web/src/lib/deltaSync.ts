@@ -0,0 +1,92 @@
+// 선수 데이터 델타 동기화
+// 캐시된 기준 스냅샷(localStorage)에 라운드별 델타를 적용하여 players.json 전체 재다운로드를 피함
+// (델타 생성: src/delta_export.py)
+
+import { Player, PlayerDelta, DeltaManifest } from '@/types';
+
+const CACHE_KEY = 'kfantasy:players';
+const MANIFEST_URL = '/data/deltas/manifest.json';
+const SNAPSHOT_URL = '/data/players.json';
+
+interface CachedPlayers {
+  version: number;
+  players: Player[];
+}
+
+// 델타 1개 적용 (순위 순으로 정렬된 새 배열 반환)
+export function applyDelta(players: Player[], delta: PlayerDelta): Player[] {
+  const byId = new Map<number, Player>(players.map(p => [p.id, p]));
+
+  for (const id of delta.removed) {
+    byId.delete(id);
+  }
+  for (const changed of delta.changed) {
+    const previous = byId.get(changed.id);
+    byId.set(changed.id, { ...changed, rank: previous?.rank, positionRank: previous?.positionRank });
+  }
+  for (const [id, [rank, positionRank]] of Object.entries(delta.ranks)) {
+    const player = byId.get(Number(id));
+    if (player) {
+      byId.set(player.id, { ...player, rank, positionRank: positionRank ?? undefined });
+    }
+  }
+
+  return Array.from(byId.values()).sort((a, b) => (a.rank ?? Infinity) - (b.rank ?? Infinity));
+}
+
+function readCache(): CachedPlayers | null {
+  try {
+    const raw = localStorage.getItem(CACHE_KEY);
+    return raw ? (JSON.parse(raw) as CachedPlayers) : null;
+  } catch {
+    return null;
+  }
+}
+
+function writeCache(cache: CachedPlayers) {
+  try {
+    localStorage.setItem(CACHE_KEY, JSON.stringify(cache));
+  } catch {
+    // 저장 공간 부족 등은 무시 (다음 로드 시 전체 스냅샷)
+  }
+}
+
+async function fetchSnapshot(): Promise<Player[]> {
+  const data = await fetch(SNAPSHOT_URL).then(r => r.json());
+  return Array.isArray(data) ? data : data.players || [];
+}
+
+// 선수 목록 로드: 캐시 버전이 최신이면 그대로, 델타로 이어지면 델타만, 아니면 전체 스냅샷
+export async function loadPlayers(): Promise<Player[]> {
+  let manifest: DeltaManifest;
+  try {
+    manifest = await fetch(MANIFEST_URL, { cache: 'no-cache' }).then(r => r.json());
+  } catch {
+    return fetchSnapshot();
+  }
+
+  const cached = readCache();
+  if (cached && cached.version === manifest.version) {
+    return cached.players;
+  }
+
+  // 캐시 버전 다음부터 최신 버전까지 델타가 모두 있어야 적용
+  const needed: number[] = [];
+  if (cached && cached.version < manifest.version) {
+    for (let v = cached.version + 1; v <= manifest.version; v++) needed.push(v);
+  }
+  const available = new Set(manifest.deltas);
+
+  let players: Player[];
+  if (cached && needed.length > 0 && needed.every(v => available.has(v))) {
+    const deltas: PlayerDelta[] = await Promise.all(
+      needed.map(v => fetch(`/data/deltas/${v}.json`).then(r => r.json()))
+    );
+    players = deltas.reduce(applyDelta, cached.players);
+  } else {
+    players = await fetchSnapshot();
+  }
+
+  writeCache({ version: manifest.version, players });
+  return players;
+}
@@ -10,9 +10,12 @@ export interface Player {
   seasonAvg: number;
   formIndex: number;
   matchesPlayed: number;
+  minutesPlayed?: number;   // 경기당 평균 출장 시간 (추정, 분)
+  scorePer90?: number;      // 90분당 판타지 점수
   totalGoals: number;
   totalAssists: number;
   rank?: number;
+  positionRank?: number;    // 포지션 그룹 내 순위
   // XAI 관련
   contributions?: {
     recent_form: number;
@@ -27,10 +30,45 @@ export interface Player {
   price?: number;           // 단위: 백만원 (예: 5.5 = 5.5M)
   valueRating?: number;     // 가성비 (predictedScore / price)
   priceChange?: number;     // 전 라운드 대비 가격 변동
+  ownership?: number;       // 추정 보유율 (%, 가상 매니저 시뮬레이션)
   // 부상/출전 정보 (Phase 4)
   availability?: PlayerAvailability;
 }
 
+// 유사 선수 (similar_players.json: 선수 id -> 같은 포지션 그룹 top-10)
+export interface SimilarPlayer {
+  id: number;
+  similarity: number;       // 코사인 유사도 (-1 ~ 1)
+}
+export type SimilarPlayers = Record<string, SimilarPlayer[]>;
+
+// 선수 데이터 델타 (public/data/deltas/<version>.json, src/delta_export.py)
+export interface PlayerDelta {
+  version: number;
+  baseVersion: number;
+  generatedAt: string;
+  changed: Player[];        // 변경/추가 선수 (순위 필드 제외)
+  ranks: Record<string, [number, number | null]>;  // 선수 id -> [rank, positionRank]
+  removed: number[];
+}
+
+export interface DeltaManifest {
+  version: number;          // 현재 players.json 버전
+  deltas: number[];         // 적용 가능한 델타 버전 (연속)
+  snapshot: string;
+}
+
+// 선수별 히트맵 샤드 (public/data/heatmaps/<id>.json)
+export interface PlayerHeatmap {
+  grid: [number, number];   // [x 칸 수, y 칸 수] (x: 공격 방향)
+  zones: {                  // 3구역 이벤트 비율 (%)
+    defensive: number;
+    middle: number;
+    attacking: number;
+  };
+  heatmaps: Record<string, number[][]>;  // 유형('all', 'Pass', ...) -> [x][y] 이벤트 수
+}
+
 // 선수 출전 가능 상태
 export type AvailabilityStatus =
   | 'available'      // 출전 가능 (녹색)